@@ -13,12 +13,34 @@ from ui.components import (
     render_story_streaming,
     render_opponent_reveal,
     render_battle_history,
+    render_portrait_slot,
+    render_leaderboard,
+    render_tournament_match,
 )
 from ui.animation import render_battle_animation, render_loading_animation
-from ui.sounds import play_match_found, play_victory, play_defeat, play_battle_start
-from core.battle_engine import execute_battle
-from core.opponent_generator import load_predefined_pool, pick_opponent
-from config.settings import ANIMATION_MATCHING_STEPS
+from ui.identity import client_key, resolve_player_id
+from ui.phase import consume_scroll, current_phase, go_to, reset_phase
+from ui.sounds import (
+    mount_sound_engine, play_match_found, play_victory, play_defeat, play_battle_start, stop_bgm,
+)
+from core.opponent_generator import (
+    generate_random_names,
+    load_predefined_pool,
+    pick_opponent,
+    register_user_character,
+)
+from core.accounting import get_cost_ledger
+from core.assets import get_manifest
+from core.profiling import profiled_rerun
+from core.names import canonicalize_name
+from core.degradation import LEVEL_LABELS, LEVEL_NORMAL, get_degradation
+from core.history import open_history
+from core.leaderboard import get_leaderboard
+from core.replay import ReplayStore, battle_rng, new_battle_seed
+from core.session_memory import enforce_budget, result_audio
+from core.stats import stats_from_name
+from core.matchmaking import MatchmakingIndex
+from config.settings import ANIMATION_MATCHING_STEPS, TOURNAMENT_MAX_PLAYERS
 
 # ─────────────────────────────────────────────
 # 페이지 설정
@@ -30,30 +52,30 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-inject_global_styles()
+# 결과 화면에 딸린 세션 상태 (다음 배틀로 넘어갈 때 정리)
+RESULT_STATE_KEYS = [
+    "battle_result", "result_saved", "matched_opponent", "show_history",
+    "story_streamed", "result_effect_played", "battle_seed",
+]
 
-# ─────────────────────────────────────────────
-# 세션 초기화
-# ─────────────────────────────────────────────
-if "phase" not in st.session_state:
-    st.session_state.phase = "home"
-if "history" not in st.session_state:
-    st.session_state.history = []
-if "saved_characters" not in st.session_state:
-    st.session_state.saved_characters = []
-if "tts_enabled" not in st.session_state:
-    st.session_state.tts_enabled = True
-if "_nav_counter" not in st.session_state:
-    st.session_state._nav_counter = 0
+
+def clear_result_state():
+    """이전 배틀 결과 상태 정리 (리플레이 링크도 해제)"""
+    for key in RESULT_STATE_KEYS:
+        st.session_state.pop(key, None)
+    st.query_params.pop("replay", None)
 
 
 def scroll_to_top():
-    """페이지 상단으로 스크롤 (타이밍 보장)"""
+    """페이지 상단으로 스크롤 (단계 진입 시 1회만 주입)"""
+    if not consume_scroll():
+        return
     st.html(
         "<script>setTimeout(function(){"
         "try{var m=window.parent.document.querySelector('section.main');"
         "if(m)m.scrollTo({top:0,behavior:'instant'});}catch(e)"
-        "{window.parent.scrollTo(0,0);}},50);</script>"
+        "{window.parent.scrollTo(0,0);}},50);</script>",
+        unsafe_allow_javascript=True,
     )
 
 
@@ -66,8 +88,9 @@ def get_gemini_client():
     if not api_key:
         return None
     try:
-        from google import genai
-        return genai.Client(api_key=api_key)
+        from services.ai_service import create_gemini_client
+
+        return create_gemini_client(api_key)
     except Exception:
         return None
 
@@ -75,7 +98,9 @@ def get_gemini_client():
 # ─────────────────────────────────────────────
 # 사이드바: API 키 입력 + 전적
 # ─────────────────────────────────────────────
-with st.sidebar:
+@st.fragment
+def render_sidebar():
+    """사이드바 (토글/키 입력은 사이드바만 재실행)"""
     st.markdown("### Settings")
 
     st.session_state.tts_enabled = st.toggle(
@@ -102,10 +127,9 @@ with st.sidebar:
     if st.session_state.history:
         st.markdown("---")
         st.markdown("### 최근 전적")
-        wins = sum(1 for h in st.session_state.history if h["result"] == "player")
-        total = len(st.session_state.history)
-        st.markdown(f"**{wins}승 {total - wins}패**")
-        for record in reversed(st.session_state.history[-5:]):
+        history = st.session_state.history
+        st.markdown(f"**{history.wins}승 {history.losses}패**")
+        for record in history.recent(5):
             result_emoji = "\U0001F3C6" if record["result"] == "player" else "\U0001F4A2"
             st.markdown(
                 f"{result_emoji} **{record['player']}** vs {record['opponent']}"
@@ -115,19 +139,21 @@ with st.sidebar:
         st.markdown("---")
         st.markdown(f"### 등록된 캐릭터: {len(st.session_state.saved_characters)}명")
 
+    usage = get_cost_ledger().session(st.session_state.player_id)
+    if usage.battles:
+        st.markdown("---")
+        st.caption(
+            f"이번 세션 사용량: 배틀 {usage.battles}회 · 이미지 생성 {usage.images_generated}장 · "
+            f"TTS {usage.tts_chars:,}자 · 약 ${usage.cost_usd:.3f}"
+        )
 
-# ═════════════════════════════════════════════
-# 페이지 라우팅
-# ═════════════════════════════════════════════
 
 # ─────────────────────────────────────────────
-# HOME: 이름 입력
+# 프래그먼트: 단계 안의 상호작용은 해당 부분만 재실행
 # ─────────────────────────────────────────────
-if st.session_state.phase == "home":
-    scroll_to_top()
-    render_title()
-
-    st.markdown("")
+@st.fragment
+def render_name_form():
+    """이름 입력 폼 (입력 중에는 폼만 재실행, 시작 시 매칭 단계로 전환)"""
     user_name = st.text_input(
         "당신의 이름을 입력하세요",
         max_chars=20,
@@ -145,318 +171,574 @@ if st.session_state.phase == "home":
         )
 
     if start_btn:
-        if not user_name.strip():
+        if not canonicalize_name(user_name):
             st.warning("이름을 입력해주세요!")
         else:
-            st.session_state.user_name = user_name.strip()
-            st.session_state.phase = "matching"
-            st.rerun()
+            st.session_state.user_name = canonicalize_name(user_name)
+            go_to("matching")
 
-    # 전적 표시 (홈에서도)
-    if st.session_state.history:
-        with st.expander("\U0001F4CA 전적 보기"):
-            render_battle_history(st.session_state.history)
 
-# ─────────────────────────────────────────────
-# MATCHING: 상대 매칭 슬롯머신 + 실제 상대 표시
-# ─────────────────────────────────────────────
-elif st.session_state.phase == "matching":
-    # 이미 매칭된 상대가 있으면 스킵 (이중 클릭 방지)
-    if st.session_state.get("matched_opponent"):
-        st.session_state.phase = "confirm"
-        st.rerun()
+@st.fragment
+def render_history_panel(key: str):
+    """전적 패널 (페이지 이동은 패널만 재실행)"""
+    render_battle_history(st.session_state.history, key=key)
 
-    scroll_to_top()
-    st.markdown("## \u2694\uFE0F VS 매칭 중...")
 
-    characters, _ = load_predefined_pool()
-    name_pool = [c["name"] for c in characters] if characters else ["???"]
+@st.fragment
+def render_result_history():
+    """결과 화면 전적 토글 (토글해도 결과 화면 전체를 다시 그리지 않음)"""
+    if st.toggle("\U0001F4CA 전적 보기", key="show_history"):
+        st.markdown("### \U0001F4CA 전체 전적")
+        render_battle_history(st.session_state.history, key="result_history_page")
+
+
+def main():
+    """재실행 1회: 공통 준비(스타일/세션/사이드바) + 현재 단계 화면"""
+    inject_global_styles()
+
+    # 에셋 매니페스트 (프로세스당 1회 생성 + 사전 정의 상대 풀 검증)
+    get_manifest()
+
+    # 사운드 엔진 (세션당 1회 마운트, 이후 효과음은 큐 명령으로만 요청)
+    mount_sound_engine()
+
+    # ─────────────────────────────────────────────
+    # 세션 초기화
+    # ─────────────────────────────────────────────
+    current_phase()
+    if "history" not in st.session_state:
+        # 플레이어 ID는 쿠키로 유지 (예전 ?pid= 링크는 받지 않고 주소에서 지움)
+        st.query_params.pop("pid", None)
+        player_id = resolve_player_id()
+        st.session_state.player_id = player_id
+        get_cost_ledger().bind_client(player_id, client_key())
+        st.session_state.history = open_history(player_id)
+    if "saved_characters" not in st.session_state:
+        st.session_state.saved_characters = []
+    if "user_index" not in st.session_state:
+        # 사용자 캐릭터 스탯 매칭 인덱스 (캐릭터 등록 시 함께 갱신)
+        st.session_state.user_index = MatchmakingIndex()
+    if "tts_enabled" not in st.session_state:
+        st.session_state.tts_enabled = True
+    if "_nav_counter" not in st.session_state:
+        st.session_state._nav_counter = 0
+
+    # 세션 메모리 예산: 넘으면 등록 캐릭터 이미지/결과 오디오를 블롭 저장소로 내보냄
+    enforce_budget(st.session_state)
+
+    # 리플레이 링크 (?replay=<배틀 ID>): 저장된 결과를 AI 호출 없이 그대로 표시
+    replay_id = st.query_params.get("replay")
+    if replay_id and st.session_state.get("replay_loaded") != replay_id:
+        st.session_state.replay_loaded = replay_id
+        replayed = ReplayStore().load(replay_id)
+        if replayed:
+            clear_result_state()
+            st.query_params["replay"] = replay_id
+            st.session_state.battle_result = replayed
+            # 리플레이는 전적/랭킹에 다시 기록하지 않음
+            st.session_state.result_saved = True
+            reset_phase("result")
+        else:
+            st.toast("리플레이를 찾을 수 없습니다.")
 
-    col1, col2, col3 = st.columns([2, 1, 2])
-    with col1:
-        st.html(
-            f"<div style='text-align:center;'>"
-            f"<div class='fighter-name'>{st.session_state.user_name}</div>"
-            f"</div>"
+    with st.sidebar:
+        render_sidebar()
+
+    # ═════════════════════════════════════════════
+    # 페이지 라우팅
+    # ═════════════════════════════════════════════
+    phase = current_phase()
+
+    # 결과 화면을 벗어났는데 이전 결과가 남아 있으면 내림 (이미지/오디오는 리플레이 저장소에 있음)
+    if phase in ("home", "matching") and "battle_result" in st.session_state:
+        clear_result_state()
+
+    # ─────────────────────────────────────────────
+    # HOME: 이름 입력
+    # ─────────────────────────────────────────────
+    if phase == "home":
+        scroll_to_top()
+        stop_bgm()
+        render_title()
+
+        st.markdown("")
+        render_name_form()
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button("\U0001F3C6 토너먼트 모드", key="home_tournament", width="stretch"):
+                go_to("tournament")
+
+        # 전적 표시 (홈에서도)
+        if st.session_state.history:
+            with st.expander("\U0001F4CA 전적 보기"):
+                render_history_panel("home_history_page")
+
+        with st.expander("\U0001F3C5 랭킹 TOP 10"):
+            render_leaderboard(get_leaderboard().top(10), st.session_state.get("user_name", ""))
+
+    # ─────────────────────────────────────────────
+    # MATCHING: 상대 매칭 슬롯머신 + 실제 상대 표시
+    # ─────────────────────────────────────────────
+    elif phase == "matching":
+        # 이미 매칭된 상대가 있으면 스킵 (이중 클릭 방지)
+        if st.session_state.get("matched_opponent"):
+            go_to("confirm")
+
+        scroll_to_top()
+        st.markdown("## \u2694\uFE0F VS 매칭 중...")
+
+        # 슬롯머신 이름 풀: 사전 정의 상대 + 중복 없는 랜덤 상대 배치
+        characters, _ = load_predefined_pool()
+        name_pool = [c["name"] for c in characters]
+        name_pool += [d["name"] for d in generate_random_names(ANIMATION_MATCHING_STEPS)]
+
+        col1, col2, col3 = st.columns([2, 1, 2])
+        with col1:
+            st.html(
+                f"<div style='text-align:center;'>"
+                f"<div class='fighter-name'>{st.session_state.user_name}</div>"
+                f"</div>"
+            )
+        with col2:
+            render_vs_badge()
+        with col3:
+            name_slot = st.empty()
+
+        # 슬롯머신 효과
+        for i in range(ANIMATION_MATCHING_STEPS):
+            name_slot.markdown(
+                f"<div style='text-align:center;'>"
+                f"<div class='fighter-name'>{random.choice(name_pool)}</div>"
+                f"</div>",
+                unsafe_allow_html=True,
+            )
+            time.sleep(0.08 + i * 0.015)
+
+        # 실제 상대 매칭 (배틀 시드로 상대 선택 -> 같은 시드면 같은 상대)
+        seed = new_battle_seed()
+        st.session_state.battle_seed = seed
+        opponent = pick_opponent(
+            st.session_state.user_name,
+            st.session_state.saved_characters,
+            rng=battle_rng(seed, "match"),
+            player_stats=stats_from_name(st.session_state.user_name),
+            user_index=st.session_state.user_index,
         )
-    with col2:
-        render_vs_badge()
-    with col3:
-        name_slot = st.empty()
+        st.session_state.matched_opponent = opponent
 
-    # 슬롯머신 효과
-    for i in range(ANIMATION_MATCHING_STEPS):
+        # 최종 상대 이름 표시 (빨간색으로 강조)
+        play_match_found()
         name_slot.markdown(
             f"<div style='text-align:center;'>"
-            f"<div class='fighter-name'>{random.choice(name_pool)}</div>"
+            f"<div class='fighter-name' style='color:#FF4B4B;'>{opponent.name}</div>"
+            f"<div class='fighter-title'>{opponent.title}</div>"
             f"</div>",
             unsafe_allow_html=True,
         )
-        time.sleep(0.08 + i * 0.015)
+        time.sleep(1.5)
 
-    # 실제 상대 매칭
-    opponent = pick_opponent(
-        st.session_state.user_name,
-        st.session_state.saved_characters,
-    )
-    st.session_state.matched_opponent = opponent
-
-    # 최종 상대 이름 표시 (빨간색으로 강조)
-    play_match_found()
-    name_slot.markdown(
-        f"<div style='text-align:center;'>"
-        f"<div class='fighter-name' style='color:#FF4B4B;'>{opponent.name}</div>"
-        f"<div class='fighter-title'>{opponent.title}</div>"
-        f"</div>",
-        unsafe_allow_html=True,
-    )
-    time.sleep(1.5)
-
-    st.session_state.phase = "confirm"
-    st.rerun()
-
-# ─────────────────────────────────────────────
-# CONFIRM: 상대 확인 + 대결 시작
-# ─────────────────────────────────────────────
-elif st.session_state.phase == "confirm":
-    scroll_to_top()
-    opponent = st.session_state.get("matched_opponent")
-    if not opponent:
-        st.session_state.phase = "home"
-        st.rerun()
-
-    render_title()
-
-    # 사용자 캐릭터 재등장 알림
-    if opponent.source == "user_character" and opponent.creator_name:
-        render_user_character_badge(opponent.creator_name)
-
-    # 매칭 결과 표시
-    render_opponent_reveal(
-        player_name=st.session_state.user_name,
-        opponent_name=opponent.name,
-        opponent_title=opponent.title,
-        source=opponent.source,
-    )
+        go_to("confirm")
 
-    if opponent.description:
-        st.markdown(f"> *{opponent.description}*")
+    # ─────────────────────────────────────────────
+    # CONFIRM: 상대 확인 + 대결 시작
+    # ─────────────────────────────────────────────
+    elif phase == "confirm":
+        scroll_to_top()
+        opponent = st.session_state.get("matched_opponent")
+        if not opponent:
+            go_to("home")
 
-    st.markdown("")
+        render_title()
 
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        if st.button("\u2694\uFE0F 대결하기!", type="primary", use_container_width=True):
-            play_battle_start()
-            st.session_state.phase = "prepare"
-            st.rerun()
-
-    with col2:
-        nav = st.session_state._nav_counter
-        if st.button("다른 상대 찾기", key=f"confirm_rematch_{nav}", use_container_width=True):
-            st.session_state._nav_counter = nav + 1
-            st.session_state.pop("matched_opponent", None)
-            st.session_state.phase = "matching"
-            st.rerun()
+        # 사용자 캐릭터 재등장 알림
+        if opponent.source == "user_character" and opponent.creator_name:
+            render_user_character_badge(opponent.creator_name)
 
-# ─────────────────────────────────────────────
-# PREPARE: AI 생성 (로딩)
-# ─────────────────────────────────────────────
-elif st.session_state.phase == "prepare":
-    opponent = st.session_state.get("matched_opponent")
-    if not opponent:
-        st.session_state.phase = "home"
-        st.rerun()
-
-    gemini_client = get_gemini_client()
-
-    # 탑블레이드 스타일 로딩 애니메이션
-    render_loading_animation(st.session_state.user_name, opponent.name)
-
-    progress = st.progress(0, text="준비 중...")
-
-    def on_progress(step: int, msg: str):
-        pct = int(step / 6 * 100)
-        progress.progress(pct, text=msg)
-
-    try:
-        result = execute_battle(
+        # 매칭 결과 표시
+        render_opponent_reveal(
             player_name=st.session_state.user_name,
-            opponent=opponent,
-            progress_callback=on_progress,
-            tts_enabled=st.session_state.tts_enabled,
-            gemini_client=gemini_client,
+            opponent_name=opponent.name,
+            opponent_title=opponent.title,
+            source=opponent.source,
         )
-        st.session_state.battle_result = result
-        progress.progress(100, text="모든 준비 완료!")
-
-    except Exception as e:
-        st.error(f"배틀 준비 중 오류가 발생했습니다: {e}")
-        col_a, col_b = st.columns(2)
-        with col_a:
-            if st.button("다시 시도"):
-                st.rerun()
-        with col_b:
-            if st.button("홈으로"):
-                st.session_state.phase = "home"
-                st.rerun()
-        st.stop()
-
-    time.sleep(1)
-    st.session_state.phase = "battle"
-    st.rerun()
 
-# ─────────────────────────────────────────────
-# BATTLE: 애니메이션
-# ─────────────────────────────────────────────
-elif st.session_state.phase == "battle":
-    result = st.session_state.get("battle_result")
-    if not result:
-        st.session_state.phase = "home"
-        st.rerun()
-
-    # 사용자 캐릭터 재등장 알림
-    if result.opponent.source == "user_character" and result.opponent.creator_name:
-        render_user_character_badge(result.opponent.creator_name)
-
-    # 배틀 애니메이션
-    render_battle_animation(
-        player_name=result.player.name,
-        opponent_name=result.opponent.name,
-        player_img_b64=result.player.image_base64,
-        opponent_img_b64=result.opponent.image_base64,
-    )
+        if opponent.description:
+            st.markdown(f"> *{opponent.description}*")
 
-    # 애니메이션 시간 대기 후 결과로 전환
-    time.sleep(5.5)
-    st.session_state.phase = "result"
-    st.rerun()
+        st.markdown("")
 
-# ─────────────────────────────────────────────
-# RESULT: 결과 표시
-# ─────────────────────────────────────────────
-elif st.session_state.phase == "result":
-    result = st.session_state.get("battle_result")
-    if not result:
-        st.session_state.phase = "home"
-        st.rerun()
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button("\u2694\uFE0F 대결하기!", type="primary", use_container_width=True):
+                play_battle_start()
+                go_to("prepare")
+
+        with col2:
+            nav = st.session_state._nav_counter
+            if st.button("다른 상대 찾기", key=f"confirm_rematch_{nav}", use_container_width=True):
+                st.session_state._nav_counter = nav + 1
+                st.session_state.pop("matched_opponent", None)
+                go_to("matching")
+
+    # ─────────────────────────────────────────────
+    # PREPARE: AI 생성 (로딩)
+    # ─────────────────────────────────────────────
+    elif phase == "prepare":
+        opponent = st.session_state.get("matched_opponent")
+        if not opponent:
+            go_to("home")
+
+        # 배틀 엔진(asyncio/AI SDK)은 첫 배틀 준비 시점에 불러옴 -> 첫 화면 렌더 지연 없음
+        from core.battle_engine import execute_battle
+
+        gemini_client = get_gemini_client()
+        degradation_level = get_degradation().level()
+
+        # 탑블레이드 스타일 로딩 애니메이션
+        render_loading_animation(st.session_state.user_name, opponent.name)
+        if degradation_level > LEVEL_NORMAL:
+            st.caption(f"\u26A0\uFE0F 접속량이 많아 간소화 모드로 진행합니다 ({LEVEL_LABELS[degradation_level]})")
+
+        # 초상화 슬롯: 플레이스홀더를 즉시 보여주고 실제 이미지가 오면 교체
+        slot_col1, _, slot_col2 = st.columns([2, 1, 2])
+        portrait_slots = {"player": slot_col1.empty(), "opponent": slot_col2.empty()}
+
+        progress = st.progress(0, text="준비 중...")
+
+        def on_progress(step: int, msg: str):
+            pct = int(step / 6 * 100)
+            progress.progress(pct, text=msg)
+
+        def on_image(role: str, fighter):
+            render_portrait_slot(portrait_slots[role], fighter)
+
+        try:
+            result = execute_battle(
+                player_name=st.session_state.user_name,
+                opponent=opponent,
+                progress_callback=on_progress,
+                tts_enabled=st.session_state.tts_enabled,
+                gemini_client=gemini_client,
+                image_callback=on_image,
+                seed=st.session_state.get("battle_seed"),
+                degradation_level=degradation_level,
+                session_id=st.session_state.player_id,
+            )
+            ReplayStore().save(result)
+            st.session_state.battle_result = result
+            progress.progress(100, text="모든 준비 완료!")
+
+        except Exception as e:
+            stop_bgm()
+            st.error(f"배틀 준비 중 오류가 발생했습니다: {e}")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if st.button("다시 시도"):
+                    st.rerun()
+            with col_b:
+                if st.button("홈으로"):
+                    go_to("home")
+            st.stop()
+
+        time.sleep(1)
+        go_to("battle")
+
+    # ─────────────────────────────────────────────
+    # BATTLE: 애니메이션
+    # ─────────────────────────────────────────────
+    elif phase == "battle":
+        result = st.session_state.get("battle_result")
+        if not result:
+            go_to("home")
+
+        # 사용자 캐릭터 재등장 알림
+        if result.opponent.source == "user_character" and result.opponent.creator_name:
+            render_user_character_badge(result.opponent.creator_name)
+
+        # 배틀 애니메이션
+        render_battle_animation(
+            player_name=result.player.name,
+            opponent_name=result.opponent.name,
+            player_img_b64=result.player.image_base64,
+            opponent_img_b64=result.opponent.image_base64,
+        )
 
-    is_player_win = result.winner == "player"
+        # 애니메이션 시간 대기 후 결과로 전환
+        time.sleep(5.5)
+        go_to("result")
+
+    # ─────────────────────────────────────────────
+    # RESULT: 결과 표시
+    # ─────────────────────────────────────────────
+    elif phase == "result":
+        result = st.session_state.get("battle_result")
+        if not result:
+            go_to("home")
+
+        is_player_win = result.winner == "player"
+
+        # 승패 헤더 (효과음/연출은 최초 1회만)
+        if is_player_win:
+            st.html('<div class="winner-text">\u2728 VICTORY! \u2728</div>')
+            if not st.session_state.get("result_effect_played"):
+                play_victory()
+                st.balloons()
+        else:
+            st.html('<div class="loser-text">DEFEAT...</div>')
+            if not st.session_state.get("result_effect_played"):
+                play_defeat()
+                st.snow()
 
-    # 승패 헤더 (효과음/연출은 최초 1회만)
-    if is_player_win:
-        st.html('<div class="winner-text">\u2728 VICTORY! \u2728</div>')
         if not st.session_state.get("result_effect_played"):
-            play_victory()
-            st.balloons()
-    else:
-        st.html('<div class="loser-text">DEFEAT...</div>')
-        if not st.session_state.get("result_effect_played"):
-            play_defeat()
-            st.snow()
-
-    if not st.session_state.get("result_effect_played"):
-        st.session_state.result_effect_played = True
+            st.session_state.result_effect_played = True
 
-    st.markdown("---")
+        st.markdown("---")
 
-    # 캐릭터 비교
-    col1, col_mid, col2 = st.columns([3, 1, 3])
-    with col1:
-        render_fighter_card(
-            result.player.name,
-            result.player.title,
-            result.player.image_base64,
-            is_winner=is_player_win,
-        )
-    with col_mid:
-        render_vs_badge()
-    with col2:
-        render_fighter_card(
-            result.opponent.name,
-            result.opponent.title,
-            result.opponent.image_base64,
-            is_winner=not is_player_win,
-        )
+        # 캐릭터 비교
+        col1, col_mid, col2 = st.columns([3, 1, 3])
+        with col1:
+            render_fighter_card(
+                result.player.name,
+                result.player.title,
+                result.player.image_base64,
+                is_winner=is_player_win,
+            )
+        with col_mid:
+            render_vs_badge()
+        with col2:
+            render_fighter_card(
+                result.opponent.name,
+                result.opponent.title,
+                result.opponent.image_base64,
+                is_winner=not is_player_win,
+            )
 
-    st.markdown("---")
+        st.markdown("---")
 
-    # 승리 선언
-    if result.victory_line:
-        winner_name = result.player.name if is_player_win else result.opponent.name
-        st.markdown(f'> **{winner_name}**: *"{result.victory_line}"*')
-        st.markdown("")
+        # 승리 선언
+        if result.victory_line:
+            winner_name = result.player.name if is_player_win else result.opponent.name
+            st.markdown(f'> **{winner_name}**: *"{result.victory_line}"*')
+            st.markdown("")
+
+        # TTS 오디오 재생
+        audio = result_audio(result)
+        if audio:
+            st.audio(audio, format="audio/wav", autoplay=True)
+
+        # 배틀 스토리 (최초 1회만 스트리밍, 이후 즉시 표시)
+        st.markdown("### \U0001F4DC 배틀 스토리")
+        if not st.session_state.get("story_streamed"):
+            render_story_streaming(result.story)
+            st.session_state.story_streamed = True
+        else:
+            st.markdown(result.story)
 
-    # TTS 오디오 재생
-    if result.audio_data:
-        st.audio(result.audio_data, format="audio/wav", autoplay=True)
+        if result.battle_summary:
+            st.markdown("")
+            st.info(f"\U0001F4DD **요약**: {result.battle_summary}")
 
-    # 배틀 스토리 (최초 1회만 스트리밍, 이후 즉시 표시)
-    st.markdown("### \U0001F4DC 배틀 스토리")
-    if not st.session_state.get("story_streamed"):
-        render_story_streaming(result.story)
-        st.session_state.story_streamed = True
-    else:
-        st.markdown(result.story)
+        st.markdown("---")
 
-    if result.battle_summary:
-        st.markdown("")
-        st.info(f"\U0001F4DD **요약**: {result.battle_summary}")
+        # 전적 저장 (중복 방지)
+        if "result_saved" not in st.session_state:
+            # 리더보드는 백그라운드에서 반영 (결과 화면은 기다리지 않음)
+            get_leaderboard().record(result)
+            st.session_state.history.append({
+                "player": result.player.name,
+                "opponent": result.opponent.name,
+                "result": result.winner,
+                "opponent_source": result.opponent.source,
+                "player_title": result.player.title,
+                "opponent_title": result.opponent.title,
+            })
 
-    st.markdown("---")
+            # 승리 캐릭터를 saved_characters에 저장 (재등장용)
+            if is_player_win and result.player.image_base64 and not result.player.image_is_placeholder:
+                register_user_character(
+                    st.session_state.saved_characters,
+                    {
+                        "name": result.player.name,
+                        "title": result.player.title,
+                        "description": f"{result.player.title} - {result.battle_summary}",
+                        "image_base64": result.player.image_base64,
+                        "creator_name": result.player.name,
+                        "stats": result.player.stats,
+                    },
+                    index=st.session_state.user_index,
+                )
+                st.success(
+                    f"\U0001F4BE **{result.player.name}** 캐릭터가 등록되었습니다! "
+                    "다른 플레이어의 상대로 등장할 수 있습니다."
+                )
+
+            st.session_state.result_saved = True
+
+        if result.degraded:
+            labels = {"tts": "TTS 나레이션", "image": "이미지 생성", "story": "AI 스토리"}
+            st.caption("\u26A0\uFE0F 간소화되어 진행된 기능: " + ", ".join(labels[d] for d in result.degraded))
+
+        if result.battle_id:
+            st.caption(f"\U0001F517 리플레이 링크: `?replay={result.battle_id}` (AI 호출 없이 이 결과를 다시 보여줍니다)")
+
+        # 버튼 (nav_counter로 이중 클릭 방지)
+        nav = st.session_state._nav_counter
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if st.button("\u2694\uFE0F 다른 상대 찾기", key=f"result_rematch_{nav}", type="primary", use_container_width=True):
+                st.session_state._nav_counter = nav + 1
+                clear_result_state()
+                # 리플레이로 들어와 이름이 없으면 홈에서 시작
+                go_to("matching" if st.session_state.get("user_name") else "home")
+        with col_b:
+            if st.button("\U0001F464 다른 캐릭터로 배틀하기!", key=f"result_newchar_{nav}", use_container_width=True):
+                st.session_state._nav_counter = nav + 1
+                clear_result_state()
+                go_to("home")
 
-    # 전적 저장 (중복 방지)
-    if "result_saved" not in st.session_state:
-        st.session_state.history.append({
-            "player": result.player.name,
-            "opponent": result.opponent.name,
-            "result": result.winner,
-            "opponent_source": result.opponent.source,
-            "player_title": result.player.title,
-            "opponent_title": result.opponent.title,
-        })
-
-        # 승리 캐릭터를 saved_characters에 저장 (재등장용)
-        if is_player_win and result.player.image_base64:
-            st.session_state.saved_characters.append({
-                "name": result.player.name,
-                "title": result.player.title,
-                "description": f"{result.player.title} - {result.battle_summary}",
-                "image_base64": result.player.image_base64,
-                "creator_name": result.player.name,
-                "stats": result.player.stats,
+        # 전적 상세
+        st.markdown("---")
+        render_result_history()
+
+    # ─────────────────────────────────────────────
+    # TOURNAMENT: 이름 여러 개로 브래킷 진행 (경기는 병렬, 결과는 대진 순서대로 공개)
+    # ─────────────────────────────────────────────
+    elif phase == "tournament":
+        scroll_to_top()
+        stop_bgm()
+        st.markdown("## \U0001F3C6 토너먼트")
+
+        # 브래킷/배틀 엔진은 토너먼트 시작 시점에 불러옴
+        from core.tournament import build_bracket, round_label, run_tournament
+
+        def match_summary(match) -> dict:
+            """세션에는 경기 요약만 보관 (이미지/오디오는 리플레이 저장소)"""
+            return {
+                "round": match.round_index,
+                "slot": match.slot,
+                "player": match.player.name,
+                "opponent": match.opponent.name,
+                "winner": match.winner_name,
+                "summary": match.result.battle_summary if match.result else "",
+                "battle_id": match.result.battle_id if match.result else "",
+                "error": match.error,
+            }
+
+        def record_tournament_match(match) -> None:
+            """참가자가 뛴 경기를 리더보드/전적에 기록 (채운 상대끼리의 경기는 제외)"""
+            result = match.result
+            sides = ((result.player, result.opponent, result.winner == "player"),
+                     (result.opponent, result.player, result.winner == "opponent"))
+            entrants = [(f, rival, won) for f, rival, won in sides if f.source == "player"]
+            if not entrants:
+                return
+            leaderboard = get_leaderboard()
+            for fighter, rival, won in entrants:
+                leaderboard.record_outcome(fighter.name, won, rival.rarity or rival.source)
+            st.session_state.history.append({
+                "player": result.player.name,
+                "opponent": result.opponent.name,
+                "result": result.winner,
+                "opponent_source": result.opponent.source,
+                "player_title": result.player.title,
+                "opponent_title": result.opponent.title,
+                "mode": "tournament",
             })
-            st.success(
-                f"\U0001F4BE **{result.player.name}** 캐릭터가 등록되었습니다! "
-                "다른 플레이어의 상대로 등장할 수 있습니다."
+
+        def bracket_columns(total_rounds: int) -> list:
+            cols = st.columns(total_rounds)
+            for r, col in enumerate(cols):
+                col.markdown(f"**{round_label(r, total_rounds)}**")
+            return cols
+
+        summary = st.session_state.get("tournament_summary")
+        if summary is None:
+            names_text = st.text_area(
+                f"참가자 이름 (한 줄에 한 명, 최대 {TOURNAMENT_MAX_PLAYERS}명)",
+                key="tournament_names_input",
+                height=200,
+                placeholder="빈 자리는 랜덤 상대로 채워집니다",
             )
+            names = [n for n in names_text.splitlines() if n.strip()]
+            if st.button("\u2694\uFE0F 토너먼트 시작!", type="primary", width="stretch", disabled=len(names) < 2):
+                try:
+                    tournament = build_bracket(
+                        names,
+                        user_characters=st.session_state.saved_characters,
+                        user_index=st.session_state.user_index,
+                    )
+                except ValueError as e:
+                    st.warning(str(e))
+                    st.stop()
+
+                total_rounds = len(tournament.rounds)
+                cols = bracket_columns(total_rounds)
+                slots = {}
+                for match in tournament.matches():
+                    slot = cols[match.round_index].empty()
+                    render_tournament_match(slot, None, "경기 중..." if match.round_index == 0 else "대기 중")
+                    slots[(match.round_index, match.slot)] = slot
+                progress = st.progress(0, text="경기 진행 중...")
+                finished, shown = {}, set()
+                store = ReplayStore()
+
+                def on_match(match):
+                    if match.result:
+                        store.save(match.result)
+                        record_tournament_match(match)
+                    finished[(match.round_index, match.slot)] = match_summary(match)
+                    progress.progress(len(finished) / len(slots), text=f"경기 {len(finished)}/{len(slots)} 완료")
+                    # 먼저 끝난 뒷 라운드 결과는 앞 경기가 공개된 뒤에 보여줌 (승자 미리 노출 방지)
+                    for key in sorted(finished):
+                        r, i = key
+                        if key in shown or (r > 0 and not {(r - 1, 2 * i), (r - 1, 2 * i + 1)} <= shown):
+                            continue
+                        render_tournament_match(slots[key], finished[key])
+                        shown.add(key)
+
+                run_tournament(
+                    tournament,
+                    on_match=on_match,
+                    tts_final=st.session_state.tts_enabled,
+                    gemini_client=get_gemini_client(),
+                    session_id=st.session_state.player_id,
+                )
+                final = tournament.rounds[-1][0]
+                audio = result_audio(final.result) if final.result else b""
+                if audio:
+                    st.audio(audio, format="audio/wav", autoplay=True)
+                st.session_state.tournament_summary = {
+                    "champion": tournament.champion,
+                    "rounds": [[match_summary(m) for m in r] for r in tournament.rounds],
+                }
+                summary = st.session_state.tournament_summary
+                play_victory()
+                st.balloons()
+                st.success(f"\U0001F3C6 우승: **{tournament.champion}**")
+        else:
+            st.success(f"\U0001F3C6 우승: **{summary['champion']}**")
+            cols = bracket_columns(len(summary["rounds"]))
+            for r, matches in enumerate(summary["rounds"]):
+                for match in matches:
+                    render_tournament_match(cols[r].empty(), match)
 
-        st.session_state.result_saved = True
-
-    # 버튼 (nav_counter로 이중 클릭 방지)
-    nav = st.session_state._nav_counter
-    col_a, col_b, col_c = st.columns(3)
-    with col_a:
-        if st.button("\u2694\uFE0F 다른 상대 찾기", key=f"result_rematch_{nav}", type="primary", use_container_width=True):
-            st.session_state._nav_counter = nav + 1
-            for key in ["battle_result", "result_saved", "matched_opponent", "show_history", "story_streamed", "result_effect_played"]:
-                st.session_state.pop(key, None)
-            st.session_state.phase = "matching"
-            st.rerun()
-    with col_b:
-        if st.button("\U0001F464 다른 캐릭터로 배틀하기!", key=f"result_newchar_{nav}", use_container_width=True):
-            st.session_state._nav_counter = nav + 1
-            for key in ["battle_result", "result_saved", "matched_opponent", "show_history", "story_streamed", "result_effect_played"]:
-                st.session_state.pop(key, None)
-            st.session_state.phase = "home"
-            st.rerun()
-    with col_c:
-        if st.button("\U0001F4CA 전적 보기", use_container_width=True):
-            st.session_state.show_history = not st.session_state.get("show_history", False)
-            st.rerun()
-
-    # 전적 상세
-    if st.session_state.get("show_history"):
-        st.markdown("---")
-        st.markdown("### \U0001F4CA 전체 전적")
-        render_battle_history(st.session_state.history)
+        nav = st.session_state._nav_counter
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if summary is not None and st.button(
+                "\U0001F501 새 토너먼트", key=f"tournament_new_{nav}", type="primary", use_container_width=True,
+            ):
+                st.session_state._nav_counter = nav + 1
+                st.session_state.pop("tournament_summary", None)
+                st.rerun()
+        with col_b:
+            if st.button("홈으로", key=f"tournament_home_{nav}", use_container_width=True):
+                st.session_state._nav_counter = nav + 1
+                st.session_state.pop("tournament_summary", None)
+                go_to("home")
+
+
+# 단계별 재실행 시간 기록 + 프로파일링 (NAMEBATTLE_PROFILE 설정 시 N번 중 1번 측정)
+with profiled_rerun(current_phase()):
+    main()
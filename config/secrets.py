@@ -0,0 +1,25 @@
+"""API 키 조회 - Streamlit secrets 우선, 없으면 환경변수(.env)
+
+streamlit/dotenv는 처음 키를 조회할 때 불러온다 (import 시점 비용 없음).
+"""
+
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _load_dotenv() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def get_secret(key: str) -> str:
+    """키 이름으로 값 조회 (없으면 빈 문자열)"""
+    try:
+        import streamlit as st
+
+        return st.secrets[key]
+    except Exception:
+        _load_dotenv()
+        return os.getenv(key, "")
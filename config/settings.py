@@ -1,7 +1,10 @@
 """NameBattle 전역 설정"""
 
+import os
 
-# Gemini API 설정 (텍스트 생성)
+
+# 텍스트 생성 모델 (OpenAI 기본, Gemini 옵션)
+OPENAI_MODEL_TEXT = "gpt-4o-mini"
 GEMINI_MODEL_TEXT = "gemini-2.5-flash"
 
 # 이미지 생성 스타일 프리픽스
@@ -13,6 +16,37 @@ IMAGE_STYLE_PREFIX = (
     "high quality digital illustration. "
 )
 
+# 이미지 생성 백엔드 ("dalle": DALL-E 3, "local": 절차적 초상화 - API 불필요)
+IMAGE_BACKEND = os.getenv("NAMEBATTLE_IMAGE_BACKEND", "dalle")
+
+# 실행 중 생성되는 데이터 (전적 등) 저장 위치
+RUNTIME_DATA_DIR = os.getenv(
+    "NAMEBATTLE_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "runtime"),
+)
+HISTORY_DIR = os.path.join(RUNTIME_DATA_DIR, "history")
+PLAYER_COOKIE = "namebattle_pid"  # 플레이어 ID 쿠키 (공유되는 URL에는 남기지 않음)
+PLAYER_COOKIE_MAX_AGE = 365 * 24 * 3600  # 초
+HISTORY_PAGE_SIZE = 20
+REPLAY_DIR = os.path.join(RUNTIME_DATA_DIR, "replays")
+REPLAY_MAX_AGE = int(os.getenv("NAMEBATTLE_REPLAY_MAX_DAYS", "90")) * 24 * 3600  # 초. 지나면 리플레이 삭제
+REPLAY_MAX_COUNT = int(os.getenv("NAMEBATTLE_REPLAY_MAX_COUNT", "20000"))  # 넘으면 오래된 리플레이부터 삭제
+BLOB_DIR = os.path.join(RUNTIME_DATA_DIR, "blobs")
+BLOB_MAX_BYTES = int(os.getenv("NAMEBATTLE_BLOB_MAX_MB", "2048")) * 1024 * 1024  # 넘으면 오래 안 쓴 블롭부터 삭제
+BLOB_MAX_AGE = 30 * 24 * 3600  # 초. 리플레이가 참조하지 않고 이만큼 안 쓴 블롭은 삭제
+BLOB_TOUCH_INTERVAL = 3600  # 초. 읽을 때 마지막 사용 시각(mtime)을 이 간격으로만 갱신
+DATA_SWEEP_INTERVAL = 3600  # 초. 리플레이/블롭 정리 주기 (프로세스 간 공유)
+LEADERBOARD_PATH = os.path.join(RUNTIME_DATA_DIR, "leaderboard.json")  # 스냅샷 (이름별 집계 + 반영한 로그 위치)
+LEADERBOARD_LOG_PATH = os.path.join(RUNTIME_DATA_DIR, "leaderboard.jsonl")  # 모든 프로세스가 추가하는 결과 로그
+LEADERBOARD_COMPACT_BYTES = 1024 * 1024  # 로그가 이보다 커지면 스냅샷을 저장하고 새 로그로 교체
+LEADERBOARD_FLUSH_INTERVAL = 2.0  # 초 (write-behind 배치 주기)
+LEADERBOARD_BATCH_SIZE = 100
+
+# 이름 별칭 테이블 (같은 캐릭터로 취급할 이름 -> 대표 이름)
+NAME_ALIASES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "name_aliases.json"
+)
+
 # 매칭 확률 설정
 MATCHING_EARLY_PREDEFINED = 0.60
 MATCHING_EARLY_RANDOM = 0.40
@@ -29,9 +63,82 @@ MATCHING_MATURE_USER = 0.35
 MATCHING_GROWTH_THRESHOLD = 10
 MATCHING_MATURE_THRESHOLD = 50
 
+# 스탯 매칭 ("nearest": 풀 안에서 스탯이 가까운 상대 우선, "uniform": 기존 방식)
+MATCHMAKING_MODE = os.getenv("NAMEBATTLE_MATCHMAKING_MODE", "nearest")
+MATCHMAKING_RADIUS = 40.0  # 이 스탯 거리(유클리드) 안의 상대는 모두 후보 (없으면 가장 가까운 1명)
+MATCHMAKING_MAX_CANDIDATES = 64  # 반경 탐색 시 최대 후보 수
+MATCHMAKING_RANDOM_POOL_SIZE = 4096  # 랜덤 상대 스탯 표본 수 (이름은 매번 새로 생성)
+
 # 플레이어 승률 (약간 유리하게)
 PLAYER_WIN_RATE = 0.55
 
+# 승패 모델 ("stats": 스탯 기반 전투 모델, "coin": PLAYER_WIN_RATE 고정 확률)
+# stats 모델에서는 스탯 승률에 (PLAYER_WIN_RATE - 0.5)만큼 플레이어 보정을 더함
+COMBAT_MODEL = os.getenv("NAMEBATTLE_COMBAT_MODEL", "stats")
+COMBAT_MIN_WIN_RATE = 0.05
+COMBAT_MAX_WIN_RATE = 0.95
+
 # 애니메이션 타이밍 (초)
 ANIMATION_BATTLE_DURATION = 5.5
 ANIMATION_MATCHING_STEPS = 20
+
+# 부하 기반 단계적 기능 축소 (1: TTS 끔, 2: 이미지 캐시/플레이스홀더만, 3: 템플릿 스토리)
+DEGRADE_INFLIGHT_LEVELS = (4, 8, 12)  # 동시 진행 배틀 수가 이 값 이상이면 해당 단계
+DEGRADE_WINDOW_SECONDS = 120.0  # 지연/오류 표본 유지 시간
+DEGRADE_MIN_SAMPLES = 3
+DEGRADE_ERROR_RATE = 0.5  # 최근 오류율이 이 이상이면 해당 단계 축소
+DEGRADE_STAGE_LATENCY = {"tts": 15.0, "image": 25.0, "story": 15.0}  # 초 (중앙값 기준)
+DEGRADE_RECOVERY_SECONDS = 30.0  # 한 단계씩 복구하는 최소 간격
+
+# 외부 의존성 서킷 브레이커 (연속 실패 시 일정 시간 즉시 실패 처리)
+CIRCUIT_FAILURE_THRESHOLD = 3  # 연속 실패 횟수
+CIRCUIT_RESET_SECONDS = 30.0  # open 유지 시간 (이후 half-open 시험 호출 1건 허용)
+IMAGE_DOWNLOAD_CONNECT_TIMEOUT = 5.0  # 초 (응답 대기는 기존 30초 유지)
+
+# 배틀 스토리 프롬프트 버전 (services/prompts.py, "v1": 기존 프롬프트)
+STORY_PROMPT_VERSION = os.getenv("NAMEBATTLE_STORY_PROMPT", "v2")
+
+# 스토리 백엔드 ("ai": GPT/Gemini, "template": 오프라인 템플릿 엔진)
+STORY_BACKEND = os.getenv("NAMEBATTLE_STORY_BACKEND", "ai")
+STORY_TEMPLATE_FALLBACK = True  # AI 스토리 실패 시 템플릿 스토리로 대체 (False면 배틀 실패)
+
+# 생성 이미지 캐시 (여러 레플리카가 공유 볼륨을 가리키면 캐시/생성 중복 제거를 공유)
+IMAGE_CACHE_DIR = os.getenv(
+    "NAMEBATTLE_IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "images", "generated"),
+)
+SHARED_CACHE_LOCK_TIMEOUT = 90.0  # 초 (다른 프로세스의 생성 완료를 기다리는 최대 시간)
+
+# 비용/지연 집계 (단가는 USD 추정치 - 요금제가 바뀌면 갱신)
+LLM_PRICES_PER_1M = {  # 모델 -> (입력, 캐시 적중 입력, 출력) 100만 토큰당
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+}
+IMAGE_PRICES = {"dalle": 0.04, "local": 0.0}  # 백엔드 -> 장당 (DALL-E 3 standard 1024x1024)
+TTS_PRICE_PER_1K_CHARS = 0.05  # Typecast (크레딧 환산 추정)
+COST_LEDGER_PATH = os.path.join(RUNTIME_DATA_DIR, "cost_ledger.jsonl")
+
+# 비용 예산 (넘으면 이미지 생성/TTS를 끄고 경고 로그)
+SESSION_IMAGE_BUDGET = int(os.getenv("NAMEBATTLE_SESSION_IMAGE_BUDGET", "10"))  # 세션당 이미지 생성 장수
+SESSION_COST_BUDGET_USD = float(os.getenv("NAMEBATTLE_SESSION_COST_BUDGET", "0.5"))
+PROCESS_HOURLY_COST_BUDGET_USD = float(os.getenv("NAMEBATTLE_HOURLY_COST_BUDGET", "5.0"))
+# 같은 접속 IP의 모든 플레이어 합산 시간당 상한 (0이면 끔). 프록시/로드밸런서 뒤에서는 모든 접속이
+# 같은 IP로 보이므로 앱이 실제 클라이언트 IP를 받을 때만 켠다
+CLIENT_HOURLY_COST_BUDGET_USD = float(os.getenv("NAMEBATTLE_CLIENT_HOURLY_COST_BUDGET", "0"))
+COST_LEDGER_MAX_SESSIONS = 10000  # 세션별 누적을 유지할 최대 세션 수 (가장 오래 쓰지 않은 세션부터 제거)
+
+# 프로파일링 (기본 꺼짐. "cprofile": 함수별 시간 .prof, "sample": 스택 샘플링 .collapsed - 플레임그래프용)
+PROFILE_MODE = os.getenv("NAMEBATTLE_PROFILE", "")
+PROFILE_SAMPLE_EVERY = int(os.getenv("NAMEBATTLE_PROFILE_EVERY", "10"))  # 구간별 N번 중 1번만 프로파일
+PROFILE_SAMPLE_INTERVAL = 0.005  # 초 (sample 모드 스택 수집 주기)
+PROFILE_DIR = os.path.join(RUNTIME_DATA_DIR, "profiles")
+
+# 세션 메모리 예산 (넘으면 큰 페이로드를 블롭 저장소로 내보내고 쓸 때 다시 읽음)
+SESSION_MEMORY_BUDGET_BYTES = int(os.getenv("NAMEBATTLE_SESSION_MEMORY_BUDGET", str(2 * 1024 * 1024)))
+SESSION_SPILL_MIN_BYTES = 16 * 1024  # 이보다 작은 값은 내보내지 않음
+
+# 토너먼트 (참가 인원, 동시 진행 배틀 수, 단계별 분당 외부 호출 제한 - 0이면 제한 없음)
+TOURNAMENT_MIN_PLAYERS = 2
+TOURNAMENT_MAX_PLAYERS = 16
+TOURNAMENT_CONCURRENCY = 8
+TOURNAMENT_RATE_LIMITS = {"story": 120, "image": 30, "tts": 30}
@@ -0,0 +1,373 @@
+"""배틀 비용/지연 집계 + 세션/프로세스 예산
+
+배틀 1건 동안 외부 호출(LLM 토큰, 이미지 생성, TTS 글자 수)과 단계별 소요 시간을
+BattleCost에 모은다. 제공자 코드는 record_*만 호출하고, 어느 배틀에 붙일지는
+execute_battle_async가 track_battle로 잡아 둔 컨텍스트(contextvars)가 정한다.
+끝난 배틀은 CostLedger에 세션/프로세스 단위로 누적하고 JSONL로 남긴다 (scripts/cost_report.py).
+"""
+
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+from config.settings import (
+    CLIENT_HOURLY_COST_BUDGET_USD,
+    COST_LEDGER_MAX_SESSIONS,
+    COST_LEDGER_PATH,
+    IMAGE_PRICES,
+    LLM_PRICES_PER_1M,
+    PROCESS_HOURLY_COST_BUDGET_USD,
+    SESSION_COST_BUDGET_USD,
+    SESSION_IMAGE_BUDGET,
+    TTS_PRICE_PER_1K_CHARS,
+)
+from core.models import BattleCost
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[BattleCost | None] = ContextVar("battle_cost", default=None)
+
+
+@contextmanager
+def track_battle(cost: BattleCost):
+    """이 블록 안(및 여기서 만든 태스크/워커 스레드)의 record_* 호출을 cost에 누적"""
+    token = _current.set(cost)
+    try:
+        yield cost
+    finally:
+        _current.reset(token)
+
+
+def llm_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    price_in, price_cached, price_out = LLM_PRICES_PER_1M.get(model, (0.0, 0.0, 0.0))
+    return (
+        (input_tokens - cached_tokens) * price_in
+        + cached_tokens * price_cached
+        + output_tokens * price_out
+    ) / 1_000_000
+
+
+def record_llm(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> None:
+    cost = _current.get()
+    if cost is None:
+        return
+    cost.llm_calls += 1
+    cost.input_tokens += input_tokens
+    cost.output_tokens += output_tokens
+    cost.cached_tokens += cached_tokens
+    cost.cost_usd += llm_cost(model, input_tokens, output_tokens, cached_tokens)
+
+
+def record_image(backend: str) -> None:
+    cost = _current.get()
+    if cost is None:
+        return
+    cost.images_generated += 1
+    cost.cost_usd += IMAGE_PRICES.get(backend, 0.0)
+
+
+def record_tts(chars: int) -> None:
+    cost = _current.get()
+    if cost is None:
+        return
+    cost.tts_chars += chars
+    cost.cost_usd += chars / 1000 * TTS_PRICE_PER_1K_CHARS
+
+
+def record_duration(stage: str, seconds: float) -> None:
+    """단계 소요 시간 누적 (같은 단계가 여러 번이면 합산 - 예: 이미지 2장)"""
+    cost = _current.get()
+    if cost is None:
+        return
+    cost.durations[stage] = cost.durations.get(stage, 0.0) + seconds
+
+
+@dataclass
+class SessionUsage:
+    battles: int = 0
+    images_generated: int = 0
+    tts_chars: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def summarize(records: list[dict]) -> dict:
+    """원장 레코드(JSONL 한 줄 = 배틀 1건) 목록 -> 집계 리포트"""
+    report = {
+        "battles": len(records),
+        "sessions": len({r.get("session_id") for r in records}),
+        "cost_usd": sum(r["cost_usd"] for r in records),
+        "llm_calls": sum(r["llm_calls"] for r in records),
+        "input_tokens": sum(r["input_tokens"] for r in records),
+        "output_tokens": sum(r["output_tokens"] for r in records),
+        "cached_tokens": sum(r["cached_tokens"] for r in records),
+        "images_generated": sum(r["images_generated"] for r in records),
+        "tts_chars": sum(r["tts_chars"] for r in records),
+        "story_sources": dict(Counter(r["story_source"] for r in records)),
+        "image_sources": dict(Counter(s for r in records for s in r["image_sources"].values())),
+        "durations": {},
+    }
+    report["cost_per_battle"] = report["cost_usd"] / len(records) if records else 0.0
+    stages: dict[str, list[float]] = {}
+    for r in records:
+        for stage, seconds in r["durations"].items():
+            stages.setdefault(stage, []).append(seconds)
+    for stage, values in sorted(stages.items()):
+        report["durations"][stage] = {
+            "p50": statistics.median(values),
+            "p95": _percentile(values, 0.95),
+        }
+    return report
+
+
+class CostLedger:
+    """프로세스 공유 비용 원장 (세션별 누적, 최근 1시간 지출, 예산 경고)
+
+    세션은 플레이어 ID 단위이고, bind_client로 묶은 접속 키(IP 해시)에는 여러 플레이어가 함께 쓰는
+    느슨한 시간당 상한(CLIENT_HOURLY_COST_BUDGET_USD)을 따로 건다 (쿠키를 지워 세션 예산을 새로 받는 남용 방지).
+    세션/접속 키별 누적은 max_sessions개까지 LRU로 유지하고, 경고 중복 방지 키도 제거된 세션/지난 시간대 것은 버린다.
+    """
+
+    def __init__(
+        self,
+        path: str | None = COST_LEDGER_PATH,
+        clock=time.time,
+        maxlen: int = 5000,
+        max_sessions: int = COST_LEDGER_MAX_SESSIONS,
+    ):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._records: deque[dict] = deque(maxlen=maxlen)
+        self._sessions: OrderedDict[str, SessionUsage] = OrderedDict()
+        self._clients: OrderedDict[str, tuple[int, float]] = OrderedDict()  # 접속 키(IP 해시) -> (시간대, 비용)
+        self._client_of: OrderedDict[str, str] = OrderedDict()  # 세션 -> 접속 키
+        self._reserved: dict[str, SessionUsage] = {}  # 세션 -> 진행 중 배틀이 선점한 이미지/TTS (기록 전)
+        self._reserved_cost = 0.0  # 전체 선점 비용 (프로세스 시간당 예산용)
+        self._max_sessions = max_sessions
+        self._hourly: deque[tuple[float, float]] = deque()  # (시각, 비용)
+        self._alerted: set[str] = set()
+        self._hour_key = ""  # 마지막 시간대 경고 키
+        self.alerts: deque[str] = deque(maxlen=100)
+
+    def _hourly_cost(self, now: float) -> float:
+        while self._hourly and now - self._hourly[0][0] > 3600:
+            self._hourly.popleft()
+        return sum(c for _, c in self._hourly)
+
+    def _session_usage(self, session_id: str) -> SessionUsage:
+        """세션 누적 (최근 사용으로 갱신, 넘치면 가장 오래 쓰지 않은 세션과 그 경고 키 제거)"""
+        usage = self._sessions.get(session_id)
+        if usage is not None:
+            self._sessions.move_to_end(session_id)
+            return usage
+        usage = self._sessions[session_id] = SessionUsage()
+        while len(self._sessions) > self._max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            self._alerted.discard(f"images:{evicted}")
+            self._alerted.discard(f"cost:{evicted}")
+        return usage
+
+    def _client_cost(self, client_key: str | None, now: float) -> float:
+        """접속 키의 이번 시간대 지출 (지난 시간대 값은 0)"""
+        hour, cost = self._clients.get(client_key, (0, 0.0)) if client_key else (0, 0.0)
+        return cost if hour == int(now // 3600) else 0.0
+
+    def bind_client(self, session_id: str, client_key: str | None) -> None:
+        """세션을 접속 키에 묶음 (세션 시작 시 1회, client_key가 없으면 접속 상한 없음)"""
+        if not session_id or not client_key:
+            return
+        with self._lock:
+            self._client_of[session_id] = client_key
+            self._client_of.move_to_end(session_id)
+            while len(self._client_of) > self._max_sessions:
+                self._client_of.popitem(last=False)
+
+    def _alert(self, key: str, message: str) -> None:
+        if key in self._alerted:
+            return
+        self._alerted.add(key)
+        self.alerts.append(message)
+        logger.warning("비용 예산 경고: %s", message)
+
+    def session(self, session_id: str) -> SessionUsage:
+        with self._lock:
+            return SessionUsage(**asdict(self._sessions.get(session_id, SessionUsage())))
+
+    def _committed(self, session_id: str) -> tuple[int, float]:
+        """세션의 (기록된 + 선점된) 이미지 수, 비용"""
+        usage = self._sessions.get(session_id)
+        held = self._reserved.get(session_id)
+        images = (usage.images_generated if usage else 0) + (held.images_generated if held else 0)
+        cost = (usage.cost_usd if usage else 0.0) + (held.cost_usd if held else 0.0)
+        return images, cost
+
+    def limits(self, session_id: str | None) -> set[str]:
+        """예산 때문에 꺼야 할 기능 ("image", "tts") - 진행 중 배틀의 선점분 포함"""
+        limited = set()
+        with self._lock:
+            if self._hourly_cost(self._clock()) + self._reserved_cost >= PROCESS_HOURLY_COST_BUDGET_USD:
+                limited |= {"image", "tts"}
+            if session_id:
+                images, cost = self._committed(session_id)
+                if images >= SESSION_IMAGE_BUDGET:
+                    limited.add("image")
+                if cost >= SESSION_COST_BUDGET_USD:
+                    limited |= {"image", "tts"}
+            if session_id and CLIENT_HOURLY_COST_BUDGET_USD > 0:
+                if self._client_cost(self._client_of.get(session_id), self._clock()) >= CLIENT_HOURLY_COST_BUDGET_USD:
+                    limited |= {"image", "tts"}
+        return limited
+
+    def reserve(
+        self,
+        session_id: str | None,
+        held: SessionUsage,
+        images: int = 0,
+        tts_chars: int = 0,
+        image_backend: str = "",
+    ) -> bool:
+        """이미지/TTS 호출 직전에 예산 선점 (넘으면 False, 성공하면 held에 누적)
+
+        같은 세션의 배틀이 동시에 여럿 진행돼도(토너먼트) 기록 전 사용량까지 예산에 들어간다.
+        배틀이 record된 뒤 release(session_id, held)로 반납한다.
+        """
+        cost_usd = images * IMAGE_PRICES.get(image_backend, 0.0) + tts_chars / 1000 * TTS_PRICE_PER_1K_CHARS
+        with self._lock:
+            now = self._clock()
+            if self._hourly_cost(now) + self._reserved_cost >= PROCESS_HOURLY_COST_BUDGET_USD:
+                return False
+            if session_id:
+                used_images, used_cost = self._committed(session_id)
+                if images and used_images + images > SESSION_IMAGE_BUDGET:
+                    return False
+                if used_cost >= SESSION_COST_BUDGET_USD:
+                    return False
+                if CLIENT_HOURLY_COST_BUDGET_USD > 0:
+                    if self._client_cost(self._client_of.get(session_id), now) >= CLIENT_HOURLY_COST_BUDGET_USD:
+                        return False
+                reserved = self._reserved.setdefault(session_id, SessionUsage())
+                reserved.images_generated += images
+                reserved.tts_chars += tts_chars
+                reserved.cost_usd += cost_usd
+            self._reserved_cost += cost_usd
+        held.images_generated += images
+        held.tts_chars += tts_chars
+        held.cost_usd += cost_usd
+        return True
+
+    def release(self, session_id: str | None, held: SessionUsage) -> None:
+        """reserve로 선점한 양 반납 (배틀을 record한 뒤 호출 - 잠깐 이중으로 세는 쪽이 안전)"""
+        with self._lock:
+            self._reserved_cost = max(0.0, self._reserved_cost - held.cost_usd)
+            reserved = self._reserved.get(session_id) if session_id else None
+            if reserved is not None:
+                reserved.images_generated -= held.images_generated
+                reserved.tts_chars -= held.tts_chars
+                reserved.cost_usd -= held.cost_usd
+                if reserved.images_generated <= 0 and reserved.tts_chars <= 0:
+                    del self._reserved[session_id]
+
+    def record(self, session_id: str | None, battle_id: str, cost: BattleCost) -> None:
+        """끝난 배틀 1건 누적 + 예산 초과 시 경고 + 원장 파일에 한 줄 추가"""
+        now = self._clock()
+        record = {"at": now, "session_id": session_id or "", "battle_id": battle_id, **asdict(cost)}
+        with self._lock:
+            self._records.append(record)
+            self._hourly.append((now, cost.cost_usd))
+            hourly = self._hourly_cost(now)
+            if hourly >= PROCESS_HOURLY_COST_BUDGET_USD:
+                hour_key = f"hourly:{int(now // 3600)}"
+                if hour_key != self._hour_key:
+                    self._alerted.discard(self._hour_key)  # 지난 시간대 키는 다시 쓰이지 않음
+                    self._hour_key = hour_key
+                self._alert(hour_key,
+                            f"최근 1시간 지출 ${hourly:.2f} >= ${PROCESS_HOURLY_COST_BUDGET_USD:.2f}")
+            if session_id:
+                usage = self._session_usage(session_id)
+                usage.battles += 1
+                usage.images_generated += cost.images_generated
+                usage.tts_chars += cost.tts_chars
+                usage.input_tokens += cost.input_tokens
+                usage.output_tokens += cost.output_tokens
+                usage.cost_usd += cost.cost_usd
+                if usage.images_generated >= SESSION_IMAGE_BUDGET:
+                    self._alert(f"images:{session_id}",
+                                f"세션 {session_id[:8]} 이미지 생성 {usage.images_generated}장 (예산 {SESSION_IMAGE_BUDGET})")
+                if usage.cost_usd >= SESSION_COST_BUDGET_USD:
+                    self._alert(f"cost:{session_id}",
+                                f"세션 {session_id[:8]} 지출 ${usage.cost_usd:.2f} (예산 ${SESSION_COST_BUDGET_USD:.2f})")
+                client_key = self._client_of.get(session_id)
+                if client_key and CLIENT_HOURLY_COST_BUDGET_USD > 0:
+                    before = self._client_cost(client_key, now)
+                    client_cost = before + cost.cost_usd
+                    self._clients[client_key] = (int(now // 3600), client_cost)
+                    self._clients.move_to_end(client_key)
+                    while len(self._clients) > self._max_sessions:
+                        self._clients.popitem(last=False)
+                    if before < CLIENT_HOURLY_COST_BUDGET_USD <= client_cost:
+                        logger.warning("접속 %s 시간당 지출 $%.2f (상한 $%.2f)",
+                                       client_key[:11], client_cost, CLIENT_HOURLY_COST_BUDGET_USD)
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning("비용 원장 기록 실패: %s", e)
+
+    def report(self) -> dict:
+        """이 프로세스의 최근 배틀 집계 + 최근 1시간 지출 + 경고"""
+        with self._lock:
+            records = list(self._records)
+            hourly = self._hourly_cost(self._clock())
+            top = sorted(self._sessions.items(), key=lambda kv: kv[1].cost_usd, reverse=True)[:10]
+            alerts = list(self.alerts)
+        report = summarize(records)
+        report["hourly_cost_usd"] = hourly
+        report["top_sessions"] = [{"session_id": sid, **asdict(usage)} for sid, usage in top]
+        report["alerts"] = alerts
+        return report
+
+
+def load_ledger(path: str = COST_LEDGER_PATH, since: float = 0.0) -> list[dict]:
+    """원장 파일의 레코드 (여러 프로세스가 같은 파일에 추가한 것 포함)"""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("at", 0) >= since:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+_ledger: CostLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_cost_ledger() -> CostLedger:
+    """프로세스 전역 비용 원장"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CostLedger()
+        return _ledger
@@ -0,0 +1,162 @@
+"""에셋 매니페스트 - 캐릭터 이미지/사운드 파일 목록을 시작 시 한 번 만들어 조회
+
+논리 이름(파일명, NFC 정규화) -> 경로, 크기, sha256, 이미지 크기.
+빌드 산출물(assets/manifest.json)이 있으면 그것을 쓰고, 없으면 디렉토리를 한 번 스캔한다.
+사전 정의 상대 풀의 image_file 참조도 매니페스트로 검증하고, 깨진 참조의 상대는 풀에서 제외한다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+ASSETS_DIR = os.path.join(_PROJECT_ROOT, "assets")
+CHARACTER_IMG_DIR = os.path.join(ASSETS_DIR, "images", "characters")
+SOUNDS_DIR = os.path.join(ASSETS_DIR, "sounds")
+MANIFEST_PATH = os.path.join(ASSETS_DIR, "manifest.json")
+
+
+@dataclass
+class AssetEntry:
+    name: str
+    path: str  # 프로젝트 루트 기준 상대 경로
+    size: int
+    sha256: str
+    width: int = 0
+    height: int = 0
+
+    @property
+    def abspath(self) -> str:
+        return os.path.join(_PROJECT_ROOT, self.path)
+
+
+def _logical_name(filename: str) -> str:
+    # macOS(NFD)와 리눅스(NFC) 파일명 차이 흡수
+    return unicodedata.normalize("NFC", filename)
+
+
+def _scan_dir(directory: str, with_dimensions: bool) -> dict[str, AssetEntry]:
+    entries: dict[str, AssetEntry] = {}
+    if not os.path.isdir(directory):
+        logger.warning("에셋 디렉토리 없음: %s", directory)
+        return entries
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        entry = AssetEntry(
+            name=_logical_name(filename),
+            path=os.path.relpath(path, _PROJECT_ROOT),
+            size=len(data),
+            sha256=hashlib.sha256(data).hexdigest(),
+        )
+        if with_dimensions:
+            try:
+                from PIL import Image
+
+                with Image.open(path) as img:
+                    entry.width, entry.height = img.size
+            except Exception as e:
+                logger.warning("이미지 크기 확인 실패: %s (%s)", filename, e)
+        entries[entry.name] = entry
+    return entries
+
+
+@dataclass
+class AssetManifest:
+    images: dict
+    sounds: dict
+    disabled_characters: set = field(default_factory=set)  # image_file 참조가 깨진 사전 정의 상대 이름
+
+    def image(self, filename: str) -> AssetEntry | None:
+        return self.images.get(_logical_name(filename))
+
+    def sound(self, filename: str) -> AssetEntry | None:
+        return self.sounds.get(_logical_name(filename))
+
+    def to_dict(self) -> dict:
+        return {
+            "images": {k: asdict(v) for k, v in self.images.items()},
+            "sounds": {k: asdict(v) for k, v in self.sounds.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AssetManifest":
+        return cls(
+            images={k: AssetEntry(**v) for k, v in data.get("images", {}).items()},
+            sounds={k: AssetEntry(**v) for k, v in data.get("sounds", {}).items()},
+        )
+
+
+def build_manifest() -> AssetManifest:
+    """에셋 디렉토리를 스캔해 매니페스트 생성"""
+    return AssetManifest(
+        images=_scan_dir(CHARACTER_IMG_DIR, with_dimensions=True),
+        sounds=_scan_dir(SOUNDS_DIR, with_dimensions=False),
+    )
+
+
+def write_manifest(manifest: AssetManifest, path: str = MANIFEST_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest.to_dict(), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def broken_image_refs(manifest: AssetManifest, characters: list[dict]) -> dict[str, str]:
+    """image_file이 매니페스트에 없거나 파일이 사라진 사전 정의 상대 -> {이름: 파일명}"""
+    broken = {}
+    for c in characters:
+        filename = c.get("image_file")
+        if not filename:
+            continue
+        entry = manifest.image(filename)
+        if entry is None or not os.path.isfile(entry.abspath):
+            broken[c.get("name", "?")] = filename
+    return broken
+
+
+def validate_predefined_pool(manifest: AssetManifest, characters: list[dict]) -> list[str]:
+    """사전 정의 상대의 image_file 참조 검사 -> 오류 메시지 목록"""
+    return [
+        f"{name}: image_file '{filename}' 없음"
+        for name, filename in broken_image_refs(manifest, characters).items()
+    ]
+
+
+def read_manifest_file(path: str = MANIFEST_PATH) -> AssetManifest | None:
+    """빌드 산출물 매니페스트 읽기 (없거나 손상되면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return AssetManifest.from_dict(json.load(f))
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.warning("에셋 매니페스트 손상, 다시 스캔합니다: %s", e)
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_manifest() -> AssetManifest:
+    """프로세스 공유 매니페스트 (빌드 산출물 우선, 없으면 스캔)
+
+    최초 1회 사전 정의 상대 풀을 검증해 깨진 참조의 상대를 disabled_characters에 기록한다
+    (load_predefined_pool이 매칭 풀에서 제외).
+    """
+    manifest = read_manifest_file() or build_manifest()
+
+    from core.opponent_generator import load_predefined_pool
+
+    characters, _ = load_predefined_pool(check_assets=False)
+    broken = broken_image_refs(manifest, characters)
+    for name, filename in broken.items():
+        logger.error("사전 정의 상대 에셋 오류 - %s: image_file '%s' 없음 (매칭 풀에서 제외)", name, filename)
+    manifest.disabled_characters = set(broken)
+    return manifest
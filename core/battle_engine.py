@@ -1,44 +1,62 @@
 """배틀 엔진 - 전체 배틀 흐름 오케스트레이션"""
 
+import asyncio
 import base64
 import hashlib
 import io
 import logging
 import os
 import random
-
-import requests as req
-from PIL import Image
-
-from config.settings import PLAYER_WIN_RATE
-from core.models import Fighter, BattleResult, BattleRound
-from services.ai_service import generate_battle_story, generate_character_image
-from services.tts_service import generate_tts_audio
-
-_PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
-IMAGE_CACHE_DIR = os.path.join(_PROJECT_ROOT, "assets", "images", "generated")
-CHARACTER_IMG_DIR = os.path.join(_PROJECT_ROOT, "assets", "images", "characters")
-
+import time
+
+from config.settings import (
+    COMBAT_MAX_WIN_RATE,
+    COMBAT_MIN_WIN_RATE,
+    COMBAT_MODEL,
+    IMAGE_CACHE_DIR,
+    IMAGE_DOWNLOAD_CONNECT_TIMEOUT,
+    PLAYER_WIN_RATE,
+    STORY_BACKEND,
+    STORY_TEMPLATE_FALLBACK,
+)
+from core.accounting import SessionUsage, get_cost_ledger, record_duration, record_image, track_battle
+from core.assets import get_manifest
+from core.circuit_breaker import CircuitOpenError, get_breaker
+from core.degradation import (
+    LEVEL_NO_IMAGE_GEN,
+    LEVEL_NO_TTS,
+    LEVEL_TEMPLATE_STORY,
+    get_degradation,
+)
+from core.models import BattleCost, Fighter, BattleResult, BattleRound
+from core.names import name_key
+from core.portrait import placeholder_portrait_base64
+from core.profiling import profiled
+from core.replay import battle_rng, new_battle_id, new_battle_seed
+from core.shared_cache import SharedFileCache
+from core.stats import stats_from_name
+from services.ai_service import generate_battle_story_async, openai_client_scope
+from services.image_backends import ImageBackend, get_image_backend
+from services.story_templates import generate_template_story
+from services.tts_service import generate_tts_audio_async
+
+# PIL/httpx/NumPy는 실제로 쓰는 함수 안에서 불러온다 (import 시점 비용 최소화)
 logger = logging.getLogger(__name__)
 
-# 시작 시 캐릭터 이미지 디렉토리 진단
-print(f"[DIAG] PROJECT_ROOT: {_PROJECT_ROOT}")
-print(f"[DIAG] CHARACTER_IMG_DIR: {CHARACTER_IMG_DIR}")
-print(f"[DIAG] DIR exists: {os.path.exists(CHARACTER_IMG_DIR)}")
-if os.path.exists(CHARACTER_IMG_DIR):
-    _files = os.listdir(CHARACTER_IMG_DIR)
-    print(f"[DIAG] Files ({len(_files)}): {_files}")
-else:
-    print("[DIAG] CHARACTER_IMG_DIR does NOT exist!")
-    # 상위 디렉토리 확인
-    _parent = os.path.dirname(CHARACTER_IMG_DIR)
-    print(f"[DIAG] Parent dir exists: {os.path.exists(_parent)}")
-    if os.path.exists(_parent):
-        print(f"[DIAG] Parent contents: {os.listdir(_parent)}")
+# 생성 이미지 캐시 (원자적 쓰기 + 프로세스/노드 간 single-flight)
+_image_cache = SharedFileCache()
 
 
 def _cache_key(name: str) -> str:
-    """캐릭터 이름으로 캐시 파일 경로 반환"""
+    """캐릭터 이름으로 캐시 파일 경로 반환 (정규화된 이름 키 기준)"""
+    key = name_key(name)
+    h = hashlib.md5(key.encode()).hexdigest()[:12]
+    safe = "".join(c if c.isalnum() else "_" for c in key)
+    return os.path.join(IMAGE_CACHE_DIR, f"{safe}_{h}.b64")
+
+
+def _legacy_cache_key(name: str) -> str:
+    """정규화 도입 이전의 캐시 파일 경로 (strip + lower)"""
     h = hashlib.md5(name.strip().lower().encode()).hexdigest()[:12]
     safe = "".join(c if c.isalnum() else "_" for c in name.strip())
     return os.path.join(IMAGE_CACHE_DIR, f"{safe}_{h}.b64")
@@ -47,25 +65,25 @@ def _cache_key(name: str) -> str:
 def load_cached_image(name: str) -> str | None:
     """캐시된 이미지 base64 로드. 없으면 None"""
     path = _cache_key(name)
-    if os.path.exists(path):
+    if not os.path.exists(path):
+        # 이전 키로 저장된 캐시는 새 키로 옮겨서 재사용
+        legacy = _legacy_cache_key(name)
+        if legacy == path or not os.path.exists(legacy):
+            return None
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = f.read().strip()
-            if data:
-                logger.info("캐시 이미지 사용: %s", name)
-                return data
-        except Exception:
-            pass
-    return None
+            os.replace(legacy, path)
+        except OSError:
+            path = legacy
+    data = _image_cache.get(path)
+    if data:
+        logger.info("캐시 이미지 사용: %s", name)
+    return data
 
 
 def save_cached_image(name: str, b64: str) -> None:
-    """이미지 base64를 캐시에 저장"""
-    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
-    path = _cache_key(name)
+    """이미지 base64를 캐시에 저장 (원자적 교체 - 읽는 쪽은 항상 완성된 파일만 본다)"""
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(b64)
+        _image_cache.put(_cache_key(name), b64)
         logger.info("이미지 캐시 저장: %s", name)
     except Exception as e:
         logger.warning("이미지 캐시 저장 실패: %s", e)
@@ -73,13 +91,13 @@ def save_cached_image(name: str, b64: str) -> None:
 
 def load_local_image_as_base64(filename: str) -> str:
     """로컬 캐릭터 이미지 파일을 512x512 base64로 반환"""
-    path = os.path.join(CHARACTER_IMG_DIR, filename)
-    if not os.path.exists(path):
-        logger.warning("로컬 이미지 없음: %s (경로: %s, 디렉토리 존재: %s)",
-                       filename, path, os.path.exists(CHARACTER_IMG_DIR))
-        if os.path.exists(CHARACTER_IMG_DIR):
-            logger.warning("디렉토리 내 파일: %s", os.listdir(CHARACTER_IMG_DIR))
+    from PIL import Image
+
+    entry = get_manifest().image(filename)
+    if entry is None:
+        logger.warning("로컬 이미지 없음 (매니페스트에 없음): %s", filename)
         return ""
+    path = entry.abspath
     img = Image.open(path)
     img = img.resize((512, 512), Image.LANCZOS)
     buffer = io.BytesIO()
@@ -87,33 +105,170 @@ def load_local_image_as_base64(filename: str) -> str:
     return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
-def download_image_as_base64(url: str) -> str:
-    """URL에서 이미지를 다운로드하여 512x512 base64 문자열로 반환"""
-    resp = req.get(url, timeout=30)
-    resp.raise_for_status()
-    img = Image.open(io.BytesIO(resp.content))
+def _resize_to_png_base64(content: bytes) -> str:
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(content))
     img = img.resize((512, 512), Image.LANCZOS)
     buffer = io.BytesIO()
     img.save(buffer, format="PNG")
     return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
 
-def determine_winner(player_name: str, opponent_name: str) -> str:
-    """승패 사전 결정 (플레이어 승률 55%)"""
-    if random.random() < PLAYER_WIN_RATE:
+def _url_breaker(url: str):
+    """이미지 호스트별 서킷 브레이커 (죽은 호스트는 타임아웃 대신 즉시 실패)"""
+    from urllib.parse import urlsplit
+
+    return get_breaker(f"image_url:{urlsplit(url).netloc}")
+
+
+async def download_image_as_base64_async(url: str) -> str:
+    """URL에서 이미지를 다운로드하여 512x512 base64 문자열로 반환 (httpx)"""
+    import httpx
+
+    timeout = httpx.Timeout(30, connect=IMAGE_DOWNLOAD_CONNECT_TIMEOUT)
+    with _url_breaker(url).guard():
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+    return await asyncio.to_thread(_resize_to_png_base64, resp.content)
+
+
+async def load_cached_image_async(name: str) -> str | None:
+    """load_cached_image의 asyncio 버전 (워커 스레드 파일 I/O)"""
+    return await asyncio.to_thread(load_cached_image, name)
+
+
+async def save_cached_image_async(name: str, b64: str) -> None:
+    """save_cached_image의 asyncio 버전 (워커 스레드 파일 I/O)"""
+    await asyncio.to_thread(save_cached_image, name, b64)
+
+
+async def get_or_create_cached_image_async(name: str, produce) -> str:
+    """캐시에 없을 때만 produce()로 만들어 저장 (produce: 코루틴을 돌려주는 함수)
+
+    같은 이름을 여러 세션/프로세스/노드가 동시에 요청해도 한 곳에서만 생성하고
+    나머지는 락이 풀린 뒤 캐시된 결과를 읽는다.
+    """
+    return await _image_cache.aget_or_create(_cache_key(name), produce)
+
+
+async def _gather_or_cancel(*aws):
+    """gather + 하나라도 실패하면 나머지 작업을 즉시 취소"""
+    tasks = [asyncio.ensure_future(a) for a in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+
+
+def player_win_probability(
+    player_stats: dict | None,
+    opponent_stats: dict | None,
+    player_name: str = "",
+    opponent_name: str = "",
+) -> float:
+    """플레이어 승리 확률 (stats 모델이고 양쪽 스탯이 있으면 전투 모델, 아니면 고정 승률)
+
+    둘 다 사전 정의 상대(이름과 스탯이 풀과 같음)면 몬테카를로 승률 행렬, 아니면 닫힌 형태 근사.
+    """
+    if COMBAT_MODEL != "stats" or not player_stats or not opponent_stats:
+        return PLAYER_WIN_RATE
+    from core.combat_sim import pool_win_probability, stats_to_array, win_probability
+
+    p = pool_win_probability(player_name, player_stats, opponent_name, opponent_stats)
+    if p is None:
+        arrays = stats_to_array([player_stats, opponent_stats])
+        p = float(win_probability(arrays[0], arrays[1]))
+    p += PLAYER_WIN_RATE - 0.5
+    return min(COMBAT_MAX_WIN_RATE, max(COMBAT_MIN_WIN_RATE, p))
+
+
+def determine_winner(
+    player_name: str,
+    opponent_name: str,
+    rng: random.Random | None = None,
+    player_stats: dict | None = None,
+    opponent_stats: dict | None = None,
+) -> str:
+    """승패 사전 결정 (스탯 전투 모델 또는 플레이어 승률 55%, rng: 배틀 RNG)"""
+    if (rng or random).random() < player_win_probability(player_stats, opponent_stats, player_name, opponent_name):
         return player_name
     return opponent_name
 
 
+def battle_winner(player_name: str, opponent: Fighter, seed: int, player_stats: dict | None = None) -> str:
+    """시드로 정해지는 배틀 승자 이름 (execute_battle과 같은 결과 - 배틀 전에 대진을 미리 계산할 때)"""
+    return determine_winner(
+        player_name, opponent.name, battle_rng(seed, "winner"),
+        player_stats or stats_from_name(player_name), opponent.stats or stats_from_name(opponent.name),
+    )
+
+
 def execute_battle(
     player_name: str,
     opponent: Fighter,
     progress_callback=None,
     tts_enabled: bool = True,
     gemini_client=None,
+    image_backend: ImageBackend | None = None,
+    image_callback=None,
+    seed: int | None = None,
+    degradation_level: int | None = None,
+    story_backend: str | None = None,
+    session_id: str | None = None,
+    rate_limiters: dict | None = None,
+    player: Fighter | None = None,
+) -> BattleResult:
+    """
+    배틀 전체 실행 (execute_battle_async의 동기 래퍼).
+
+    콜백은 호출한 스레드에서 실행되므로 Streamlit 스크립트 스레드에서 그대로 쓸 수 있다.
+    콜백에서 예외가 나면 (예: 사용자가 페이지를 떠나 rerun 발생) 진행 중인 API 호출이 모두 취소된다.
+    NAMEBATTLE_PROFILE이 설정되어 있으면 N번 중 1번 "battle" 구간으로 프로파일한다.
+    인자는 execute_battle_async와 동일.
+    """
+    with profiled("battle"):
+        return asyncio.run(execute_battle_async(
+            player_name=player_name,
+            opponent=opponent,
+            progress_callback=progress_callback,
+            tts_enabled=tts_enabled,
+            gemini_client=gemini_client,
+            image_backend=image_backend,
+            image_callback=image_callback,
+            seed=seed,
+            degradation_level=degradation_level,
+            story_backend=story_backend,
+            session_id=session_id,
+            rate_limiters=rate_limiters,
+            player=player,
+        ))
+
+
+async def execute_battle_async(
+    player_name: str,
+    opponent: Fighter,
+    progress_callback=None,
+    tts_enabled: bool = True,
+    gemini_client=None,
+    image_backend: ImageBackend | None = None,
+    image_callback=None,
+    seed: int | None = None,
+    degradation_level: int | None = None,
+    story_backend: str | None = None,
+    session_id: str | None = None,
+    rate_limiters: dict | None = None,
+    player: Fighter | None = None,
 ) -> BattleResult:
     """
-    배틀 전체 실행.
+    배틀 전체 실행 (asyncio).
+
+    스토리 생성, 두 캐릭터 이미지, TTS를 동시에 진행한다. 스토리 결과가 필요한 단계
+    (이미지 외형 묘사, 나레이션)만 스토리 작업을 기다린다. 이 코루틴을 취소하면
+    진행 중인 모든 API 호출이 함께 취소된다.
 
     Args:
         player_name: 플레이어 이름
@@ -121,144 +276,319 @@ def execute_battle(
         progress_callback: 진행 상태 콜백 (단계, 메시지)
         tts_enabled: TTS 활성화 여부
         gemini_client: Gemini 클라이언트 (None이면 GPT-4o-mini 사용)
+        image_backend: 이미지 생성 백엔드 (None이면 설정의 IMAGE_BACKEND)
+        image_callback: 이미지 갱신 콜백 (역할 "player"/"opponent", Fighter).
+            플레이스홀더 초상화로 즉시 1회, 실제 이미지가 준비되면 다시 호출
+        seed: 배틀 시드 (None이면 새로 발급). 승패는 이 시드의 RNG로 결정
+        degradation_level: 기능 축소 단계 (None이면 부하/지연/오류로 자동 결정)
+        story_backend: "ai" 또는 "template" (None이면 설정의 STORY_BACKEND)
+        session_id: 비용 집계/예산 단위 (None이면 세션 예산 없이 프로세스 예산만 적용)
+        rate_limiters: 단계("story"/"image"/"tts") -> AsyncRateLimiter. 여러 배틀이 공유하면
+            제공자 호출 속도를 배틀 전체에 걸쳐 제한 (토너먼트)
+        player: 플레이어 Fighter (None이면 player_name으로 새로 만듦). 토너먼트에서
+            부전승 상대처럼 스탯/이미지가 정해진 전투사가 플레이어 자리에 설 때
 
     Returns:
         BattleResult
     """
+    started = time.perf_counter()
+    if seed is None:
+        seed = new_battle_seed()
+
+    # 부하가 높거나 외부 API가 느리면 TTS -> 이미지 생성 -> AI 스토리 순으로 건너뜀
+    degradation = get_degradation()
+    if degradation_level is None:
+        degradation_level = degradation.level()
+    degraded = []
+    if tts_enabled and degradation_level >= LEVEL_NO_TTS:
+        tts_enabled = False
+        degraded.append("tts")
+    allow_image_gen = degradation_level < LEVEL_NO_IMAGE_GEN
+    if not allow_image_gen:
+        degraded.append("image")
+    if degradation_level >= LEVEL_TEMPLATE_STORY:
+        degraded.append("story")
+
+    # 세션/프로세스 비용 예산을 넘었으면 이미지 생성/TTS를 끔
+    ledger = get_cost_ledger()
+    limited = ledger.limits(session_id)
+    if tts_enabled and "tts" in limited:
+        tts_enabled = False
+        degraded.append("tts")
+    if allow_image_gen and "image" in limited:
+        allow_image_gen = False
+        degraded.append("image")
+    cost = BattleCost()
+    # 호출 직전에 선점한 이미지/TTS 예산 (동시에 도는 같은 세션 배틀끼리 예산을 넘지 않게, 기록 후 반납)
+    held = SessionUsage()
+
+    async def _timed(stage: str, coro):
+        # 외부 호출 지연/실패를 축소 컨트롤러에 기록 (속도 제한 대기 시간은 제외)
+        limiter = (rate_limiters or {}).get(stage)
+        if limiter is not None:
+            try:
+                await limiter.acquire()
+            except BaseException:
+                coro.close()
+                raise
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except (asyncio.CancelledError, CircuitOpenError):
+            raise
+        except Exception:
+            degradation.record(stage, time.perf_counter() - start, ok=False)
+            record_duration(stage, time.perf_counter() - start)
+            raise
+        degradation.record(stage, time.perf_counter() - start, ok=result is not None)
+        record_duration(stage, time.perf_counter() - start)
+        return result
+
+    last_step = 0
 
     def _progress(step: int, msg: str):
+        # 단계가 병렬로 진행되므로 진행률은 뒤로 가지 않게 보정
+        nonlocal last_step
+        last_step = max(last_step, step)
         if progress_callback:
-            progress_callback(step, msg)
+            progress_callback(last_step, msg)
+
+    def _image_ready(role: str, fighter: Fighter):
+        if image_callback:
+            image_callback(role, fighter)
+
+    def _set_image(role: str, fighter: Fighter, image_b64: str, source: str):
+        if image_b64:
+            fighter.image_base64 = image_b64
+            fighter.image_is_placeholder = False
+            cost.image_sources[role] = source
+            _image_ready(role, fighter)
+
+    def _use_placeholder(role: str, fighter: Fighter):
+        fighter.image_base64 = placeholder_portrait_base64(fighter.name, fighter.stats)
+        fighter.image_is_placeholder = True
+        _image_ready(role, fighter)
+
+    backend = image_backend or get_image_backend()
+
+    async def _cached_or_produce(name: str, produce) -> tuple[str, str]:
+        # 캐시 가능한 결과는 프로세스/노드 간 single-flight -> (이미지, 출처)
+        produced = False
+
+        async def _produce():
+            nonlocal produced
+            produced = True
+            return await produce()
+
+        image_b64 = await get_or_create_cached_image_async(name, _produce)
+        return image_b64, "generated" if produced else "shared_cache"
+
+    async def _generate_image(name: str, appearance: str) -> tuple[str, str]:
+        async def _produce():
+            if not ledger.reserve(session_id, held, images=1, image_backend=backend.name):
+                logger.info("이미지 예산 소진, 플레이스홀더 유지: %s", name)
+                if "image" not in degraded:
+                    degraded.append("image")
+                return ""
+            image_b64 = await _timed("image", backend.agenerate(
+                character_name=name,
+                appearance_prompt=appearance,
+            ))
+            if image_b64:
+                record_image(backend.name)
+            return image_b64
+
+        if backend.cacheable:
+            return await _cached_or_produce(name, _produce)
+        return await _produce(), "generated"
+
+    # 플레이스홀더 초상화 즉시 표시 (이미지 생성 지연과 무관하게 첫 화면 렌더)
+    if player is None:
+        player = Fighter(name=player_name, source="player")
+    for fighter in (player, opponent):
+        if not fighter.stats:
+            fighter.stats = stats_from_name(fighter.name)
+    for role, fighter in (("player", player), ("opponent", opponent)):
+        if not fighter.image_base64 or fighter.image_is_placeholder:
+            _use_placeholder(role, fighter)
 
     # 1단계: 승패 사전 결정
     _progress(1, "승패의 운명을 결정하고 있습니다...")
-    winner_name = determine_winner(player_name, opponent.name)
+    winner_name = battle_winner(player_name, opponent, seed, player.stats)
+    winner = "player" if winner_name == player_name else "opponent"
+    winner_display = player_name if winner == "player" else opponent.name
 
-    # 2단계: 배틀 스토리 생성
+    # 2단계: 배틀 스토리 생성 (다른 단계와 병렬)
     _progress(2, "배틀 스토리를 생성하고 있습니다...")
-    story_data = generate_battle_story(
-        player_name=player_name,
-        opponent_name=opponent.name,
-        opponent_title=opponent.title,
-        winner_name=winner_name,
-        gemini_client=gemini_client,
-    )
-
-    # 플레이어 Fighter 생성
-    player = Fighter(
-        name=player_name,
-        title=story_data.get("player_title", "도전자"),
-        source="player",
-    )
-
-    # 상대 제목 업데이트 (비어있는 경우)
-    if not opponent.title:
-        opponent.title = story_data.get("opponent_title", "미지의 전사")
-
-    # 3단계: 플레이어 이미지 생성 (캐시 확인)
-    cached = load_cached_image(player_name)
-    if cached:
-        _progress(3, f"{player_name}의 캐릭터 이미지를 불러오고 있습니다...")
-        player.image_base64 = cached
+    def _template_story() -> dict:
+        return generate_template_story(
+            player_name, opponent.name, opponent.title, winner_name,
+            player_stats=player.stats, opponent_stats=opponent.stats,
+        )
+
+    if "story" in degraded or (story_backend or STORY_BACKEND) == "template":
+        async def _story():
+            cost.story_source = "template"
+            return _template_story()
     else:
-        _progress(3, f"{player_name}의 캐릭터 이미지를 생성하고 있습니다...")
-        try:
-            player.image_base64 = generate_character_image(
-                character_name=player_name,
-                appearance_prompt=story_data.get("player_appearance", "fantasy warrior"),
-            )
-            if player.image_base64:
-                save_cached_image(player_name, player.image_base64)
-        except Exception as e:
-            logger.warning("플레이어 이미지 생성 실패: %s", e)
-            player.image_base64 = ""
-
-    # 4단계: 상대 이미지 (로컬파일 > image_url > user_character > 캐시 > DALL-E)
-    _loaded_local = False
-    if opponent.image_file:
-        _progress(4, f"{opponent.name}의 캐릭터 이미지를 불러오고 있습니다...")
-        try:
-            img_data = load_local_image_as_base64(opponent.image_file)
-            if img_data:
-                opponent.image_base64 = img_data
-                _loaded_local = True
-            else:
-                logger.warning("로컬 이미지 파일 없음: %s", opponent.image_file)
-        except Exception as e:
-            logger.warning("로컬 이미지 로드 실패: %s", e)
-
-    if not _loaded_local and opponent.image_url:
-        _progress(4, f"{opponent.name}의 캐릭터 이미지를 불러오고 있습니다...")
-        opp_cached = load_cached_image(opponent.name)
-        if opp_cached:
-            opponent.image_base64 = opp_cached
-        else:
+        async def _story():
+            cost.story_source = "ai"
             try:
-                opponent.image_base64 = download_image_as_base64(opponent.image_url)
-                if opponent.image_base64:
-                    save_cached_image(opponent.name, opponent.image_base64)
+                return await _timed("story", generate_battle_story_async(
+                    player_name=player_name,
+                    opponent_name=opponent.name,
+                    opponent_title=opponent.title,
+                    winner_name=winner_name,
+                    gemini_client=gemini_client,
+                ))
+            except CircuitOpenError as e:
+                # 스토리 제공자가 죽어 있으면 기다리지 않고 템플릿 스토리로 진행
+                logger.warning("AI 스토리 건너뜀: %s", e)
+                degraded.append("story")
+                cost.story_source = "template"
+                return _template_story()
             except Exception as e:
-                logger.warning("상대 이미지 URL 다운로드 실패: %s", e)
-                opponent.image_base64 = ""
-    elif opponent.source == "user_character" and opponent.image_base64:
-        _progress(4, "상대 캐릭터 이미지를 불러오고 있습니다...")
-    else:
-        opp_cached = load_cached_image(opponent.name)
-        if opp_cached:
-            _progress(4, f"{opponent.name}의 캐릭터 이미지를 불러오고 있습니다...")
-            opponent.image_base64 = opp_cached
-        else:
-            _progress(4, f"{opponent.name}의 캐릭터 이미지를 생성하고 있습니다...")
-            opp_appearance = (
-                opponent.appearance_prompt
-                or story_data.get("opponent_appearance", "fantasy warrior")
-            )
+                if not STORY_TEMPLATE_FALLBACK:
+                    raise
+                logger.warning("AI 스토리 실패, 템플릿 스토리로 대체: %s", e)
+                degraded.append("story")
+                cost.story_source = "template"
+                return _template_story()
+
+    # story_task는 비용 집계 컨텍스트 안에서 시작 (아래 gather 직전)
+    story_task = None
+
+    # 3/4단계: 캐릭터 이미지 (로컬파일 > image_url > user_character > 캐시 > 생성)
+    async def _fighter_image(role: str, fighter: Fighter, step: int):
+        label = "플레이어" if role == "player" else "상대"
+        if fighter.image_file:
+            _progress(step, f"{fighter.name}의 캐릭터 이미지를 불러오고 있습니다...")
             try:
-                opponent.image_base64 = generate_character_image(
-                    character_name=opponent.name,
-                    appearance_prompt=opp_appearance,
+                img_data = await asyncio.to_thread(load_local_image_as_base64, fighter.image_file)
+                if img_data:
+                    _set_image(role, fighter, img_data, "local")
+                    return
+                logger.warning("로컬 이미지 파일 없음: %s", fighter.image_file)
+            except Exception as e:
+                logger.warning("로컬 이미지 로드 실패: %s", e)
+
+        if fighter.image_url:
+            _progress(step, f"{fighter.name}의 캐릭터 이미지를 불러오고 있습니다...")
+            cached = await load_cached_image_async(fighter.name)
+            if cached:
+                _set_image(role, fighter, cached, "cache")
+                return
+            if not allow_image_gen:
+                return
+            try:
+                image_b64, source = await _cached_or_produce(
+                    fighter.name,
+                    lambda: _timed("image", download_image_as_base64_async(fighter.image_url)),
                 )
-                if opponent.image_base64:
-                    save_cached_image(opponent.name, opponent.image_base64)
+                _set_image(role, fighter, image_b64, "download" if source == "generated" else source)
             except Exception as e:
-                logger.warning("상대 이미지 생성 실패: %s", e)
-                opponent.image_base64 = ""
+                logger.warning("%s 이미지 URL 다운로드 실패: %s", label, e)
+            return
+
+        if fighter.source == "user_character" and not fighter.image_is_placeholder:
+            _progress(step, f"{fighter.name}의 캐릭터 이미지를 불러오고 있습니다...")
+            cost.image_sources[role] = "user"
+            return
+
+        cached = await load_cached_image_async(fighter.name)
+        if cached:
+            _progress(step, f"{fighter.name}의 캐릭터 이미지를 불러오고 있습니다...")
+            _set_image(role, fighter, cached, "cache")
+            return
+        if not allow_image_gen:
+            return
+
+        # 사전 정의 외형 묘사가 있으면 스토리를 기다리지 않고 바로 생성
+        appearance = fighter.appearance_prompt
+        if not appearance:
+            story_data = await story_task
+            appearance = story_data.get(f"{role}_appearance", "fantasy warrior")
+        _progress(step, f"{fighter.name}의 캐릭터 이미지를 생성하고 있습니다...")
+        try:
+            image_b64, source = await _generate_image(fighter.name, appearance)
+            _set_image(role, fighter, image_b64, source)
+        except Exception as e:
+            logger.warning("%s 이미지 생성 실패: %s", label, e)
 
     # 5단계: 스토리 조립 + TTS 생성
-    rounds = [
-        BattleRound(1, story_data.get("round1", ""), ""),
-        BattleRound(2, story_data.get("round2", ""), ""),
-        BattleRound(3, story_data.get("round3", ""), ""),
-    ]
-
-    full_story = (
-        f"**[ 라운드 1 ]**\n{story_data.get('round1', '')}\n\n"
-        f"**[ 라운드 2 ]**\n{story_data.get('round2', '')}\n\n"
-        f"**[ 라운드 3 ]**\n{story_data.get('round3', '')}"
-    )
-
-    victory_line = story_data.get("victory_line", "")
-    winner = "player" if winner_name == player_name else "opponent"
-    winner_display = player_name if winner == "player" else opponent.name
+    async def _narration() -> tuple[list, str, bytes]:
+        story_data = await story_task
+        rounds = [
+            BattleRound(1, story_data.get("round1", ""), ""),
+            BattleRound(2, story_data.get("round2", ""), ""),
+            BattleRound(3, story_data.get("round3", ""), ""),
+        ]
+        full_story = (
+            f"**[ 라운드 1 ]**\n{story_data.get('round1', '')}\n\n"
+            f"**[ 라운드 2 ]**\n{story_data.get('round2', '')}\n\n"
+            f"**[ 라운드 3 ]**\n{story_data.get('round3', '')}"
+        )
+        audio_data = b""
+        victory_line = story_data.get("victory_line", "")
+        if tts_enabled and not ledger.reserve(session_id, held, tts_chars=len(full_story) + len(victory_line)):
+            logger.info("TTS 예산 소진, 나레이션 생략")
+            degraded.append("tts")
+        elif tts_enabled:
+            _progress(5, "배틀 나레이션을 생성하고 있습니다...")
+            try:
+                audio_data = await _timed("tts", generate_tts_audio_async(
+                    full_story, victory_line, winner_display
+                )) or b""
+            except Exception as e:
+                logger.warning("TTS 생성 실패: %s", e)
+        return rounds, full_story, audio_data
 
-    audio_data = b""
-    if tts_enabled:
-        _progress(5, "배틀 나레이션을 생성하고 있습니다...")
+    # 이 블록에서 시작한 작업의 LLM 토큰/이미지/TTS 사용량이 cost에 모이고, OpenAI 호출은 클라이언트 1개를 공유
+    with degradation.battle(), track_battle(cost):
         try:
-            audio_data = generate_tts_audio(full_story, victory_line, winner_display) or b""
-        except Exception as e:
-            logger.warning("TTS 생성 실패: %s", e)
+            async with openai_client_scope():
+                story_task = asyncio.ensure_future(_story())
+                story_data, _, _, (rounds, full_story, audio_data) = await _gather_or_cancel(
+                    story_task, _fighter_image("player", player, 3), _fighter_image("opponent", opponent, 4),
+                    _narration(),
+                )
+        except BaseException:
+            # 실패/취소된 배틀도 이미 쓴 비용은 기록
+            cost.durations["total"] = time.perf_counter() - started
+            ledger.record(session_id, "", cost)
+            ledger.release(session_id, held)
+            raise
+
+    for role, fighter in (("player", player), ("opponent", opponent)):
+        if fighter.image_is_placeholder:
+            cost.image_sources[role] = "placeholder"
+
+    if not player.title:
+        player.title = story_data.get("player_title", "도전자")
+
+    # 상대 제목 업데이트 (비어있는 경우)
+    if not opponent.title:
+        opponent.title = story_data.get("opponent_title", "미지의 전사")
 
     # 6단계: 결과 조립
     _progress(6, "배틀 결과를 정리하고 있습니다...")
 
-    return BattleResult(
+    result = BattleResult(
         player=player,
         opponent=opponent,
         winner=winner,
         rounds=rounds,
-        victory_line=victory_line,
+        victory_line=story_data.get("victory_line", ""),
         battle_summary=story_data.get("battle_summary", ""),
         story=full_story,
         audio_data=audio_data,
+        battle_id=new_battle_id(),
+        seed=seed,
+        degradation_level=degradation_level,
+        degraded=degraded,
+        cost=cost,
     )
+    cost.durations["total"] = time.perf_counter() - started
+    ledger.record(session_id, result.battle_id, cost)
+    ledger.release(session_id, held)
+    return result
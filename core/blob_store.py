@@ -0,0 +1,154 @@
+"""콘텐츠 주소 방식 블롭 저장소 (이미지/오디오 등 큰 데이터를 해시로 참조)
+
+파일 mtime을 마지막 사용 시각으로 쓴다 (저장/읽기 때 갱신). sweep()은 참조 목록(리플레이)에
+없는 블롭 중 BLOB_MAX_AGE 넘게 안 쓴 것을 지우고, 그래도 BLOB_MAX_BYTES를 넘으면
+오래 안 쓴 것부터 지운다 (참조되지 않는 블롭 먼저).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+
+from config.settings import BLOB_DIR, BLOB_MAX_AGE, BLOB_MAX_BYTES, BLOB_TOUCH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+_REF_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+_TMP_MAX_AGE = 3600  # 초. 이보다 오래된 임시 파일은 죽은 쓰기의 잔해
+
+
+class BlobStore:
+    """sha256 해시 = 참조. 같은 내용은 한 번만 저장된다."""
+
+    def __init__(
+        self,
+        root: str = BLOB_DIR,
+        max_bytes: int = BLOB_MAX_BYTES,
+        max_age: float = BLOB_MAX_AGE,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, ref: str) -> str:
+        if not _REF_RE.match(ref or ""):
+            raise ValueError(f"잘못된 블롭 참조: {ref!r}")
+        return os.path.join(self.root, ref[:2], ref)
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        """마지막 사용 시각 갱신 (BLOB_TOUCH_INTERVAL보다 오래됐을 때만)"""
+        try:
+            if time.time() - os.stat(path).st_mtime > BLOB_TOUCH_INTERVAL:
+                os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, data: bytes, ext: str = "bin") -> str:
+        """데이터 저장 후 참조 반환 (원자적 쓰기)"""
+        ref = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        path = self._path(ref)
+        if os.path.exists(path):
+            self._touch(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 같은 내용을 동시에 쓰는 다른 스레드/프로세스와 임시 파일이 겹치지 않게 고유 이름 사용
+            tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                # 내용 주소 방식이라 다른 쪽이 먼저 저장했으면 성공
+                if not os.path.exists(path):
+                    raise
+        return ref
+
+    def get(self, ref: str) -> bytes | None:
+        """참조로 데이터 로드. 없으면 None"""
+        try:
+            path = self._path(ref)
+            with open(path, "rb") as f:
+                data = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        self._touch(path)
+        return data
+
+    def delete(self, ref: str) -> None:
+        try:
+            os.remove(self._path(ref))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def release(self, refs: set[str]) -> int:
+        """더 이상 참조되지 않는 블롭 삭제 (최근에 쓴 것은 세션이 아직 쓸 수 있어 남김). 삭제 수 반환"""
+        recent = time.time() - 2 * BLOB_TOUCH_INTERVAL
+        removed = 0
+        for ref in refs:
+            try:
+                if os.stat(self._path(ref)).st_mtime >= recent:
+                    continue
+            except (FileNotFoundError, ValueError):
+                continue
+            self.delete(ref)
+            removed += 1
+        return removed
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """(mtime, 크기, 참조) 목록. 오래된 임시 파일은 지우면서 건너뜀"""
+        entries = []
+        now = time.time()
+        try:
+            shards = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if _REF_RE.match(entry.name):
+                    entries.append((st.st_mtime, st.st_size, entry.name))
+                elif entry.name.endswith(".tmp") and now - st.st_mtime > _TMP_MAX_AGE:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+        return entries
+
+    def sweep(self, keep: set[str] | frozenset = frozenset()) -> tuple[int, int]:
+        """보존 기간/용량 초과 블롭 삭제. keep: 지금 참조 중인 블롭 (나이로는 지우지 않음)
+
+        (삭제 수, 남은 바이트) 반환
+        """
+        cutoff = time.time() - self.max_age
+        kept, removed = [], 0
+        for mtime, size, ref in self._scan():
+            if ref not in keep and mtime < cutoff:
+                self.delete(ref)
+                removed += 1
+            else:
+                kept.append((ref in keep, mtime, size, ref))
+        total = sum(size for _, _, size, _ in kept)
+        if total > self.max_bytes:
+            # 참조되지 않는 것 먼저, 그 안에서는 오래 안 쓴 것부터
+            for _, _, size, ref in sorted(kept):
+                if total <= self.max_bytes:
+                    break
+                self.delete(ref)
+                total -= size
+                removed += 1
+        if removed:
+            logger.info("블롭 정리: %d개 삭제, %dMB 남음", removed, total // (1024 * 1024))
+        return removed, total
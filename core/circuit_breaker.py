@@ -0,0 +1,179 @@
+"""외부 의존성별 서킷 브레이커 (closed -> open -> half-open)
+
+연속 실패가 CIRCUIT_FAILURE_THRESHOLD에 이르면 open: 호출 없이 즉시 CircuitOpenError.
+CIRCUIT_RESET_SECONDS가 지나면 half-open: 시험 호출 1건만 통과시키고 성공하면 closed,
+실패하면 다시 open. 상태는 프로세스 안의 모든 세션이 공유한다
+(사용자가 입력한 키로 만든 클라이언트는 키 해시별로 따로 둔다 - breaker_name).
+
+실패로 세는 것은 제공자 장애(전송 오류, 타임아웃, 5xx, 재시도를 다 쓴 429)뿐이다.
+4xx/인증 오류와 응답 파싱/검증 오류는 그대로 올리되 브레이커 상태는 바꾸지 않는다.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config.settings import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """브레이커가 열려 있어 호출하지 않고 실패"""
+
+    def __init__(self, name: str):
+        super().__init__(f"서킷 브레이커 open: {name}")
+        self.name = name
+
+
+# 상태 코드 없이 전송 단계에서 나는 예외 (openai/httpx/requests, 하위 클래스 포함)
+_TRANSPORT_ERROR_NAMES = frozenset({
+    "APIConnectionError",  # openai (APITimeoutError 포함)
+    "TransportError",  # httpx (TimeoutException, NetworkError 포함)
+    "ConnectionError",  # requests
+    "Timeout",  # requests
+})
+
+
+def _status_code(exc: BaseException) -> int | None:
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    value = getattr(getattr(exc, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """브레이커 실패로 셀 예외인지 (전송 오류, 타임아웃, 5xx, 429)"""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = _status_code(exc)
+    if status is not None:
+        return status >= 500 or status == 429
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSPORT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """지금 호출해도 되는지 (half-open이면 시험 호출 1건만 허용)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("서킷 브레이커 closed: %s", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("서킷 브레이커 open: %s (연속 실패 %d회)", self.name, self._failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def _release_trial(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+
+    @contextmanager
+    def guard(self):
+        """호출 구간 감싸기: open이면 CircuitOpenError, 제공자 장애면 실패, 정상 종료면 성공으로 기록
+
+        그 밖의 예외(4xx, 파싱 오류)와 취소(CancelledError 등 BaseException)는
+        성공/실패 어느 쪽으로도 세지 않는다.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            yield
+        except Exception as e:
+            if is_provider_failure(e):
+                self.record_failure()
+            else:
+                self._release_trial()
+            raise
+        except BaseException:
+            self._release_trial()
+            raise
+        self.record_success()
+
+
+_breakers: OrderedDict[str, CircuitBreaker] = OrderedDict()
+_breakers_lock = threading.Lock()
+_MAX_BREAKERS = 1024  # 사용자 키/이미지 호스트별 브레이커 수 상한 (가장 오래 쓰지 않은 것부터 제거)
+
+
+def breaker_name(provider: str, api_key: str | None = None) -> str:
+    """브레이커 이름 (사용자 키면 "<provider>:<키 해시>" - 한 사용자의 잘못된 키가 남을 막지 않게)"""
+    if not api_key:
+        return provider
+    return f"{provider}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """이름별 프로세스 공유 브레이커 ("openai", "gemini:<키 해시>", "dalle", "typecast", "image_url:<host>")"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+            while len(_breakers) > _MAX_BREAKERS:
+                _breakers.popitem(last=False)
+        else:
+            _breakers.move_to_end(name)
+        return breaker
+
+
+def breaker_states() -> dict[str, str]:
+    """현재 브레이커 상태 스냅샷 (모니터링용)"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.state for b in breakers}
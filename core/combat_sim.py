@@ -0,0 +1,162 @@
+"""스탯 기반 전투 모델 - NumPy 벡터화 몬테카를로 + 근사 승률 API
+
+전투 모델: 3라운드 중 2라운드를 먼저 이기면 승리. 각 라운드 점수는
+전투력(공격/방어/속도/카리스마 가중합) + 행운 비례 잡음(정규분포)이다.
+
+- simulate_win_probability: 여러 매치업을 한 번에 몬테카를로 시뮬레이션
+- win_probability: 같은 모델의 닫힌 형태 근사 (수천 쌍을 1ms 안에 계산)
+- get_matchup_matrix: 사전 정의 + 랜덤 풀의 승률 행렬 (최초 1회 계산)
+- pool_win_probability: 사전 정의 상대끼리의 승률 (행렬 조회)
+
+determine_winner는 사전 정의 상대끼리의 대결이면 행렬 값을, 그 외에는 닫힌 형태를 쓴다.
+행렬을 만들 때 같은 매치업의 시뮬레이션 결과로 닫힌 형태의 오차를 검증해 남긴다.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from core.names import name_key
+from core.stats import STAT_BUDGET, STAT_KEYS
+
+logger = logging.getLogger(__name__)
+
+# 라운드 전투력 가중치 (attack, defense, speed, luck, charisma) - 행운은 잡음에만 반영
+POWER_WEIGHTS = np.array([0.40, 0.30, 0.20, 0.0, 0.10])
+NOISE_BASE = 6.0
+NOISE_PER_LUCK = 0.12
+# 정규분포 CDF의 로지스틱 근사 계수
+_LOGISTIC_K = 1.702
+# 시뮬레이션 한 번에 처리할 매치업 수 (trials x 3 라운드 배열의 메모리 상한)
+_SIM_CHUNK = 1024
+# 닫힌 형태와 시뮬레이션의 평균 절대 오차가 이보다 크면 경고
+CLOSED_FORM_TOLERANCE = 0.03
+
+
+def stats_to_array(stats_list: list[dict]) -> np.ndarray:
+    """스탯 dict 목록 -> (N, 5) float 배열 (없는 스탯은 70)"""
+    return np.array(
+        [[s.get(k, 70) for k in STAT_KEYS] for s in stats_list],
+        dtype=np.float64,
+    ).reshape(-1, len(STAT_KEYS))
+
+
+def _power_and_noise(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    power = x @ POWER_WEIGHTS
+    noise = NOISE_BASE + NOISE_PER_LUCK * x[..., 3]
+    return power, noise
+
+
+def simulate_win_probability(
+    a: np.ndarray,
+    b: np.ndarray,
+    trials: int = 512,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """a[i] vs b[i] 매치업 N개를 trials번씩 시뮬레이션해 a의 승률 (N,) 반환"""
+    rng = rng or np.random.default_rng()
+    pa, na = _power_and_noise(np.atleast_2d(a))
+    pb, nb = _power_and_noise(np.atleast_2d(b))
+    out = np.empty(pa.shape[0])
+    for start in range(0, pa.shape[0], _SIM_CHUNK):
+        sl = slice(start, start + _SIM_CHUNK)
+        n = out[sl].shape[0]
+        # (N, trials, 3 라운드)
+        score_a = pa[sl, None, None] + na[sl, None, None] * rng.standard_normal((n, trials, 3))
+        score_b = pb[sl, None, None] + nb[sl, None, None] * rng.standard_normal((n, trials, 3))
+        rounds_won = (score_a > score_b).sum(axis=2)
+        out[sl] = (rounds_won >= 2).mean(axis=1)
+    return out
+
+
+def win_probability(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """simulate_win_probability의 닫힌 형태 근사 (브로드캐스팅 지원)
+
+    라운드 승률 p = Φ((Pa - Pb) / σ), 3판 2선승 승률 = p²(3 - 2p)
+    """
+    pa, na = _power_and_noise(np.asarray(a, dtype=np.float64))
+    pb, nb = _power_and_noise(np.asarray(b, dtype=np.float64))
+    z = (pa - pb) / np.sqrt(na ** 2 + nb ** 2)
+    p = 1.0 / (1.0 + np.exp(-_LOGISTIC_K * z))
+    return p * p * (3.0 - 2.0 * p)
+
+
+def random_pool_stats(n: int, rng: np.random.Generator) -> np.ndarray:
+    """generate_random_name과 같은 분포의 스탯 n개 (N, 5) - 한 번의 벡터 연산"""
+    raw = rng.integers(50, 96, size=(n, len(STAT_KEYS))).astype(np.float64)
+    return np.floor(raw * STAT_BUDGET / raw.sum(axis=1, keepdims=True))
+
+
+def sample_random_pool_stats(n: int, seed: int = 0) -> np.ndarray:
+    """시드 고정 random_pool_stats"""
+    return random_pool_stats(n, np.random.default_rng(seed))
+
+
+@dataclass
+class MatchupMatrix:
+    """전투사 목록과 승률 행렬 (probs[i, j] = i가 j를 이길 확률)"""
+    names: list
+    stats: np.ndarray
+    probs: np.ndarray
+    closed_form_error: float = 0.0  # 닫힌 형태 vs 시뮬레이션 평균 절대 오차
+    _index: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._index = {name_key(n): i for i, n in enumerate(self.names)}
+
+    def index_of(self, name: str, stats: dict | None = None) -> int | None:
+        """이름의 행 번호 (stats를 주면 스탯까지 같을 때만 - 같은 이름의 다른 전투사 제외)"""
+        i = self._index.get(name_key(name))
+        if i is None or stats is None:
+            return i
+        return i if np.array_equal(self.stats[i], stats_to_array([stats])[0]) else None
+
+    def probability(self, a_name: str, b_name: str, a_stats: dict | None = None, b_stats: dict | None = None) -> float | None:
+        i, j = self.index_of(a_name, a_stats), self.index_of(b_name, b_stats)
+        if i is None or j is None or i == j:
+            return None
+        return float(self.probs[i, j])
+
+
+@lru_cache(maxsize=1)
+def get_matchup_matrix(random_samples: int = 32, trials: int = 1024) -> MatchupMatrix:
+    """사전 정의 상대 + 랜덤 풀 표본의 몬테카를로 승률 행렬 (프로세스당 1회 계산)"""
+    from core.opponent_generator import load_predefined_pool
+
+    characters, _ = load_predefined_pool()
+    names = [c["name"] for c in characters]
+    stats = stats_to_array([c.get("stats", {}) for c in characters])
+    if random_samples:
+        names += [f"random#{i}" for i in range(random_samples)]
+        stats = np.vstack([stats, sample_random_pool_stats(random_samples)])
+
+    m = len(names)
+    ii, jj = np.triu_indices(m, k=1)
+    upper = simulate_win_probability(stats[ii], stats[jj], trials, np.random.default_rng(0))
+    probs = np.full((m, m), 0.5)
+    probs[ii, jj] = upper
+    probs[jj, ii] = 1.0 - upper
+
+    # 같은 매치업으로 닫힌 형태 근사 검증
+    error = float(np.abs(win_probability(stats[ii], stats[jj]) - upper).mean()) if len(upper) else 0.0
+    if error > CLOSED_FORM_TOLERANCE:
+        logger.warning("닫힌 형태 승률 오차 %.3f (허용 %.3f) - 전투 모델 계수 확인 필요", error, CLOSED_FORM_TOLERANCE)
+    return MatchupMatrix(names=names, stats=stats, probs=probs, closed_form_error=error)
+
+
+@lru_cache(maxsize=1)
+def _predefined_name_keys() -> frozenset:
+    from core.opponent_generator import load_predefined_pool
+
+    characters, _ = load_predefined_pool()
+    return frozenset(name_key(c["name"]) for c in characters)
+
+
+def pool_win_probability(a_name: str, a_stats: dict, b_name: str, b_stats: dict) -> float | None:
+    """둘 다 사전 정의 상대면 승률 행렬 값 (아니면 None - 행렬은 필요할 때 처음 계산)"""
+    keys = _predefined_name_keys()
+    if name_key(a_name) not in keys or name_key(b_name) not in keys:
+        return None
+    return get_matchup_matrix().probability(a_name, b_name, a_stats, b_stats)
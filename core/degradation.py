@@ -0,0 +1,112 @@
+"""부하 기반 단계적 기능 축소 (load shedding)
+
+동시 진행 배틀 수, 단계별 최근 지연/오류율을 보고 축소 단계를 정한다.
+    0: 정상
+    1: TTS 끔
+    2: 이미지 생성 안 함 (로컬/캐시 이미지 또는 플레이스홀더만)
+    3: 템플릿 스토리 (AI 스토리 호출 안 함)
+단계는 즉시 올라가고, 복구는 DEGRADE_RECOVERY_SECONDS마다 한 단계씩 내려간다.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config.settings import (
+    DEGRADE_ERROR_RATE,
+    DEGRADE_INFLIGHT_LEVELS,
+    DEGRADE_MIN_SAMPLES,
+    DEGRADE_RECOVERY_SECONDS,
+    DEGRADE_STAGE_LATENCY,
+    DEGRADE_WINDOW_SECONDS,
+)
+
+LEVEL_NORMAL = 0
+LEVEL_NO_TTS = 1
+LEVEL_NO_IMAGE_GEN = 2
+LEVEL_TEMPLATE_STORY = 3
+
+# 단계(stage)가 나빠지면 올라갈 최소 축소 단계
+STAGE_LEVELS = {"tts": LEVEL_NO_TTS, "image": LEVEL_NO_IMAGE_GEN, "story": LEVEL_TEMPLATE_STORY}
+
+LEVEL_LABELS = {
+    LEVEL_NORMAL: "정상",
+    LEVEL_NO_TTS: "TTS 끔",
+    LEVEL_NO_IMAGE_GEN: "이미지 생성 중단",
+    LEVEL_TEMPLATE_STORY: "템플릿 스토리",
+}
+
+
+class DegradationController:
+    """프로세스 공유 축소 단계 컨트롤러 (스레드 안전)"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._samples = {stage: deque() for stage in STAGE_LEVELS}  # (시각, 소요 초, 성공 여부)
+        self._level = LEVEL_NORMAL
+        self._changed_at = clock()
+
+    @contextmanager
+    def battle(self):
+        """배틀 1건 진행 구간 (동시 진행 수 집계)"""
+        with self._lock:
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def record(self, stage: str, seconds: float, ok: bool = True) -> None:
+        """외부 호출 단계의 소요 시간/성공 여부 기록"""
+        if stage not in self._samples:
+            return
+        with self._lock:
+            self._samples[stage].append((self._clock(), seconds, ok))
+
+    def _stage_unhealthy(self, stage: str, now: float) -> bool:
+        samples = self._samples[stage]
+        while samples and now - samples[0][0] > DEGRADE_WINDOW_SECONDS:
+            samples.popleft()
+        if len(samples) < DEGRADE_MIN_SAMPLES:
+            return False
+        errors = sum(1 for _, _, ok in samples if not ok)
+        if errors / len(samples) >= DEGRADE_ERROR_RATE:
+            return True
+        return statistics.median(s for _, s, _ in samples) > DEGRADE_STAGE_LATENCY[stage]
+
+    def level(self) -> int:
+        """현재 축소 단계 (호출 시점의 부하/지연/오류로 갱신)"""
+        with self._lock:
+            now = self._clock()
+            target = sum(1 for limit in DEGRADE_INFLIGHT_LEVELS if self._inflight >= limit)
+            for stage, stage_level in STAGE_LEVELS.items():
+                if self._stage_unhealthy(stage, now):
+                    target = max(target, stage_level)
+
+            if target > self._level:
+                self._level, self._changed_at = target, now
+            elif target < self._level and now - self._changed_at >= DEGRADE_RECOVERY_SECONDS:
+                self._level, self._changed_at = self._level - 1, now
+            return self._level
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+
+_controller: DegradationController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_degradation() -> DegradationController:
+    """프로세스 전역 축소 단계 컨트롤러"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = DegradationController()
+        return _controller
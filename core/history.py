@@ -0,0 +1,108 @@
+"""배틀 전적 저장소 - 추가 전용 JSONL 파일 + 누적 승패 카운터 + 페이지 조회"""
+
+import json
+import os
+import re
+import threading
+import uuid
+
+from config.settings import HISTORY_DIR
+
+PLAYER_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class BattleHistory:
+    """플레이어 한 명의 전적 (레코드 1건 = JSONL 한 줄)
+
+    파일은 처음 열 때 한 번만 훑어서 줄 오프셋과 승패 카운터를 만들고,
+    이후에는 append 시 카운터를 갱신하므로 통계 조회는 O(1),
+    페이지 조회는 해당 페이지 줄만 읽는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.wins = 0
+        self.losses = 0
+        self._offsets: list[int] = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단된 마지막 줄 등은 건너뜀
+                    offset += len(line)
+                    continue
+                self._offsets.append(offset)
+                self._count(record)
+                offset += len(line)
+
+    def _count(self, record: dict) -> None:
+        if record.get("result") == "player":
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def total(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.total * 100 if self.total else 0.0
+
+    def append(self, record: dict) -> None:
+        """전적 1건 추가 (파일 끝에 한 줄 기록 + 카운터 갱신)"""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+            self._offsets.append(offset)
+            self._count(record)
+
+    def _read_at(self, f, index: int) -> dict:
+        f.seek(self._offsets[index])
+        return json.loads(f.readline())
+
+    def page(self, page: int, page_size: int = 20) -> list[dict]:
+        """최신순 page번째(0부터) 페이지의 레코드"""
+        total = self.total
+        start = total - 1 - page * page_size
+        stop = max(-1, start - page_size)
+        if start < 0:
+            return []
+        with open(self.path, "rb") as f:
+            return [self._read_at(f, i) for i in range(start, stop, -1)]
+
+    def recent(self, n: int = 5) -> list[dict]:
+        """최근 n건 (최신순)"""
+        return self.page(0, n)
+
+    def page_count(self, page_size: int = 20) -> int:
+        return max(1, -(-self.total // page_size))
+
+
+def new_player_id() -> str:
+    return uuid.uuid4().hex
+
+
+def is_valid_player_id(player_id: str | None) -> bool:
+    return isinstance(player_id, str) and PLAYER_ID_RE.match(player_id) is not None
+
+
+def open_history(player_id: str) -> BattleHistory:
+    """플레이어 ID의 전적 저장소 열기 (ID는 new_player_id 형식만 허용)"""
+    if not is_valid_player_id(player_id):
+        raise ValueError(f"잘못된 플레이어 ID: {player_id!r}")
+    return BattleHistory(os.path.join(HISTORY_DIR, f"{player_id}.jsonl"))
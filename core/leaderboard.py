@@ -0,0 +1,311 @@
+"""글로벌 리더보드 - 이름별 누적 통계 + 정렬 인덱스 + write-behind 배치 기록
+
+결과는 모든 프로세스/레플리카가 같은 로그 파일(LEADERBOARD_LOG_PATH)에 한 줄씩 추가하고,
+각 프로세스는 읽을 때 로그에서 새로 늘어난 부분만 접어 넣는다 (서로의 기록을 덮어쓰지 않음).
+
+로그가 LEADERBOARD_COMPACT_BYTES를 넘으면 로그 락 아래에서 끝까지 접은 집계를 스냅샷
+(LEADERBOARD_PATH: 이름별 집계 + 그 집계가 반영한 로그 ID/위치)으로 원자적으로 저장한 뒤
+첫 줄에 새 로그 ID를 쓴 빈 로그로 교체한다. 시작 시에는 스냅샷을 읽고 로그 꼬리만 접는다.
+스냅샷 저장 뒤 교체 전에 죽으면 스냅샷의 로그 ID가 현재 로그와 같으므로 그 위치부터 이어 읽는다.
+"""
+
+import atexit
+import bisect
+import dataclasses
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+
+from config.settings import (
+    LEADERBOARD_BATCH_SIZE,
+    LEADERBOARD_COMPACT_BYTES,
+    LEADERBOARD_FLUSH_INTERVAL,
+    LEADERBOARD_LOG_PATH,
+    LEADERBOARD_PATH,
+)
+from core.models import BattleResult
+from core.names import name_key
+from core.shared_cache import LockTimeout, SharedFileCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NameStats:
+    """이름 하나의 누적 전적"""
+    name: str
+    wins: int = 0
+    losses: int = 0
+    streak: int = 0  # 현재 연승
+    best_streak: int = 0
+    beaten_by_rarity: dict = field(default_factory=dict)  # 등급/출처 -> 승리 수
+
+    @property
+    def total(self) -> int:
+        return self.wins + self.losses
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.total * 100 if self.total else 0.0
+
+
+def _rank_key(stats: NameStats, key: str) -> tuple:
+    # 승리 수 > 최고 연승 > 패배 적은 순 > 이름
+    return (-stats.wins, -stats.best_streak, stats.losses, key)
+
+
+class Leaderboard:
+    """프로세스 공유 리더보드
+
+    record()는 큐에 넣기만 하고 바로 반환한다. 백그라운드 스레드가 배치 단위로
+    공유 로그에 추가한다 (파일 락 아래 한 번에 기록). 조회 시 로그에서 마지막으로 읽은
+    위치 이후만 집계에 반영하고, 순위는 정렬된 인덱스에서 바로 잘라 반환한다.
+    락 순서는 항상 self._lock -> 로그 파일 락 (기록만 할 때는 파일 락만).
+    """
+
+    def __init__(
+        self,
+        path: str = LEADERBOARD_LOG_PATH,
+        flush_interval: float = LEADERBOARD_FLUSH_INTERVAL,
+        batch_size: int = LEADERBOARD_BATCH_SIZE,
+        snapshot_path: str | None = LEADERBOARD_PATH,
+        compact_bytes: int = LEADERBOARD_COMPACT_BYTES,
+    ):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_bytes = compact_bytes
+        self._stats: dict[str, NameStats] = {}
+        self._index: list[tuple] = []
+        self._log_id = ""  # 반영 중인 로그의 ID (첫 줄 머리말, 교체 전 로그는 "")
+        self._offset: int | None = None  # 로그에서 반영한 바이트 수 (줄 경계, None이면 아직 불러오지 않음)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._pending: list[tuple] = []  # 로그 기록에 실패해 다음 배치에 다시 쓸 결과
+        self._file_lock = SharedFileCache()
+        self._worker = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._worker.start()
+
+    def record(self, result: BattleResult) -> None:
+        """배틀 결과 기록 요청 (즉시 반환, 반영은 백그라운드)"""
+        opponent = result.opponent
+        self.record_outcome(result.player.name, result.winner == "player", opponent.rarity or opponent.source)
+
+    def record_outcome(self, name: str, won: bool, opponent_tier: str) -> None:
+        """이름 1명의 승패 기록 요청 (토너먼트에서 상대 자리 참가자도 기록할 때)"""
+        self._queue.put((name, won, opponent_tier))
+
+    def _apply(self, player_name: str, won: bool, opponent_tier: str) -> None:
+        key = name_key(player_name)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = NameStats(name=player_name)
+        else:
+            old = _rank_key(stats, key)
+            del self._index[bisect.bisect_left(self._index, old)]
+        if won:
+            stats.wins += 1
+            stats.streak += 1
+            stats.best_streak = max(stats.best_streak, stats.streak)
+            stats.beaten_by_rarity[opponent_tier] = stats.beaten_by_rarity.get(opponent_tier, 0) + 1
+        else:
+            stats.losses += 1
+            stats.streak = 0
+        bisect.insort(self._index, _rank_key(stats, key))
+
+    def _load(self) -> None:
+        """스냅샷 + 로그 꼬리로 집계를 다시 만듦 (로그 파일 락 안에서 호출)"""
+        data = {}
+        if self.snapshot_path:
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = {}
+        self._stats = {key: NameStats(**raw) for key, raw in data.get("names", {}).items()}
+        self._index = sorted(_rank_key(stats, key) for key, stats in self._stats.items())
+        try:
+            with open(self.path, "rb") as f:
+                log_id, header_end = _read_header(f)
+        except FileNotFoundError:
+            log_id, header_end = "", 0
+        self._log_id = log_id
+        # 스냅샷이 지금 로그를 가리키면 그 위치부터, 아니면(교체 직후) 로그 처음부터
+        self._offset = max(header_end, data.get("log_offset", 0)) if data.get("log_id", "") == log_id else header_end
+        self._fold_tail()
+
+    def _reload(self, have_file_lock: bool = False) -> None:
+        if have_file_lock:
+            self._load()
+            return
+        try:
+            with self._file_lock.lock(self.path):
+                self._load()
+        except LockTimeout:
+            logger.warning("리더보드 로그 락 대기 시간 초과, 락 없이 읽음")
+            self._load()
+
+    def _fold_tail(self) -> bool:
+        """지금 로그의 self._offset 이후 완결된 줄을 집계에 반영 (로그가 교체됐으면 False)"""
+        try:
+            with open(self.path, "rb") as f:
+                log_id, _ = _read_header(f)
+                if log_id != self._log_id:
+                    return False
+                if os.fstat(f.fileno()).st_size <= self._offset:
+                    return True
+                f.seek(self._offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return True
+        end = chunk.rfind(b"\n") + 1  # 다른 프로세스가 쓰는 중인 마지막 줄은 다음에
+        for line in chunk[:end].splitlines():
+            try:
+                player_name, won, opponent_tier = json.loads(line)
+            except (ValueError, TypeError):
+                logger.warning("리더보드 로그 줄 무시: %r", line[:80])
+                continue
+            self._apply(player_name, bool(won), opponent_tier)
+        self._offset += end
+        return True
+
+    def _refresh(self, have_file_lock: bool = False) -> None:
+        """로그에서 새로 추가된 완결된 줄만 집계에 반영 (self._lock 안에서 호출)
+
+        처음 조회할 때와 다른 프로세스가 로그를 교체했을 때는 스냅샷부터 다시 읽는다.
+        """
+        if self._offset is None or not self._fold_tail():
+            self._reload(have_file_lock)
+
+    def _compact(self) -> None:
+        """로그를 끝까지 접은 집계를 스냅샷으로 저장한 뒤 새 로그로 교체"""
+        with self._lock, self._file_lock.lock(self.path):
+            try:
+                if os.path.getsize(self.path) < self.compact_bytes:
+                    return  # 다른 프로세스가 방금 교체함
+            except FileNotFoundError:
+                return
+            self._refresh(have_file_lock=True)
+            snapshot = {
+                "names": {key: asdict(stats) for key, stats in self._stats.items()},
+                "log_id": self._log_id,
+                "log_offset": self._offset,
+            }
+            # 스냅샷이 디스크에 확정된 뒤에만 로그를 교체 (fsync + os.replace)
+            self._file_lock.put(self.snapshot_path, json.dumps(snapshot, ensure_ascii=False))
+            new_id = uuid.uuid4().hex
+            header = (json.dumps({"log_id": new_id}) + "\n").encode("utf-8")
+            tmp = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(header)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            self._log_id, self._offset = new_id, len(header)
+            logger.info("리더보드 로그 압축: 이름 %d개 스냅샷 저장, 새 로그 %s", len(self._stats), new_id[:8])
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            self._flush_batch(batch)
+
+    def _flush_batch(self, batch: list) -> None:
+        items = self._pending + batch
+        data = "".join(json.dumps(list(item), ensure_ascii=False) + "\n" for item in items).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._file_lock.lock(self.path):
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                    size = os.fstat(fd).st_size
+                finally:
+                    os.close(fd)
+            self._pending = []
+        except (OSError, LockTimeout) as e:
+            logger.warning("리더보드 기록 실패 (%d건, 다음 배치에 재시도): %s", len(items), e)
+            self._pending = items
+            size = 0
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+        if self.snapshot_path and size >= self.compact_bytes:
+            try:
+                self._compact()
+            except (OSError, LockTimeout) as e:
+                logger.warning("리더보드 로그 압축 실패 (다음 배치에 재시도): %s", e)
+
+    def flush(self) -> None:
+        """대기 중인 기록이 모두 로그에 쓰일 때까지 대기"""
+        self._queue.join()
+
+    def top(self, n: int = 10) -> list[NameStats]:
+        """상위 n명 (복사본)"""
+        with self._lock:
+            self._refresh()
+            return [_copy(self._stats[entry[-1]]) for entry in self._index[:n]]
+
+    def get(self, name: str) -> NameStats | None:
+        with self._lock:
+            self._refresh()
+            stats = self._stats.get(name_key(name))
+            return _copy(stats) if stats else None
+
+    def rank_of(self, name: str) -> int | None:
+        """이름의 현재 순위 (1부터). 기록이 없으면 None"""
+        key = name_key(name)
+        with self._lock:
+            self._refresh()
+            stats = self._stats.get(key)
+            if stats is None:
+                return None
+            return bisect.bisect_left(self._index, _rank_key(stats, key)) + 1
+
+
+def _read_header(f) -> tuple[str, int]:
+    """로그 첫 줄의 로그 ID와 머리말 길이 (머리말이 없으면 ("", 0))"""
+    f.seek(0)
+    first = f.readline()
+    if first.endswith(b"\n"):
+        try:
+            header = json.loads(first)
+        except ValueError:
+            header = None
+        if isinstance(header, dict):
+            return str(header.get("log_id", "")), len(first)
+    return "", 0
+
+
+def _copy(stats: NameStats) -> NameStats:
+    return dataclasses.replace(stats, beaten_by_rarity=dict(stats.beaten_by_rarity))
+
+
+_leaderboard: Leaderboard | None = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard() -> Leaderboard:
+    """프로세스 전역 리더보드"""
+    global _leaderboard
+    with _leaderboard_lock:
+        if _leaderboard is None:
+            _leaderboard = Leaderboard()
+            atexit.register(_leaderboard.flush)
+        return _leaderboard
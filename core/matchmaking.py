@@ -0,0 +1,203 @@
+"""스탯 기반 매칭 인덱스 - 5차원 스탯 KD-트리 (등급 밴드별)
+
+사전 정의 상대(등급별), 사용자 캐릭터, 랜덤 상대 스탯 표본을 스탯 벡터로 색인해
+"이 전투사와 스탯이 가장 가까운 상대 k명"을 전체 스캔 없이 찾는다.
+캐릭터 등록 시 트리에 바로 삽입되고, 같은 키로 다시 등록하면 이전 항목은 무효 처리된다.
+무효 항목이 많아지면 트리를 살아 있는 항목만으로 다시 만든다.
+"""
+
+import heapq
+import itertools
+import math
+from functools import lru_cache
+
+from core.stats import STAT_KEYS
+
+USER_BAND = "user"
+RANDOM_BAND = "random"
+
+_REBUILD_MIN_DEAD = 32  # 무효 항목이 이 수 이상이고 살아 있는 항목보다 많으면 재구성
+
+
+def stat_vector(stats: dict) -> tuple:
+    return tuple(float(stats.get(k, 70)) for k in STAT_KEYS)
+
+
+def stat_distance(a: dict, b: dict) -> float:
+    return math.dist(stat_vector(a), stat_vector(b))
+
+
+class _Node:
+    __slots__ = ("point", "item", "axis", "left", "right", "alive")
+
+    def __init__(self, point: tuple, item: dict, axis: int):
+        self.point = point
+        self.item = item
+        self.axis = axis
+        self.left = None
+        self.right = None
+        self.alive = True
+
+
+class StatKDTree:
+    """점 삽입/무효화가 가능한 KD-트리 (k-최근접 탐색)"""
+
+    def __init__(self, dims: int = len(STAT_KEYS)):
+        self.dims = dims
+        self.root: _Node | None = None
+        self.size = 0  # 살아 있는 항목 수
+        self.dead = 0  # 트리에 남아 있는 무효 항목 수
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, point: tuple, item: dict) -> _Node:
+        axis = 0
+        parent = None
+        node = self.root
+        while node is not None:
+            parent = node
+            node = node.left if point[node.axis] < node.point[node.axis] else node.right
+            axis = (parent.axis + 1) % self.dims
+        new = _Node(point, item, axis)
+        if parent is None:
+            self.root = new
+        elif point[parent.axis] < parent.point[parent.axis]:
+            parent.left = new
+        else:
+            parent.right = new
+        self.size += 1
+        return new
+
+    def remove(self, node: _Node) -> None:
+        """항목 무효화 (무효 항목이 쌓이면 트리 재구성)"""
+        if not node.alive:
+            return
+        node.alive = False
+        self.size -= 1
+        self.dead += 1
+        if self.dead >= _REBUILD_MIN_DEAD and self.dead > self.size:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """살아 있는 노드만으로 균형 트리 재구성 (노드 객체는 그대로 재사용)"""
+        alive = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node.alive:
+                alive.append(node)
+            stack.extend(child for child in (node.left, node.right) if child is not None)
+        self.root = self._build(alive, 0)
+        self.size = len(alive)
+        self.dead = 0
+
+    def _build(self, nodes: list[_Node], axis: int) -> _Node | None:
+        if not nodes:
+            return None
+        nodes.sort(key=lambda n: n.point[axis])
+        mid = len(nodes) // 2
+        # 같은 좌표는 오른쪽으로 가도록 (insert와 같은 규칙) 중앙값의 첫 위치로 당김
+        while mid > 0 and nodes[mid - 1].point[axis] == nodes[mid].point[axis]:
+            mid -= 1
+        node = nodes[mid]
+        node.axis = axis
+        next_axis = (axis + 1) % self.dims
+        node.left = self._build(nodes[:mid], next_axis)
+        node.right = self._build(nodes[mid + 1:], next_axis)
+        return node
+
+    def nearest(self, point: tuple, k: int = 5, predicate=None) -> list[tuple[float, dict]]:
+        """가까운 순 (제곱거리, 항목) k개. predicate가 False인 항목은 제외"""
+        best: list[tuple[float, int, dict]] = []  # 최대 힙 (-거리)
+        counter = itertools.count()
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if node.alive and (predicate is None or predicate(node.item)):
+                d = sum((a - b) ** 2 for a, b in zip(point, node.point))
+                if len(best) < k:
+                    heapq.heappush(best, (-d, next(counter), node.item))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, next(counter), node.item))
+            diff = point[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            # 분할면까지 거리가 현재 k번째보다 멀면 반대편 가지는 건너뜀
+            if far is not None and (len(best) < k or diff * diff < -best[0][0]):
+                stack.append(far)
+            stack.append(near)
+        return [(-d, item) for d, _, item in sorted(best, reverse=True)]
+
+
+class MatchmakingIndex:
+    """밴드(등급/풀)별 KD-트리 묶음"""
+
+    def __init__(self):
+        self._trees: dict[str, StatKDTree] = {}
+        self._by_key: dict[str, tuple[str, _Node]] = {}
+
+    def add(self, item: dict, band: str, key: str | None = None) -> None:
+        """항목 추가. 같은 key가 이미 있으면 이전 항목을 무효화하고 교체"""
+        if key is not None:
+            self.remove(key)
+        tree = self._trees.setdefault(band, StatKDTree())
+        node = tree.insert(stat_vector(item.get("stats", {})), item)
+        if key is not None:
+            self._by_key[key] = (band, node)
+
+    def remove(self, key: str) -> None:
+        """key로 등록한 항목 제거 (없으면 무시)"""
+        entry = self._by_key.pop(key, None)
+        if entry is not None:
+            band, node = entry
+            self._trees[band].remove(node)
+
+    def bands(self) -> list[str]:
+        return list(self._trees)
+
+    def nearest(
+        self,
+        stats: dict,
+        k: int = 5,
+        bands: list[str] | None = None,
+        predicate=None,
+    ) -> list[tuple[float, dict]]:
+        """지정 밴드(None이면 전체)에서 스탯이 가장 가까운 항목 k개"""
+        point = stat_vector(stats)
+        found = []
+        for band in bands if bands is not None else self.bands():
+            tree = self._trees.get(band)
+            if tree:
+                found.extend(tree.nearest(point, k, predicate))
+        return heapq.nsmallest(k, found, key=lambda pair: pair[0])
+
+
+def build_static_index() -> MatchmakingIndex:
+    """사전 정의 상대 인덱스 생성 (등급별 밴드)"""
+    from core.opponent_generator import load_predefined_pool
+
+    index = MatchmakingIndex()
+    characters, _ = load_predefined_pool()
+    for c in characters:
+        index.add(c, c.get("rarity", "common"))
+    return index
+
+
+@lru_cache(maxsize=1)
+def get_static_index() -> MatchmakingIndex:
+    """프로세스 공유 정적 인덱스 (최초 호출 시 1회 생성)"""
+    return build_static_index()
+
+
+@lru_cache(maxsize=1)
+def get_random_stat_index() -> MatchmakingIndex:
+    """랜덤 상대 스탯 표본 인덱스 (generate_random_name과 같은 분포, 이름 없이 스탯만)"""
+    from config.settings import MATCHMAKING_RANDOM_POOL_SIZE
+    from core.combat_sim import sample_random_pool_stats
+
+    index = MatchmakingIndex()
+    for row in sample_random_pool_stats(MATCHMAKING_RANDOM_POOL_SIZE).astype(int):
+        index.add({"stats": dict(zip(STAT_KEYS, row.tolist()))}, RANDOM_BAND)
+    return index
@@ -14,8 +14,10 @@ class Fighter:
     image_file: str = ""  # 로컬 이미지 파일명 (assets/images/characters/ 내)
     stats: dict = field(default_factory=dict)
     source: str = "random"  # "predefined", "random", "user_character"
+    rarity: str = ""  # 사전 정의 상대 등급 ("common", "rare", "epic", "legendary")
     creator_name: Optional[str] = None
     appearance_prompt: str = ""
+    image_is_placeholder: bool = False  # 절차적 플레이스홀더 초상화 표시 중
 
 
 @dataclass
@@ -25,6 +27,21 @@ class BattleRound:
     round_winner: str
 
 
+@dataclass
+class BattleCost:
+    """배틀 1건의 외부 호출 사용량/비용/소요 시간 (core.accounting에서 집계)"""
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    images_generated: int = 0
+    tts_chars: int = 0
+    cost_usd: float = 0.0
+    story_source: str = ""  # "ai", "template"
+    image_sources: dict = field(default_factory=dict)  # 역할 -> "generated", "cache", "shared_cache", "download", "local", "user", "placeholder"
+    durations: dict = field(default_factory=dict)  # 단계 -> 초 ("story", "image", "tts", "total")
+
+
 @dataclass
 class BattleResult:
     player: Fighter
@@ -35,3 +52,9 @@ class BattleResult:
     battle_summary: str = ""
     story: str = ""
     audio_data: bytes = b""
+    audio_ref: str = ""  # 블롭 저장소 참조 (audio_data를 내보낸 뒤에는 여기서 다시 읽음)
+    battle_id: str = ""
+    seed: int = 0  # 배틀 RNG 시드 (같은 시드 -> 같은 상대 선택/승패)
+    degradation_level: int = 0  # 배틀 시작 시점의 기능 축소 단계 (core.degradation)
+    degraded: list = field(default_factory=list)  # 축소된 기능 ("tts", "image", "story")
+    cost: BattleCost = field(default_factory=BattleCost)
@@ -0,0 +1,52 @@
+"""이름 정규화 - 캐시 키, 사용자 캐릭터 저장소, 매칭 자기 제외에 공통 사용"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from config.settings import NAME_ALIASES_PATH
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _is_invisible(ch: str) -> bool:
+    # Cf: 제로폭 공백/결합자, BOM, 소프트 하이픈 등 보이지 않는 서식 문자
+    return unicodedata.category(ch) == "Cf"
+
+
+def canonicalize_name(name: str) -> str:
+    """표시용 정규화: NFKC(NFD 한글/전각 문자 통합) + 보이지 않는 문자 제거 + 공백 축약"""
+    text = unicodedata.normalize("NFKC", name or "")
+    text = "".join(ch for ch in text if not _is_invisible(ch))
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=1)
+def load_name_aliases() -> dict[str, str]:
+    """별칭 테이블 로드 (정규화된 별칭 키 -> 대표 이름)"""
+    try:
+        with open(Path(NAME_ALIASES_PATH), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        aliases = data["aliases"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return {}
+    return {
+        canonicalize_name(alias).casefold(): canonicalize_name(target)
+        for alias, target in aliases.items()
+    }
+
+
+def name_key(name: str) -> str:
+    """비교/캐시용 정규 키 (대소문자 무시 + 별칭 적용)"""
+    key = canonicalize_name(name).casefold()
+    target = load_name_aliases().get(key)
+    if target:
+        key = target.casefold()
+    return key
+
+
+def same_name(a: str, b: str) -> bool:
+    """두 이름이 같은 캐릭터를 가리키는지"""
+    return name_key(a) == name_key(b)
@@ -2,7 +2,9 @@
 
 import json
 import random
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from config.settings import (
     MATCHING_EARLY_PREDEFINED,
@@ -16,8 +18,23 @@ from config.settings import (
     MATCHING_MATURE_USER,
     MATCHING_GROWTH_THRESHOLD,
     MATCHING_MATURE_THRESHOLD,
+    MATCHMAKING_MAX_CANDIDATES,
+    MATCHMAKING_MODE,
+    MATCHMAKING_RADIUS,
+)
+from core.assets import get_manifest
+from core.stats import STAT_KEYS
+from core.matchmaking import (
+    RANDOM_BAND,
+    USER_BAND,
+    MatchmakingIndex,
+    get_random_stat_index,
+    get_static_index,
+    stat_distance,
 )
 from core.models import Fighter
+from core.names import name_key, same_name
+from core.session_memory import character_image
 
 
 # 랜덤 이름 생성 풀
@@ -40,40 +57,52 @@ SUFFIXES = [
 ]
 
 
-def load_predefined_pool() -> tuple[list[dict], dict]:
-    """사전 정의 상대 풀 로드"""
+NAME_TEMPLATES = [
+    "{prefix} {suffix}",
+    "{core} {suffix}",
+    "{prefix} {core}",
+]
+
+
+def load_predefined_pool(check_assets: bool = True) -> tuple[list[dict], dict]:
+    """사전 정의 상대 풀 로드 (check_assets: image_file 참조가 깨진 상대 제외)"""
     try:
         data_path = Path(__file__).parent.parent / "data" / "predefined_opponents.json"
         with open(data_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        return data["characters"], data["rarities"]
+        characters, rarities = data["characters"], data["rarities"]
     except (FileNotFoundError, json.JSONDecodeError, KeyError):
         return [], {}
+    if check_assets:
+        disabled = get_manifest().disabled_characters
+        if disabled:
+            characters = [c for c in characters if c.get("name") not in disabled]
+    return characters, rarities
 
 
-def generate_random_name() -> dict:
-    """규칙 기반 랜덤 이름 생성"""
-    templates = [
-        "{prefix} {suffix}",
-        "{core} {suffix}",
-        "{prefix} {core}",
-    ]
-    prefix = random.choice(PREFIXES)
-    core = random.choice(CORES)
-    suffix = random.choice(SUFFIXES)
-
-    name = random.choice(templates).format(prefix=prefix, core=core, suffix=suffix)
-    title = random.choice([
+def _title_options(prefix: str, core: str) -> list[str]:
+    return [
         f"떠도는 {core}",
         f"{prefix} 수호자",
         f"전설의 {core}",
         f"미지의 도전자",
         f"{prefix} 전사",
-    ])
+    ]
+
+
+def generate_random_name(rng: random.Random | None = None) -> dict:
+    """규칙 기반 랜덤 이름 생성 (rng: 배틀 RNG, 없으면 전역 random)"""
+    rng = rng or random
+    prefix = rng.choice(PREFIXES)
+    core = rng.choice(CORES)
+    suffix = rng.choice(SUFFIXES)
+
+    name = rng.choice(NAME_TEMPLATES).format(prefix=prefix, core=core, suffix=suffix)
+    title = rng.choice(_title_options(prefix, core))
 
     # 밸런스 스탯 생성
     stat_names = ["attack", "defense", "speed", "luck", "charisma"]
-    raw = [random.randint(50, 95) for _ in stat_names]
+    raw = [rng.randint(50, 95) for _ in stat_names]
     total = sum(raw)
     budget = 380
     stats = {name: int(v * budget / total) for name, v in zip(stat_names, raw)}
@@ -86,11 +115,111 @@ def generate_random_name() -> dict:
     }
 
 
+@lru_cache(maxsize=1)
+def _random_name_space() -> tuple[tuple[str, str | None, str | None], ...]:
+    """(이름, 이름에 쓰인 prefix, 이름에 쓰인 core) 전체 목록 (중복 제거, 순서 고정)"""
+    space: dict[str, tuple] = {}
+    for template in NAME_TEMPLATES:
+        uses_prefix = "{prefix}" in template
+        uses_core = "{core}" in template
+        for prefix in PREFIXES:
+            for core in CORES:
+                for suffix in SUFFIXES:
+                    name = template.format(prefix=prefix, core=core, suffix=suffix)
+                    space.setdefault(name, (
+                        name,
+                        prefix if uses_prefix else None,
+                        core if uses_core else None,
+                    ))
+    return tuple(space.values())
+
+
+def enumerate_random_names() -> list[str]:
+    """generate_random_name이 만들 수 있는 모든 이름 (중복 제거, 순서 고정)"""
+    return [entry[0] for entry in _random_name_space()]
+
+
+def generate_random_names(
+    n: int,
+    exclude: Iterable[str] = (),
+    rng: random.Random | None = None,
+) -> Iterator[dict]:
+    """랜덤 상대 n명을 중복 없이 생성 (generate_random_name과 같은 형식, 지연 반환)
+
+    이름은 템플릿 이름 공간에서 비복원 추출하고 (exclude와 정규화 이름이 같은 것은 제외),
+    스탯은 전체 배치를 한 번의 벡터 연산으로 만든다. 남은 이름이 n보다 적으면 있는 만큼만 반환.
+    """
+    import numpy as np
+
+    from core.combat_sim import random_pool_stats
+
+    rng = rng or random
+    excluded = {name_key(x) for x in exclude}
+    space = _random_name_space()
+    if excluded:
+        space = [entry for entry in space if name_key(entry[0]) not in excluded]
+    picks = rng.sample(space, min(n, len(space)))
+    stats = random_pool_stats(len(picks), np.random.default_rng(rng.getrandbits(64))).astype(int)
+
+    for (name, prefix, core), row in zip(picks, stats):
+        # 이름에 쓰이지 않은 부분은 칭호용으로 따로 뽑음 (generate_random_name과 동일)
+        prefix = prefix or rng.choice(PREFIXES)
+        core = core or rng.choice(CORES)
+        yield {
+            "name": name,
+            "title": rng.choice(_title_options(prefix, core)),
+            "stats": dict(zip(STAT_KEYS, row.tolist())),
+            "appearance_prompt": "",
+        }
+
+
+def register_user_character(
+    user_characters: list[dict],
+    character: dict,
+    index: MatchmakingIndex | None = None,
+) -> None:
+    """사용자 캐릭터 등록 (정규화 이름이 같은 기존 캐릭터는 새 것으로 교체)
+
+    index가 있으면 매칭 인덱스에도 바로 반영한다.
+    """
+    key = name_key(character["name"])
+    user_characters[:] = [c for c in user_characters if name_key(c.get("name", "")) != key]
+    user_characters.append(character)
+    if index is not None:
+        index.add(character, USER_BAND, key=key)
+
+
+def _pick_nearest(
+    rng,
+    index: MatchmakingIndex,
+    stats: dict,
+    band: str,
+    predicate=None,
+) -> dict | None:
+    """밴드 안에서 스탯 거리 MATCHMAKING_RADIUS 이내 후보 중 하나 (없으면 가장 가까운 1명)"""
+    nearest = index.nearest(stats, MATCHMAKING_MAX_CANDIDATES, bands=[band], predicate=predicate)
+    if not nearest:
+        return None
+    within = [item for d, item in nearest if d <= MATCHMAKING_RADIUS ** 2]
+    return rng.choice(within) if within else nearest[0][1]
+
+
 def pick_opponent(
     player_name: str,
     user_characters: list[dict] | None = None,
+    rng: random.Random | None = None,
+    player_stats: dict | None = None,
+    user_index: MatchmakingIndex | None = None,
 ) -> Fighter:
-    """하이브리드 매칭으로 상대 선택"""
+    """하이브리드 매칭으로 상대 선택 (rng: 배틀 RNG, 없으면 전역 random)
+
+    MATCHMAKING_MODE가 "nearest"이고 player_stats가 있으면 각 풀 안에서
+    스탯이 가까운 상대를 고른다 (사전 정의 상대는 등급 가중치로 뽑은 상대가 반경 밖일 때만
+    같은 등급의 반경 안 상대로 교체, 랜덤 상대도 반경 밖이면 스탯만 표본 인덱스의 반경 안 스탯으로 교체).
+    user_index는 사용자 캐릭터 매칭 인덱스 (register_user_character로 갱신).
+    """
+    rng = rng or random
+    nearest_mode = MATCHMAKING_MODE == "nearest" and bool(player_stats)
 
     user_chars = user_characters or []
     user_count = len(user_chars)
@@ -115,18 +244,25 @@ def pick_opponent(
             MATCHING_MATURE_USER,
         )
 
-    roll = random.random()
+    roll = rng.random()
 
     # 사용자 캐릭터 재등장
     if roll < p_user and user_chars:
-        candidates = [c for c in user_chars if c.get("name") != player_name]
+        if nearest_mode and user_index is not None:
+            chosen = _pick_nearest(
+                rng, user_index, player_stats, USER_BAND,
+                predicate=lambda c: not same_name(c.get("name", ""), player_name),
+            )
+            candidates = [chosen] if chosen else []
+        else:
+            candidates = [c for c in user_chars if not same_name(c.get("name", ""), player_name)]
         if candidates:
-            chosen = random.choice(candidates)
+            chosen = rng.choice(candidates)
             return Fighter(
                 name=chosen["name"],
                 title=chosen.get("title", ""),
                 description=chosen.get("description", ""),
-                image_base64=chosen.get("image_base64", ""),
+                image_base64=character_image(chosen),
                 stats=chosen.get("stats", {}),
                 source="user_character",
                 creator_name=chosen.get("creator_name"),
@@ -138,20 +274,30 @@ def pick_opponent(
         if characters:
             weights = [rarities.get(c.get("rarity", "common"), {}).get("weight", 0.4)
                        for c in characters]
-            chosen = random.choices(characters, weights=weights, k=1)[0]
+            chosen = rng.choices(characters, weights=weights, k=1)[0]
+            if nearest_mode and stat_distance(player_stats, chosen.get("stats", {})) > MATCHMAKING_RADIUS:
+                # 등급은 가중치로 뽑고, 스탯 차이가 크면 같은 등급의 가까운 상대로 교체
+                chosen = _pick_nearest(
+                    rng, get_static_index(), player_stats, chosen.get("rarity", "common"),
+                ) or chosen
             return Fighter(
                 name=chosen["name"],
                 title=chosen["title"],
                 description=chosen["description"],
                 stats=chosen["stats"],
                 source="predefined",
+                rarity=chosen.get("rarity", "common"),
                 appearance_prompt=chosen.get("appearance_prompt", ""),
                 image_url=chosen.get("image_url", ""),
                 image_file=chosen.get("image_file", ""),
             )
 
-    # 랜덤 생성
-    data = generate_random_name()
+    # 랜덤 생성 (nearest: 스탯 차이가 크면 스탯만 랜덤 스탯 표본 인덱스의 가까운 것으로 교체)
+    data = generate_random_name(rng)
+    if nearest_mode and stat_distance(player_stats, data["stats"]) > MATCHMAKING_RADIUS:
+        sample = _pick_nearest(rng, get_random_stat_index(), player_stats, RANDOM_BAND)
+        if sample:
+            data["stats"] = dict(sample["stats"])
     return Fighter(
         name=data["name"],
         title=data["title"],
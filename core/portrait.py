@@ -0,0 +1,147 @@
+"""절차적 초상화 생성 - 이름 해시 기반 결정적 아바타 (PIL)"""
+
+import base64
+import colorsys
+import hashlib
+import io
+import math
+from functools import lru_cache
+
+from core.names import name_key
+from core.stats import STAT_KEYS
+
+PORTRAIT_SIZE = 512
+# 즉시 표시용 플레이스홀더 크기 (작게 그려 수 ms 내 생성)
+PLACEHOLDER_SIZE = 256
+
+
+def _hsv(h: float, s: float, v: float) -> tuple[int, int, int]:
+    r, g, b = colorsys.hsv_to_rgb(h % 1.0, s, v)
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+def _seed_bytes(name: str) -> bytes:
+    """이름 -> 32바이트 시드 (name_key 기준이라 표기/별칭이 달라도 같은 그림)"""
+    return hashlib.sha256(name_key(name).encode("utf-8")).digest()
+
+
+def _stat(stats: dict | None, key: str) -> float:
+    """스탯 0~1 정규화 (없으면 0.5)"""
+    if not stats:
+        return 0.5
+    return max(0.0, min(1.0, (stats.get(key, 70) - 40) / 60))
+
+
+def render_portrait(name: str, size: int = PORTRAIT_SIZE, stats: dict | None = None) -> "Image.Image":
+    """이름(+스탯)으로 결정적인 초상화 이미지 생성 (같은 입력 -> 같은 그림)
+
+    스탯 반영: 공격 -> 가시 관, 방어 -> 테두리 두께, 속도 -> 잔상 줄,
+    행운 -> 별 개수, 카리스마 -> 후광 밝기
+    """
+    # PIL은 첫 초상화를 그릴 때 불러옴 (첫 화면 import 시간에서 제외)
+    from PIL import Image, ImageDraw
+
+    seed = _seed_bytes(name)
+    hue = seed[0] / 255
+    accent_hue = hue + 0.35 + seed[1] / 255 * 0.3
+
+    bg_top = _hsv(hue, 0.55, 0.35)
+    bg_bottom = _hsv(hue + 0.08, 0.7, 0.12)
+    body = _hsv(accent_hue, 0.6, 0.75)
+    trim = _hsv(accent_hue + 0.5, 0.5, 0.95)
+    eye = _hsv(hue + 0.5, 0.9, 1.0)
+
+    # 세로 그라디언트 배경
+    mask = Image.linear_gradient("L").resize((size, size))
+    img = Image.composite(
+        Image.new("RGB", (size, size), bg_bottom),
+        Image.new("RGB", (size, size), bg_top),
+        mask,
+    )
+    draw = ImageDraw.Draw(img)
+    u = size / 512
+
+    # 속도: 배경 잔상 줄
+    for i in range(int(_stat(stats, "speed") * 6)):
+        y = (60 + i * 70 + seed[9] % 30) * u
+        draw.line((0, y, size, y - 40 * u), fill=_hsv(hue, 0.4, 0.45), width=max(1, int(3 * u)))
+
+    # 행운: 별
+    for i in range(int(_stat(stats, "luck") * 7)):
+        sx = (seed[10 + i] / 255) * size
+        sy = (seed[17 + i] / 255) * 300 * u
+        sr = 4 * u
+        draw.ellipse((sx - sr, sy - sr, sx + sr, sy + sr), fill=(255, 244, 200))
+
+    # 카리스마: 후광 링
+    halo = 150 + seed[2] % 60
+    halo_color = _hsv(accent_hue + 0.5, 0.5, 0.5 + 0.5 * _stat(stats, "charisma"))
+    draw.ellipse(
+        (256 * u - halo * u, 200 * u - halo * u, 256 * u + halo * u, 200 * u + halo * u),
+        outline=halo_color, width=max(1, int((4 + 6 * _stat(stats, "charisma")) * u)),
+    )
+
+    # 공격: 머리 위 가시 관
+    spikes = 3 + int(_stat(stats, "attack") * 6)
+    for i in range(spikes):
+        a = math.pi * (0.2 + 0.6 * i / max(1, spikes - 1))
+        bx, by = 256 * u - math.cos(a) * 80 * u, 220 * u - math.sin(a) * 80 * u
+        tx, ty = 256 * u - math.cos(a) * 125 * u, 220 * u - math.sin(a) * 125 * u
+        draw.line((bx, by, tx, ty), fill=trim, width=max(1, int(8 * u)))
+
+    # 어깨 + 몸통
+    shoulder = 150 + seed[3] % 50
+    draw.polygon(
+        [
+            (256 * u - shoulder * u, size),
+            (256 * u - 70 * u, 330 * u),
+            (256 * u + 70 * u, 330 * u),
+            (256 * u + shoulder * u, size),
+        ],
+        fill=body,
+        outline=trim,
+        width=max(1, int((2 + 10 * _stat(stats, "defense")) * u)),
+    )
+    # 가슴 문장 (도형 종류는 해시로 결정)
+    cx, cy, r = 256 * u, 420 * u, 34 * u
+    shape = seed[4] % 3
+    if shape == 0:
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=trim)
+    elif shape == 1:
+        draw.polygon([(cx, cy - r), (cx + r, cy + r), (cx - r, cy + r)], fill=trim)
+    else:
+        draw.polygon([(cx, cy - r), (cx + r, cy), (cx, cy + r), (cx - r, cy)], fill=trim)
+
+    # 머리
+    head = 78 + seed[5] % 20
+    draw.ellipse(
+        (256 * u - head * u, 220 * u - head * u, 256 * u + head * u, 220 * u + head * u),
+        fill=_hsv(hue + 0.05, 0.25, 0.2),
+    )
+    # 눈
+    eye_y = 215 * u + (seed[6] % 20) * u
+    eye_dx = (28 + seed[7] % 14) * u
+    eye_r = (9 + seed[8] % 6) * u
+    for sx in (-1, 1):
+        ex = 256 * u + sx * eye_dx
+        draw.ellipse((ex - eye_r, eye_y - eye_r, ex + eye_r, eye_y + eye_r), fill=eye)
+
+    return img
+
+
+def render_portrait_base64(name: str, size: int = PORTRAIT_SIZE, stats: dict | None = None) -> str:
+    """절차적 초상화를 PNG base64 문자열로 반환"""
+    buffer = io.BytesIO()
+    render_portrait(name, size, stats).save(buffer, format="PNG", compress_level=1)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+@lru_cache(maxsize=256)
+def _placeholder_cached(name: str, stats_key: tuple) -> str:
+    return render_portrait_base64(name, PLACEHOLDER_SIZE, dict(stats_key) or None)
+
+
+def placeholder_portrait_base64(name: str, stats: dict | None = None) -> str:
+    """이미지 생성 전/실패 시 즉시 보여줄 플레이스홀더 초상화 (메모리 캐시)"""
+    stats_key = tuple(sorted((k, v) for k, v in (stats or {}).items() if k in STAT_KEYS))
+    return _placeholder_cached(name_key(name), stats_key)
@@ -0,0 +1,196 @@
+"""선택형 프로파일링 훅 (NAMEBATTLE_PROFILE)
+
+    with profiled("rerun_home"):
+        ...
+
+- "cprofile": cProfile로 함수별 시간 -> PROFILE_DIR/<구간>/<시각>_<pid>_<n>.prof (snakeviz, pstats)
+- "sample": 별도 스레드가 PROFILE_SAMPLE_INTERVAL마다 호출 스택을 수집
+  -> .collapsed (flamegraph.pl, speedscope에 바로 넣을 수 있는 "a;b;c 횟수" 형식)
+구간 이름별로 PROFILE_SAMPLE_EVERY번 중 1번만 측정한다. 꺼져 있으면 profiled()는
+미리 만든 nullcontext를 돌려줄 뿐이라 비용이 거의 없다.
+같은 스레드에서 이미 측정 중이면 안쪽 구간은 건너뛴다 (바깥 프로파일에 포함됨).
+
+단계별 재실행 시간(RerunStats)은 프로파일 설정과 무관하게 항상 기록한다 (재실행당 시각 측정 2번).
+"""
+
+import cProfile
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from config.settings import PROFILE_DIR, PROFILE_MODE, PROFILE_SAMPLE_EVERY, PROFILE_SAMPLE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample")
+
+_NULL = contextlib.nullcontext()
+_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+_active = threading.local()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame) -> str:
+    """프레임 -> 루트부터 ';'로 이은 collapsed 스택 한 줄"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """대상 스레드의 호출 스택을 주기적으로 수집 (순수 파이썬 샘플링 프로파일러)"""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _should_sample(label: str, every: int) -> bool:
+    with _counts_lock:
+        n = _counts[label]
+        _counts[label] = n + 1
+    return n % max(1, every) == 0
+
+
+def _output_path(label: str, ext: str) -> str:
+    directory = os.path.join(PROFILE_DIR, label)
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"{stamp}_{os.getpid()}_{_counts[label]}.{ext}")
+
+
+@contextlib.contextmanager
+def _profile(label: str, mode: str):
+    _active.on = True
+    started = time.perf_counter()
+    profiler = sampler = None
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+    try:
+        yield
+    finally:
+        # st.rerun()/st.stop()도 예외로 빠져나오므로 finally에서 저장
+        elapsed = time.perf_counter() - started
+        _active.on = False
+        try:
+            if profiler is not None:
+                profiler.disable()
+                path = _output_path(label, "prof")
+                profiler.dump_stats(path)
+            else:
+                sampler.stop()
+                path = _output_path(label, "collapsed")
+                sampler.write(path)
+            logger.info("프로파일 저장 (%s, %.0fms): %s", label, elapsed * 1000, path)
+        except OSError as e:
+            logger.warning("프로파일 저장 실패 (%s): %s", label, e)
+
+
+def profiled(label: str, mode: str | None = None, every: int | None = None):
+    """구간 프로파일링 컨텍스트 (mode/every: None이면 설정값, 꺼져 있으면 nullcontext)"""
+    mode = PROFILE_MODE if mode is None else mode
+    if not mode:
+        return _NULL
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"알 수 없는 프로파일 모드: {mode} (가능: {', '.join(PROFILE_MODES)})")
+    if getattr(_active, "on", False):
+        return _NULL
+    if not _should_sample(label, PROFILE_SAMPLE_EVERY if every is None else every):
+        return _NULL
+    return _profile(label, mode)
+
+
+class RerunStats:
+    """단계별 스크립트 재실행 시간 + 동시 실행 수 (프로세스 공유, 스레드 안전)"""
+
+    def __init__(self, maxlen: int = 2000):
+        self._maxlen = maxlen
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples: dict[str, deque] = {}
+            self._inflight = 0
+            self.max_inflight = 0
+            self.busy_seconds = 0.0  # 모든 재실행 시간의 합 (스크립트 스레드 점유)
+
+    @contextlib.contextmanager
+    def rerun(self, phase: str):
+        with self._lock:
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._inflight -= 1
+                self.busy_seconds += elapsed
+                self._samples.setdefault(phase, deque(maxlen=self._maxlen)).append(elapsed)
+
+    def summary(self) -> dict[str, dict]:
+        """단계 -> 재실행 횟수, 소요 시간 p50/p95/최대 (초)"""
+        with self._lock:
+            samples = {phase: sorted(values) for phase, values in self._samples.items()}
+        return {
+            phase: {
+                "count": len(values),
+                "p50": statistics.median(values),
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+            for phase, values in samples.items()
+        }
+
+
+_rerun_stats = RerunStats()
+
+
+def get_rerun_stats() -> RerunStats:
+    return _rerun_stats
+
+
+@contextlib.contextmanager
+def profiled_rerun(phase: str):
+    """Main.py 재실행 1회: 단계별 소요 시간 기록 + (켜져 있으면) 프로파일"""
+    with _rerun_stats.rerun(phase), profiled(f"rerun_{phase}"):
+        yield
@@ -0,0 +1,41 @@
+"""asyncio 요청 속도 제한 (토큰 버킷)"""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """분당 요청 수 제한. acquire()는 토큰이 생길 때까지 대기한다.
+
+    Args:
+        per_minute: 분당 허용 요청 수 (0 이하이면 제한 없음)
+        burst: 순간 허용량 (기본 1 - 요청을 균등 간격으로 분산)
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.per_minute = per_minute
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.per_minute <= 0:
+            return
+        rate = self.per_minute / 60.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
@@ -0,0 +1,231 @@
+"""배틀 시드/ID + 리플레이 저장소
+
+모든 무작위 선택은 배틀 시드에서 파생한 단계별 RNG를 쓴다. 같은 시드면 같은
+상대 선택/승패가 나온다. 끝난 배틀(스토리, 이미지/오디오 참조)은 저장해 두고
+리플레이 링크로 AI 호출 없이 다시 보여준다.
+
+저장할 때 DATA_SWEEP_INTERVAL마다 (프로세스 간 한 번) 백그라운드에서 정리한다:
+REPLAY_MAX_AGE가 지났거나 최근 REPLAY_MAX_COUNT개 밖인 리플레이를 지우고 그 블롭을 반납한 뒤
+블롭 저장소를 정리한다. 남은 리플레이가 참조하는 블롭은 나이로는 지우지 않는다.
+"""
+
+import base64
+import json
+import os
+import random
+import re
+import logging
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import asdict
+
+from config.settings import DATA_SWEEP_INTERVAL, REPLAY_DIR, REPLAY_MAX_AGE, REPLAY_MAX_COUNT
+from core.blob_store import BlobStore
+from core.models import BattleCost, BattleResult, BattleRound, Fighter
+from core.portrait import placeholder_portrait_base64
+
+logger = logging.getLogger(__name__)
+
+_BATTLE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_SWEEP_MARKER = ".last_sweep"
+_sweep_running = threading.Lock()
+
+_FIGHTER_FIELDS = ("name", "title", "description", "source", "rarity", "stats", "creator_name")
+
+
+def new_battle_seed() -> int:
+    return secrets.randbits(63)
+
+
+def new_battle_id() -> str:
+    return uuid.uuid4().hex
+
+
+def battle_rng(seed: int, stage: str) -> random.Random:
+    """시드 + 단계 이름으로 독립된 RNG 생성 (단계 추가가 다른 단계 결과를 바꾸지 않음)"""
+    return random.Random(f"{seed}:{stage}")
+
+
+class ReplayStore:
+    """끝난 배틀을 JSON(메타) + 블롭(이미지/오디오)으로 저장"""
+
+    def __init__(
+        self,
+        root: str = REPLAY_DIR,
+        blobs: BlobStore | None = None,
+        max_age: float = REPLAY_MAX_AGE,
+        max_count: int = REPLAY_MAX_COUNT,
+    ):
+        self.root = root
+        self.blobs = blobs or BlobStore()
+        self.max_age = max_age
+        self.max_count = max_count
+
+    def _path(self, battle_id: str) -> str:
+        if not _BATTLE_ID_RE.match(battle_id or ""):
+            raise ValueError(f"잘못된 배틀 ID: {battle_id!r}")
+        return os.path.join(self.root, f"{battle_id}.json")
+
+    def _dump_fighter(self, fighter: Fighter) -> dict:
+        data = {k: getattr(fighter, k) for k in _FIGHTER_FIELDS}
+        # 플레이스홀더는 이름으로 다시 그릴 수 있으므로 저장하지 않음
+        if fighter.image_base64 and not fighter.image_is_placeholder:
+            data["image_ref"] = self.blobs.put(base64.b64decode(fighter.image_base64), "png")
+        return data
+
+    def _load_fighter(self, data: dict) -> Fighter:
+        fighter = Fighter(**{k: data.get(k) for k in _FIGHTER_FIELDS if k in data})
+        raw = self.blobs.get(data["image_ref"]) if data.get("image_ref") else None
+        if raw:
+            fighter.image_base64 = base64.b64encode(raw).decode("utf-8")
+        else:
+            fighter.image_base64 = placeholder_portrait_base64(fighter.name, fighter.stats)
+            fighter.image_is_placeholder = True
+        return fighter
+
+    def save(self, result: BattleResult) -> str:
+        """배틀 결과 저장 후 배틀 ID 반환"""
+        battle_id = result.battle_id or new_battle_id()
+        result.battle_id = battle_id
+        if result.audio_data and not result.audio_ref:
+            result.audio_ref = self.blobs.put(result.audio_data, "wav")
+        record = {
+            "battle_id": battle_id,
+            "seed": result.seed,
+            "winner": result.winner,
+            "player": self._dump_fighter(result.player),
+            "opponent": self._dump_fighter(result.opponent),
+            "rounds": [[r.round_number, r.description, r.round_winner] for r in result.rounds],
+            "victory_line": result.victory_line,
+            "battle_summary": result.battle_summary,
+            "story": result.story,
+            "audio_ref": result.audio_ref,
+            "degradation_level": result.degradation_level,
+            "degraded": result.degraded,
+            "cost": asdict(result.cost),
+        }
+        path = self._path(battle_id)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.maybe_sweep()
+        return battle_id
+
+    def load(self, battle_id: str) -> BattleResult | None:
+        """배틀 ID로 결과 복원. 없으면 None"""
+        try:
+            with open(self._path(battle_id), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return None
+        audio = self.blobs.get(record["audio_ref"]) if record.get("audio_ref") else None
+        return BattleResult(
+            player=self._load_fighter(record["player"]),
+            opponent=self._load_fighter(record["opponent"]),
+            winner=record["winner"],
+            rounds=[BattleRound(*r) for r in record.get("rounds", [])],
+            victory_line=record.get("victory_line", ""),
+            battle_summary=record.get("battle_summary", ""),
+            story=record.get("story", ""),
+            audio_data=audio or b"",
+            audio_ref=record.get("audio_ref", ""),
+            battle_id=record["battle_id"],
+            seed=record.get("seed", 0),
+            degradation_level=record.get("degradation_level", 0),
+            degraded=record.get("degraded", []),
+            cost=BattleCost(**record.get("cost", {})),
+        )
+
+    @staticmethod
+    def _blob_refs(record: dict) -> set[str]:
+        refs = {record.get("audio_ref")}
+        refs.update(record.get(side, {}).get("image_ref") for side in ("player", "opponent"))
+        refs.discard(None)
+        refs.discard("")
+        return refs
+
+    def _records(self) -> list[tuple[float, str, set[str]]]:
+        """저장된 리플레이 (mtime, 경로, 참조 블롭) 목록"""
+        records = []
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return records
+        for entry in entries:
+            if not (entry.name.endswith(".json") and _BATTLE_ID_RE.match(entry.name[:-5])):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    refs = self._blob_refs(json.load(f))
+            except (OSError, json.JSONDecodeError, AttributeError):
+                continue
+            records.append((mtime, entry.path, refs))
+        return records
+
+    def sweep(self) -> tuple[int, int]:
+        """보존 기간/개수 초과 리플레이 삭제 + 블롭 반납, 이어서 블롭 저장소 정리
+
+        (삭제한 리플레이 수, 삭제한 블롭 수) 반환
+        """
+        cutoff = time.time() - self.max_age
+        keep: set[str] = set()
+        released: set[str] = set()
+        expired = 0
+        for i, (mtime, path, refs) in enumerate(sorted(self._records(), reverse=True)):
+            if i < self.max_count and mtime >= cutoff:
+                keep |= refs
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            released |= refs
+            expired += 1
+        removed = self.blobs.release(released - keep)
+        removed += self.blobs.sweep(keep=keep)[0]
+        if expired:
+            logger.info("리플레이 정리: %d개 삭제, 블롭 %d개 삭제", expired, removed)
+        return expired, removed
+
+    def maybe_sweep(self, interval: float = DATA_SWEEP_INTERVAL) -> bool:
+        """마지막 정리 후 interval이 지났으면 백그라운드 스레드에서 정리 시작"""
+        marker = os.path.join(self.root, _SWEEP_MARKER)
+        try:
+            if time.time() - os.stat(marker).st_mtime < interval:
+                return False
+        except FileNotFoundError:
+            pass
+        if not _sweep_running.acquire(blocking=False):
+            return False
+        try:
+            # 다른 프로세스도 이 시각을 보고 건너뛰도록 먼저 표시
+            os.makedirs(self.root, exist_ok=True)
+            with open(marker, "a"):
+                pass
+            os.utime(marker)
+        except OSError:
+            _sweep_running.release()
+            return False
+
+        def _run():
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("리플레이/블롭 정리 실패")
+            finally:
+                _sweep_running.release()
+
+        threading.Thread(target=_run, name="data-sweep", daemon=True).start()
+        return True
@@ -0,0 +1,98 @@
+"""세션 메모리 집계 + 예산 (큰 페이로드를 블롭 저장소로 내보내고 쓸 때 다시 읽음)
+
+세션 상태에서 커지는 것은 등록 캐릭터 이미지(base64)와 배틀 결과의 이미지/오디오다.
+SESSION_MEMORY_BUDGET_BYTES를 넘으면 아래 순서로 블롭 저장소에 내보내고 참조만 남긴다.
+    1. 등록 캐릭터 이미지 (오래된 것부터) -> character["image_ref"]
+    2. 배틀 결과 오디오 -> result.audio_ref (ReplayStore가 이미 저장해 둔 참조 재사용)
+진행 중인 화면이 쓰는 이미지(배틀 결과/매칭 상대 초상화)는 내보내지 않는다.
+"""
+
+import base64
+import logging
+
+from config.settings import SESSION_MEMORY_BUDGET_BYTES, SESSION_SPILL_MIN_BYTES
+from core.blob_store import BlobStore
+from core.models import BattleResult
+
+logger = logging.getLogger(__name__)
+
+
+def payload_bytes(value, seen: set | None = None) -> int:
+    """값의 대략적인 페이로드 크기 (문자열/바이트 길이 합, 객체는 필드를 따라감, 공유 객체는 1번만)"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_bytes(k, seen) + payload_bytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(payload_bytes(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        return payload_bytes(vars(value), seen)
+    return 8
+
+
+def session_usage(state) -> dict[str, int]:
+    """세션 상태 키별 페이로드 크기 (여러 키가 공유하는 객체는 처음 나온 키에만 계산)"""
+    seen: set = set()
+    return {key: payload_bytes(state[key], seen) for key in list(state.keys())}
+
+
+def character_image(character: dict, blobs: BlobStore | None = None) -> str:
+    """등록 캐릭터 이미지 base64 (내보낸 경우 블롭 저장소에서 다시 읽음)"""
+    if character.get("image_base64"):
+        return character["image_base64"]
+    ref = character.get("image_ref")
+    raw = (blobs or BlobStore()).get(ref) if ref else None
+    return base64.b64encode(raw).decode("utf-8") if raw else ""
+
+
+def result_audio(result: BattleResult, blobs: BlobStore | None = None) -> bytes:
+    """배틀 결과 오디오 (내보낸 경우 블롭 저장소에서 다시 읽음)"""
+    if result.audio_data:
+        return result.audio_data
+    if result.audio_ref:
+        return (blobs or BlobStore()).get(result.audio_ref) or b""
+    return b""
+
+
+def _spill_character(character: dict, blobs: BlobStore) -> int:
+    image_b64 = character.get("image_base64", "")
+    if len(image_b64) < SESSION_SPILL_MIN_BYTES:
+        return 0
+    character["image_ref"] = blobs.put(base64.b64decode(image_b64), "png")
+    del character["image_base64"]
+    return len(image_b64)
+
+
+def _spill_audio(result: BattleResult, blobs: BlobStore) -> int:
+    size = len(result.audio_data)
+    if size < SESSION_SPILL_MIN_BYTES:
+        return 0
+    if not result.audio_ref:
+        result.audio_ref = blobs.put(result.audio_data, "wav")
+    result.audio_data = b""
+    return size
+
+
+def enforce_budget(state, budget: int = SESSION_MEMORY_BUDGET_BYTES, blobs: BlobStore | None = None) -> int:
+    """세션 상태가 예산을 넘으면 큰 페이로드를 내보냄. 내보낸 뒤의 추정 크기 반환
+
+    state: st.session_state 또는 같은 키를 가진 dict
+    """
+    total = sum(session_usage(state).values())
+    if total <= budget:
+        return total
+    blobs = blobs or BlobStore()
+    before = total
+    for character in state.get("saved_characters") or []:
+        if total <= budget:
+            break
+        total -= _spill_character(character, blobs)
+    result = state.get("battle_result")
+    if total > budget and isinstance(result, BattleResult):
+        total -= _spill_audio(result, blobs)
+    logger.info("세션 메모리 예산 초과: %dKB -> %dKB (예산 %dKB)", before // 1024, total // 1024, budget // 1024)
+    return total
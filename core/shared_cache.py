@@ -0,0 +1,222 @@
+"""프로세스/노드 간 공유 파일 캐시
+
+여러 레플리카가 같은 디렉토리(공유 볼륨/NFS)를 캐시로 쓸 때:
+- 쓰기는 임시 파일 + os.replace (원자적 교체) -> 반쯤 쓰인 파일을 읽는 일이 없다
+- 생성은 키별 single-flight -> 한 프로세스만 생성하고 나머지는 그 결과를 읽는다
+  (프로세스 간: fcntl.lockf 레코드 락 - NFS에서도 동작, 프로세스가 죽으면 자동 해제.
+   프로세스 안: 키별 threading.Lock - lockf는 같은 프로세스의 다른 스레드를 막지 못함.
+   모든 인스턴스가 공유하고, 잡거나 기다리는 쪽이 없어지면 사라진다)
+락을 SHARED_CACHE_LOCK_TIMEOUT 안에 못 잡으면 중복 생성을 감수하고 직접 생성한다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+
+from config.settings import SHARED_CACHE_LOCK_TIMEOUT
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안 single-flight만 적용
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_LOCK_POLL_SECONDS = 0.05
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+class _KeyLock:
+    """약한 참조 테이블에 담기 위한 threading.Lock 래퍼"""
+    __slots__ = ("lock", "__weakref__")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+# 경로별 프로세스 안 락 (인스턴스 공용, 참조가 없어지면 항목도 사라짐)
+_thread_locks: "weakref.WeakValueDictionary[str, _KeyLock]" = weakref.WeakValueDictionary()
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path: str) -> _KeyLock:
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        key_lock = _thread_locks.get(key)
+        if key_lock is None:
+            key_lock = _thread_locks[key] = _KeyLock()
+        return key_lock
+
+
+class SharedFileCache:
+    """파일 경로를 키로 쓰는 텍스트 캐시 (값은 base64 등 문자열)"""
+
+    def __init__(self, lock_timeout: float = SHARED_CACHE_LOCK_TIMEOUT):
+        self.lock_timeout = lock_timeout
+        # 이벤트 루프별 키별 asyncio.Lock (루프가 끝나거나 기다리는 쪽이 없으면 함께 정리)
+        self._loop_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._loop_locks_guard = threading.Lock()
+
+    def _lock_path(self, path: str) -> str:
+        return os.path.join(os.path.dirname(path), ".locks", os.path.basename(path) + ".lock")
+
+    def get(self, path: str) -> str | None:
+        """캐시 값 읽기. 없거나 비어 있으면 None"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = f.read().strip()
+        except (FileNotFoundError, OSError):
+            return None
+        return data or None
+
+    def put(self, path: str, data: str) -> None:
+        """원자적 쓰기 (같은 디렉토리의 고유 임시 파일 -> os.replace)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _acquire(self, path: str, timeout: float) -> tuple:
+        deadline = time.monotonic() + timeout
+        # 핸들이 _KeyLock을 잡고 있어 락을 쥔 동안에는 테이블에서 사라지지 않음
+        thread_lock = _thread_lock(path)
+        if not thread_lock.lock.acquire(timeout=max(0.0, timeout)):
+            raise LockTimeout(path)
+        if fcntl is None:
+            return thread_lock, None
+        try:
+            lock_path = self._lock_path(path)
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except BaseException:
+            thread_lock.lock.release()
+            raise
+        while True:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return thread_lock, fd
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    thread_lock.lock.release()
+                    raise LockTimeout(path)
+                time.sleep(_LOCK_POLL_SECONDS)
+
+    @staticmethod
+    def _release(handle: tuple) -> None:
+        thread_lock, fd = handle
+        if fd is not None:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        thread_lock.lock.release()
+
+    @contextmanager
+    def lock(self, path: str, timeout: float | None = None):
+        """키별 배타 락 (프로세스 안 스레드 + 프로세스/노드 간). 시간 초과 시 LockTimeout"""
+        handle = self._acquire(path, self.lock_timeout if timeout is None else timeout)
+        try:
+            yield
+        finally:
+            self._release(handle)
+
+    def get_or_create(self, path: str, produce) -> str:
+        """캐시에 있으면 반환, 없으면 락을 잡고 다시 확인한 뒤 produce()로 생성해 저장"""
+        cached = self.get(path)
+        if cached:
+            return cached
+        try:
+            with self.lock(path):
+                cached = self.get(path)
+                if cached:
+                    return cached
+                data = produce()
+                if data:
+                    self.put(path, data)
+                return data
+        except LockTimeout:
+            logger.warning("캐시 락 대기 시간 초과, 직접 생성: %s", path)
+            data = produce()
+            if data:
+                self.put(path, data)
+            return data
+
+    def _loop_lock(self, path: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._loop_locks_guard:
+            locks = self._loop_locks.setdefault(loop, weakref.WeakValueDictionary())
+            lock = locks.get(path)
+            if lock is None:
+                lock = locks[path] = asyncio.Lock()
+            return lock
+
+    async def aget_or_create(self, path: str, produce) -> str:
+        """get_or_create의 asyncio 버전 (produce: 코루틴을 돌려주는 함수)
+
+        락 대기는 워커 스레드에서 하므로 이벤트 루프를 막지 않는다. 같은 루프 안의 동시 요청은
+        코루틴 수준에서 먼저 줄 세운다 (대기자가 워커 스레드를 모두 점유하면 락을 잡은 쪽의
+        to_thread 호출이 스레드를 얻지 못해 락 시간 초과까지 멈춤).
+        """
+        cached = await asyncio.to_thread(self.get, path)
+        if cached:
+            return cached
+        async with self._loop_lock(path):
+            return await self._aget_or_create_locked(path, produce)
+
+    async def _aget_or_create_locked(self, path: str, produce) -> str:
+        # 락 대기 중 취소되면, 뒤늦게 락을 잡은 워커 스레드가 바로 풀도록 표시
+        state = {"cancelled": False, "handle": None}
+        state_guard = threading.Lock()
+
+        def _acquire():
+            handle = self._acquire(path, self.lock_timeout)
+            with state_guard:
+                if state["cancelled"]:
+                    self._release(handle)
+                else:
+                    state["handle"] = handle
+
+        try:
+            await asyncio.to_thread(_acquire)
+        except LockTimeout:
+            logger.warning("캐시 락 대기 시간 초과, 직접 생성: %s", path)
+            data = await produce()
+            if data:
+                await asyncio.to_thread(self.put, path, data)
+            return data
+        except asyncio.CancelledError:
+            with state_guard:
+                state["cancelled"] = True
+                if state["handle"] is not None:
+                    self._release(state["handle"])
+            raise
+
+        try:
+            cached = await asyncio.to_thread(self.get, path)
+            if cached:
+                return cached
+            data = await produce()
+            if data:
+                await asyncio.to_thread(self.put, path, data)
+            return data
+        finally:
+            self._release(state["handle"])
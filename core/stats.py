@@ -0,0 +1,16 @@
+"""전투사 스탯 공통 정의 (NumPy 없이 쓰는 가벼운 부분)"""
+
+import hashlib
+
+from core.names import name_key
+
+STAT_KEYS = ("attack", "defense", "speed", "luck", "charisma")
+STAT_BUDGET = 380  # generate_random_name의 스탯 총합과 동일
+
+
+def stats_from_name(name: str) -> dict:
+    """이름 해시로 결정되는 스탯 (플레이어처럼 스탯이 없는 전투사용, name_key 기준)"""
+    digest = hashlib.sha256(name_key(name).encode("utf-8")).digest()
+    raw = [50 + digest[i] % 46 for i in range(len(STAT_KEYS))]
+    total = sum(raw)
+    return {k: int(v * STAT_BUDGET / total) for k, v in zip(STAT_KEYS, raw)}
@@ -0,0 +1,217 @@
+"""토너먼트 브래킷 + 병렬 배틀 스케줄러
+
+승패는 배틀 시드로 미리 정해지므로(battle_winner) 대진과 승자를 브래킷 끝까지 먼저 계산하고,
+모든 경기의 스토리/이미지 생성을 라운드 구분 없이 동시에 진행한다. 16강도 라운드 수(4)가 아니라
+동시 진행 한도(TOURNAMENT_CONCURRENCY) 안에서 배틀 한두 번 시간에 끝난다.
+외부 호출은 단계별 AsyncRateLimiter를 모든 경기가 공유해 제한하고, 여러 경기에 나오는
+참가자의 이미지는 이미지 캐시 single-flight로 한 번만 생성된다.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import random
+from dataclasses import dataclass, field
+
+from config.settings import (
+    TOURNAMENT_CONCURRENCY,
+    TOURNAMENT_MAX_PLAYERS,
+    TOURNAMENT_MIN_PLAYERS,
+    TOURNAMENT_RATE_LIMITS,
+)
+from core.battle_engine import _gather_or_cancel, battle_winner, execute_battle_async
+from core.degradation import get_degradation
+from core.models import BattleResult, Fighter
+from core.names import canonicalize_name, name_key
+from core.opponent_generator import pick_opponent
+from core.rate_limit import AsyncRateLimiter
+from core.replay import battle_rng, new_battle_seed
+from core.stats import stats_from_name
+from services.ai_service import openai_client_scope
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TournamentMatch:
+    round_index: int  # 0부터 (마지막 라운드가 결승)
+    slot: int  # 라운드 안 순서 (다음 라운드 slot // 2 경기로 진출)
+    player: Fighter
+    opponent: Fighter
+    seed: int
+    winner_name: str  # 시드로 미리 정해진 승자
+    result: BattleResult | None = None
+    error: str = ""
+
+
+@dataclass
+class Tournament:
+    seed: int
+    entrants: list = field(default_factory=list)  # 참가자 Fighter (부전승 자리는 pick_opponent 상대)
+    rounds: list = field(default_factory=list)  # 라운드별 TournamentMatch 목록
+
+    @property
+    def champion(self) -> str:
+        return self.rounds[-1][0].winner_name
+
+    def matches(self) -> list[TournamentMatch]:
+        return [m for r in self.rounds for m in r]
+
+
+def round_label(round_index: int, total_rounds: int) -> str:
+    remaining = total_rounds - round_index
+    if remaining == 1:
+        return "결승"
+    if remaining == 2:
+        return "준결승"
+    return f"{2 ** remaining}강"
+
+
+def _fill_opponents(entrants: list[Fighter], count: int, seed: int, user_characters, user_index) -> list[Fighter]:
+    """빈 자리를 pick_opponent 상대로 채움 (참가자와 이름이 겹치지 않게)"""
+    taken = {name_key(f.name) for f in entrants}
+    fillers = []
+    for i in range(count):
+        rival = entrants[i % len(entrants)]
+        for attempt in range(10):
+            opponent = pick_opponent(
+                rival.name, user_characters, rng=battle_rng(seed, f"fill:{i}:{attempt}"),
+                player_stats=rival.stats, user_index=user_index,
+            )
+            if name_key(opponent.name) not in taken:
+                break
+        taken.add(name_key(opponent.name))
+        fillers.append(opponent)
+    return fillers
+
+
+def _sides(a: Fighter, b: Fighter, rng: random.Random) -> tuple[Fighter, Fighter]:
+    """(player, opponent) 배정: 참가자 vs 채운 상대면 참가자가 player, 아니면 무작위
+
+    채운 상대끼리 만나면 한쪽은 player 자리에 서지만, 배틀에는 Fighter 전체를 넘기므로
+    스탯/이미지/설명이 그대로 유지된다.
+    """
+    if (a.source == "player") != (b.source == "player"):
+        return (a, b) if a.source == "player" else (b, a)
+    return (a, b) if rng.random() < 0.5 else (b, a)
+
+
+def build_bracket(
+    names: list[str],
+    seed: int | None = None,
+    user_characters: list[dict] | None = None,
+    user_index=None,
+) -> Tournament:
+    """이름 목록 -> 브래킷 (대진 + 시드로 정해진 승자를 결승까지 계산)
+
+    인원이 2의 거듭제곱이 아니면 pick_opponent 상대로 채운다. 채운 상대끼리는 첫 라운드에서 만나지 않는다.
+    """
+    if seed is None:
+        seed = new_battle_seed()
+    unique: dict[str, str] = {}
+    for raw in names:
+        name = canonicalize_name(raw)
+        if name and name_key(name) not in unique:
+            unique[name_key(name)] = name
+    players = list(unique.values())
+    if not TOURNAMENT_MIN_PLAYERS <= len(players) <= TOURNAMENT_MAX_PLAYERS:
+        raise ValueError(f"참가 인원은 {TOURNAMENT_MIN_PLAYERS}~{TOURNAMENT_MAX_PLAYERS}명이어야 합니다 (현재 {len(players)}명)")
+
+    rng = battle_rng(seed, "bracket")
+    rng.shuffle(players)
+    entrants = [Fighter(name=n, source="player", stats=stats_from_name(n)) for n in players]
+    size = 1 << (len(entrants) - 1).bit_length()
+    fillers = _fill_opponents(entrants, size - len(entrants), seed, user_characters, user_index)
+
+    # 첫 라운드: 모든 경기에 참가자 1명 이상 (남는 참가자 -> 남는 자리 -> 채운 상대 순)
+    half = size // 2
+    pairs = [[entrants[i]] for i in range(half)]
+    for i, fighter in enumerate(entrants[half:] + fillers):
+        pairs[i].append(fighter)
+    rng.shuffle(pairs)
+
+    tournament = Tournament(seed=seed, entrants=entrants + fillers)
+    round_index = 0
+    while pairs:
+        matches = []
+        for slot, (a, b) in enumerate(pairs):
+            player, opponent = _sides(a, b, rng)
+            match_seed = battle_rng(seed, f"match:{round_index}:{slot}").getrandbits(63)
+            matches.append(TournamentMatch(
+                round_index=round_index,
+                slot=slot,
+                player=player,
+                opponent=opponent,
+                seed=match_seed,
+                winner_name=battle_winner(player.name, opponent, match_seed, player.stats),
+            ))
+        tournament.rounds.append(matches)
+        winners = [m.player if m.winner_name == m.player.name else m.opponent for m in matches]
+        pairs = [winners[i:i + 2] for i in range(0, len(winners), 2)] if len(winners) > 1 else []
+        round_index += 1
+    return tournament
+
+
+async def run_tournament_async(
+    tournament: Tournament,
+    on_match=None,
+    tts_final: bool = False,
+    gemini_client=None,
+    image_backend=None,
+    story_backend: str | None = None,
+    session_id: str | None = None,
+    degradation_level: int | None = None,
+    concurrency: int = TOURNAMENT_CONCURRENCY,
+    rate_limits: dict | None = None,
+) -> Tournament:
+    """브래킷의 모든 경기를 동시 진행 한도/단계별 속도 제한 아래에서 실행
+
+    on_match(match)는 경기가 끝날 때마다(완료 순서대로) 호출된다. 한 경기가 실패해도
+    승자는 미리 정해져 있으므로 나머지 경기는 계속 진행하고 match.error에 남긴다.
+    TTS는 tts_final이면 결승에서만 켠다.
+    """
+    if degradation_level is None:
+        # 토너먼트 자체의 동시 배틀 수로 단계가 올라가지 않도록 시작 시점 단계로 고정
+        degradation_level = get_degradation().level()
+    limits = TOURNAMENT_RATE_LIMITS if rate_limits is None else rate_limits
+    burst = max(1, concurrency)
+    limiters = {stage: AsyncRateLimiter(per_minute, burst=burst) for stage, per_minute in limits.items()}
+    semaphore = asyncio.Semaphore(burst)
+    final_round = len(tournament.rounds) - 1
+
+    async def _play(match: TournamentMatch):
+        async with semaphore:
+            try:
+                match.result = await execute_battle_async(
+                    player_name=match.player.name,
+                    opponent=dataclasses.replace(match.opponent),
+                    player=dataclasses.replace(match.player),
+                    tts_enabled=tts_final and match.round_index == final_round,
+                    gemini_client=gemini_client,
+                    image_backend=image_backend,
+                    seed=match.seed,
+                    degradation_level=degradation_level,
+                    story_backend=story_backend,
+                    session_id=session_id,
+                    rate_limiters=limiters,
+                )
+            except Exception as e:
+                logger.warning("토너먼트 경기 실패 (%d라운드 %d경기): %s", match.round_index + 1, match.slot + 1, e)
+                match.error = str(e)
+            else:
+                actual = match.player.name if match.result.winner == "player" else match.opponent.name
+                if actual != match.winner_name:
+                    logger.error("토너먼트 승자 불일치 (%s vs %s): 예측 %s, 실제 %s",
+                                 match.player.name, match.opponent.name, match.winner_name, actual)
+        if on_match:
+            on_match(match)
+
+    # 앞 라운드부터 세마포어를 잡도록 라운드 순서대로 시작
+    async with openai_client_scope():  # 모든 경기가 OpenAI 커넥션 풀 1개를 공유
+        await _gather_or_cancel(*(_play(m) for m in tournament.matches()))
+    return tournament
+
+
+def run_tournament(tournament: Tournament, **kwargs) -> Tournament:
+    """run_tournament_async의 동기 래퍼 (on_match는 호출한 스레드에서 실행)"""
+    return asyncio.run(run_tournament_async(tournament, **kwargs))
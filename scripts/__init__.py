@@ -0,0 +1 @@
+"""운영용 CLI 스크립트 (프로젝트 루트에서 python -m scripts.<이름> 으로 실행)"""
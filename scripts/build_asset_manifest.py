@@ -0,0 +1,48 @@
+"""에셋 매니페스트 빌드 + 사전 정의 상대 풀 검증 (배포 전 실행)
+
+    python -m scripts.build_asset_manifest           # assets/manifest.json 생성
+    python -m scripts.build_asset_manifest --check   # 검증만 (깨진 참조/오래된 manifest.json이면 종료 코드 1)
+
+깨진 image_file 참조의 상대는 실행 시 매칭 풀에서 제외되므로 배포 전에 --check로 막는다.
+"""
+
+import argparse
+import sys
+
+from core.assets import (
+    MANIFEST_PATH,
+    build_manifest,
+    read_manifest_file,
+    validate_predefined_pool,
+    write_manifest,
+)
+from core.opponent_generator import load_predefined_pool
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="에셋 매니페스트 빌드")
+    parser.add_argument("--check", action="store_true", help="파일을 쓰지 않고 검증만")
+    args = parser.parse_args(argv)
+
+    manifest = build_manifest()
+    characters, _ = load_predefined_pool(check_assets=False)
+    errors = validate_predefined_pool(manifest, characters)
+    if args.check:
+        # 실행 시에는 빌드 산출물이 우선이므로 산출물 기준으로도 검증
+        built = read_manifest_file()
+        if built is not None:
+            if built.to_dict() != manifest.to_dict():
+                errors.append(f"{MANIFEST_PATH}가 에셋 디렉토리와 다릅니다 (다시 빌드 필요)")
+            errors += [e for e in validate_predefined_pool(built, characters) if e not in errors]
+
+    print(f"이미지 {len(manifest.images)}개, 사운드 {len(manifest.sounds)}개")
+    for error in errors:
+        print(f"오류: {error}")
+    if not args.check:
+        write_manifest(manifest)
+        print(f"저장: {MANIFEST_PATH}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""공유 이미지 캐시 일관성 점검 (여러 프로세스가 같은 캐시 디렉토리를 쓸 때)
+
+워커 프로세스 N개가 같은 키들을 동시에 요청하고, 동시에 덮어쓰기/읽기를 반복해 확인한다.
+    - 키마다 생성(produce)이 정확히 한 번만 일어났는가 (프로세스 간 single-flight)
+    - 모든 워커가 같은 값을 받았는가
+    - 덮어쓰는 중에 읽어도 반쯤 쓰인 값이 보이지 않는가 (원자적 교체)
+    - 임시 파일이 남지 않았는가
+여러 노드라면 --dir에 공유 볼륨 경로를 주고 각 노드에서 동시에 실행한다.
+
+    python -m scripts.cache_consistency_check --workers 8 --keys 20
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from core.shared_cache import SharedFileCache
+
+_PRODUCE_SECONDS = 0.2
+_PAYLOAD_SIZE = 256 * 1024  # 여러 번 write()로 나뉘어 쓰일 만큼 큰 값
+
+
+def _payload(key: str, writer: str) -> str:
+    # 앞뒤 표식이 같아야 온전한 값 (찢어진 읽기 검출용)
+    body = (writer * (_PAYLOAD_SIZE // len(writer) + 1))[:_PAYLOAD_SIZE]
+    return f"<{key}|{writer}>{body}</{key}|{writer}>"
+
+
+def _intact(data: str | None) -> bool:
+    if not data or not data.startswith("<"):
+        return False
+    head = data[1:data.index(">")]
+    return data.endswith(f"</{head}>")
+
+
+def _log_production(log_path: str, key: str) -> None:
+    # O_APPEND 한 줄 쓰기는 프로세스 간에도 섞이지 않는다
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, f"{key}\t{os.getpid()}\n".encode())
+    finally:
+        os.close(fd)
+
+
+def _single_flight_worker(cache_dir: str, log_path: str, keys: list[str], use_async: bool, start_at: float) -> dict:
+    cache = SharedFileCache()
+    time.sleep(max(0.0, start_at - time.time()))
+    results = {}
+
+    if use_async:
+        async def _run():
+            async def _one(key):
+                async def produce():
+                    _log_production(log_path, key)
+                    await asyncio.sleep(_PRODUCE_SECONDS)
+                    return _payload(key, f"p{os.getpid()}")
+
+                results[key] = await cache.aget_or_create(os.path.join(cache_dir, key), produce)
+
+            await asyncio.gather(*(_one(key) for key in keys))
+
+        asyncio.run(_run())
+    else:
+        for key in keys:
+            def produce(key=key):
+                _log_production(log_path, key)
+                time.sleep(_PRODUCE_SECONDS)
+                return _payload(key, f"p{os.getpid()}")
+
+            results[key] = cache.get_or_create(os.path.join(cache_dir, key), produce)
+    return results
+
+
+def _overwrite_worker(path: str, seconds: float, index: int) -> tuple[int, int]:
+    """덮어쓰기와 읽기를 번갈아 반복 -> (읽은 횟수, 찢어진 읽기 수)"""
+    cache = SharedFileCache()
+    deadline = time.monotonic() + seconds
+    reads = torn = 0
+    n = 0
+    while time.monotonic() < deadline:
+        cache.put(path, _payload("hot", f"w{index}-{n}"))
+        n += 1
+        for _ in range(5):
+            data = cache.get(path)
+            reads += 1
+            if not _intact(data):
+                torn += 1
+    return reads, torn
+
+
+def _check_single_flight(pool, cache_dir: str, workers: int, keys: list[str], mode: str) -> list[str]:
+    log_path = os.path.join(cache_dir, f"produced_{mode}.log")
+    start_at = time.time() + 1.0
+    args = [(cache_dir, log_path, keys, mode == "async" and i % 2 == 0, start_at) for i in range(workers)]
+    started = time.perf_counter()
+    results = pool.starmap(_single_flight_worker, args)
+    elapsed = time.perf_counter() - started
+
+    errors = []
+    with open(log_path, encoding="utf-8") as f:
+        produced = [line.split("\t")[0] for line in f if line.strip()]
+    for key in keys:
+        count = produced.count(key)
+        if count != 1:
+            errors.append(f"[{mode}] {key}: 생성 {count}회 (기대 1회)")
+        values = {r[key] for r in results}
+        if len(values) != 1:
+            errors.append(f"[{mode}] {key}: 워커마다 다른 값 {len(values)}종")
+        elif not _intact(values.pop()):
+            errors.append(f"[{mode}] {key}: 값이 손상됨")
+    print(f"[{mode}] 워커 {workers}개 x 키 {len(keys)}개: 생성 {len(produced)}회, {elapsed:.1f}s")
+    return errors
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="공유 이미지 캐시 일관성 점검")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--overwrite-seconds", type=float, default=2.0)
+    parser.add_argument("--dir", help="캐시 디렉토리 (기본: 임시 디렉토리)")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.dir or tempfile.mkdtemp(prefix="namebattle_cache_check_")
+    os.makedirs(cache_dir, exist_ok=True)
+    run_id = f"{os.getpid()}_{int(time.time())}"
+
+    errors = []
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(args.workers) as pool:
+        for mode in ("sync", "async"):
+            keys = [f"{run_id}_{mode}_{i}.b64" for i in range(args.keys)]
+            errors += _check_single_flight(pool, cache_dir, args.workers, keys, mode)
+
+        hot_path = os.path.join(cache_dir, f"{run_id}_hot.b64")
+        counts = pool.starmap(_overwrite_worker, [(hot_path, args.overwrite_seconds, i) for i in range(args.workers)])
+        reads = sum(r for r, _ in counts)
+        torn = sum(t for _, t in counts)
+        print(f"[overwrite] 읽기 {reads}회, 찢어진 읽기 {torn}회")
+        if torn:
+            errors.append(f"[overwrite] 찢어진 읽기 {torn}회")
+
+    leftovers = [fn for fn in os.listdir(cache_dir) if fn.endswith(".tmp")]
+    if leftovers:
+        errors.append(f"임시 파일 {len(leftovers)}개 남음")
+
+    for error in errors:
+        print(f"실패: {error}")
+    print("통과" if not errors else f"실패 {len(errors)}건", f"(캐시 디렉토리: {cache_dir})")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""비용/지연 리포트 (모든 프로세스가 남긴 비용 원장 집계)
+
+배틀당 평균 비용, 토큰/이미지/TTS 사용량, 스토리/이미지 출처 비율, 단계별 지연 p50/p95,
+지출이 큰 세션을 보여준다. 용량/비용 계획용.
+
+    python -m scripts.cost_report --hours 24
+    python -m scripts.cost_report --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+
+from config.settings import COST_LEDGER_PATH
+from core.accounting import load_ledger, summarize
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="비용/지연 리포트")
+    parser.add_argument("--path", default=COST_LEDGER_PATH)
+    parser.add_argument("--hours", type=float, default=0.0, help="최근 N시간만 (0: 전체)")
+    parser.add_argument("--top", type=int, default=5, help="지출 상위 세션 수")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    since = time.time() - args.hours * 3600 if args.hours else 0.0
+    records = load_ledger(args.path, since=since)
+    if not records:
+        print(f"기록 없음: {args.path}")
+        return 1
+
+    report = summarize(records)
+    sessions: dict[str, float] = defaultdict(float)
+    for r in records:
+        sessions[r.get("session_id") or "(없음)"] += r["cost_usd"]
+    report["top_sessions"] = sorted(sessions.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"배틀 {report['battles']}회 / 세션 {report['sessions']}개")
+    print(f"총 비용 ${report['cost_usd']:.3f} (배틀당 ${report['cost_per_battle']:.4f})")
+    print(f"LLM 호출 {report['llm_calls']}회: 입력 {report['input_tokens']:,} "
+          f"(캐시 {report['cached_tokens']:,}) / 출력 {report['output_tokens']:,} 토큰")
+    print(f"이미지 생성 {report['images_generated']}장, TTS {report['tts_chars']:,}자")
+    print(f"스토리 출처: {report['story_sources']}")
+    print(f"이미지 출처: {report['image_sources']}")
+    for stage, d in report["durations"].items():
+        print(f"  {stage:<6} p50 {d['p50']:.2f}s  p95 {d['p95']:.2f}s")
+    print("지출 상위 세션:")
+    for session_id, cost in report["top_sessions"]:
+        print(f"  {session_id[:12]:<12} ${cost:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""다중 세션 부하 테스트 (streamlit.testing AppTest로 실제 Main.py 단계 흐름 실행)
+
+세션마다 AppTest 하나를 스레드로 돌려 홈 -> 매칭 -> 확인 -> 준비 -> 배틀 -> 결과를
+--battles번 반복한다. 외부 API 없이 돌도록 템플릿 스토리 + 로컬 초상화 + TTS 끔으로
+설정하고, 데이터/이미지 캐시는 임시 디렉토리를 쓴다. 서버 쪽 sleep/재실행/상태 크기를
+바꿨을 때 전후 비교용.
+
+보고 항목:
+    - 단계별 재실행 시간 p50/p95/최대 (Main.py가 기록하는 RerunStats)
+    - 스크립트 스레드 점유율 (재실행 시간 합 / (경과 시간 x 세션 수)), 최대 동시 재실행 수
+    - 세션당 메모리 (session_state 페이로드 크기 - core.session_memory, 프로세스 RSS 증가량)
+    - 처리량 (분당 완료 배틀 수)
+
+    python -m scripts.load_test --sessions 8 --battles 2
+    python -m scripts.load_test --sessions 32 --battles 1 --json > before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PATH = os.path.join(PROJECT_ROOT, "Main.py")
+
+# 외부 API 없이 도는 설정 (config.settings를 불러오기 전에 적용해야 함)
+OFFLINE_ENV = {
+    "NAMEBATTLE_STORY_BACKEND": "template",
+    "NAMEBATTLE_IMAGE_BACKEND": "local",
+    "NAMEBATTLE_SESSION_IMAGE_BUDGET": str(10**9),
+    "NAMEBATTLE_PROFILE": "",
+}
+
+
+def _rss_bytes() -> int:
+    """현재 프로세스 RSS (Linux /proc, 그 외에는 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _click(at, label: str) -> None:
+    for button in at.button:
+        if label in button.label:
+            button.click()
+            return
+    raise RuntimeError(f"버튼 없음: {label!r} (단계: {at.session_state['phase']})")
+
+
+def _expect_phase(at, phase: str) -> None:
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    if at.session_state["phase"] != phase:
+        raise RuntimeError(f"단계 {at.session_state['phase']!r} (기대: {phase!r})")
+
+
+def _run_session(index: int, battles: int, timeout: float, start: threading.Event) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    from core.session_memory import session_usage
+
+    at = AppTest.from_file(MAIN_PATH, default_timeout=timeout)
+    at.session_state["tts_enabled"] = False
+    start.wait()
+    completed = 0
+    try:
+        at.run()
+        _expect_phase(at, "home")
+        at.text_input(key="user_name_input").input(f"부하테스트{index}")
+        at.run()
+        _click(at, "결투 시작")
+        for battle in range(battles):
+            at.run()  # 매칭 -> 확인
+            _expect_phase(at, "confirm")
+            _click(at, "대결하기")
+            at.run()  # 준비 -> 배틀 -> 결과
+            _expect_phase(at, "result")
+            completed += 1
+            if battle < battles - 1:
+                _click(at, "다른 상대 찾기")
+        error = ""
+    except Exception as e:
+        error = f"세션 {index}: {e}"
+    usage = session_usage(at.session_state.to_dict())
+    return {
+        "completed": completed,
+        "error": error,
+        "state_bytes": sum(usage.values()),
+        "state_keys": usage,
+    }
+
+
+def _started() -> threading.Event:
+    event = threading.Event()
+    event.set()
+    return event
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="다중 세션 부하 테스트 (AppTest)")
+    parser.add_argument("--sessions", type=int, default=8, help="동시 세션 수")
+    parser.add_argument("--battles", type=int, default=1, help="세션당 배틀 수")
+    parser.add_argument("--timeout", type=float, default=120.0, help="AppTest.run 1회 제한 시간 (초)")
+    parser.add_argument("--data-dir", help="런타임 데이터 디렉토리 (기본: 임시 디렉토리)")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="namebattle_load_")
+    os.environ.update(OFFLINE_ENV)
+    os.environ["NAMEBATTLE_DATA_DIR"] = data_dir
+    os.environ["NAMEBATTLE_IMAGE_CACHE_DIR"] = os.path.join(data_dir, "image_cache")
+    sys.path.insert(0, PROJECT_ROOT)
+
+    from core.profiling import get_rerun_stats
+
+    # 첫 import/매니페스트 생성 비용은 측정에서 제외 (세션 1개 예열)
+    _run_session(-1, 1, args.timeout, _started())
+    stats = get_rerun_stats()
+    stats.reset()
+
+    rss_before = _rss_bytes()
+    start = threading.Event()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [pool.submit(_run_session, i, args.battles, args.timeout, start) for i in range(args.sessions)]
+        began = time.perf_counter()
+        start.set()
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - began
+    rss_after = _rss_bytes()
+
+    completed = sum(r["completed"] for r in results)
+    errors = [r["error"] for r in results if r["error"]]
+    state_sizes = [r["state_bytes"] for r in results]
+    key_sizes: dict[str, list[int]] = {}
+    for r in results:
+        for key, size in r["state_keys"].items():
+            key_sizes.setdefault(key, []).append(size)
+
+    report = {
+        "sessions": args.sessions,
+        "battles_per_session": args.battles,
+        "completed_battles": completed,
+        "elapsed_seconds": elapsed,
+        "battles_per_minute": completed / elapsed * 60 if elapsed else 0.0,
+        "phases": stats.summary(),
+        "script_thread_occupancy": stats.busy_seconds / (elapsed * args.sessions) if elapsed else 0.0,
+        "max_concurrent_reruns": stats.max_inflight,
+        "state_bytes_p50": statistics.median(state_sizes),
+        "state_bytes_max": max(state_sizes),
+        "state_bytes_by_key": {k: max(v) for k, v in sorted(key_sizes.items(), key=lambda kv: -max(kv[1]))[:8]},
+        "rss_delta_per_session": (rss_after - rss_before) / args.sessions,
+        "rss_after": rss_after,
+        "errors": errors,
+    }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if errors else 0
+
+    print(f"세션 {args.sessions}개 x 배틀 {args.battles}회: 완료 {completed}회, {elapsed:.1f}s "
+          f"({report['battles_per_minute']:.1f} 배틀/분)")
+    print("단계별 재실행 시간:")
+    for phase, s in report["phases"].items():
+        print(f"  {phase:<9} {s['count']:>4}회  p50 {s['p50'] * 1000:7.0f}ms  "
+              f"p95 {s['p95'] * 1000:7.0f}ms  최대 {s['max'] * 1000:7.0f}ms")
+    print(f"스크립트 스레드 점유율 {report['script_thread_occupancy'] * 100:.0f}%, "
+          f"최대 동시 재실행 {report['max_concurrent_reruns']}")
+    print(f"세션 상태 크기: 중앙값 {report['state_bytes_p50'] / 1024:.0f}KB, "
+          f"최대 {report['state_bytes_max'] / 1024:.0f}KB "
+          f"(큰 키: {', '.join(f'{k} {v / 1024:.0f}KB' for k, v in report['state_bytes_by_key'].items())})")
+    print(f"RSS: 세션당 +{report['rss_delta_per_session'] / 2**20:.1f}MB (현재 {rss_after / 2**20:.0f}MB)")
+    for error in errors:
+        print(f"실패: {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""오프라인 배틀 파이프라인 벤치마크 (API 키/네트워크 불필요)
+
+템플릿 스토리 + 절차적 초상화(local 백엔드) + TTS 끔으로 execute_battle 전체를 반복 실행해
+배틀당 소요 시간과 템플릿 스토리 생성 시간을 잰다. (local 백엔드 결과는 캐시에 저장되지 않음)
+
+    python -m scripts.offline_battle_bench --battles 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from core.battle_engine import execute_battle
+from core.degradation import LEVEL_NORMAL
+from core.models import Fighter
+from core.opponent_generator import generate_random_names
+from services.image_backends import get_image_backend
+from services.story_templates import generate_template_story
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 배틀 파이프라인 벤치마크")
+    parser.add_argument("--battles", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    names = [d["name"] for d in generate_random_names(args.battles * 2)]
+    pairs = [(names[2 * i], names[2 * i + 1]) for i in range(args.battles)]
+
+    story_times = []
+    for player, opponent in pairs:
+        start = time.perf_counter()
+        generate_template_story(player, opponent, "", player)
+        story_times.append(time.perf_counter() - start)
+
+    backend = get_image_backend("local")
+    battle_times = []
+    for i, (player, opponent) in enumerate(pairs):
+        start = time.perf_counter()
+        execute_battle(
+            player, Fighter(name=opponent), tts_enabled=False, image_backend=backend,
+            seed=i, degradation_level=LEVEL_NORMAL, story_backend="template",
+        )
+        battle_times.append(time.perf_counter() - start)
+
+    print(f"템플릿 스토리: 중앙값 {statistics.median(story_times) * 1e6:.0f}us, "
+          f"p95 {_percentile(story_times, 0.95) * 1e6:.0f}us")
+    print(f"배틀 전체 ({args.battles}회): 중앙값 {statistics.median(battle_times) * 1000:.1f}ms, "
+          f"p95 {_percentile(battle_times, 0.95) * 1000:.1f}ms (첫 배틀 {battle_times[0] * 1000:.0f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
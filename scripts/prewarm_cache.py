@@ -0,0 +1,172 @@
+"""이미지 캐시 사전 생성 CLI
+
+사전 정의 상대(data/predefined_opponents.json)와 랜덤 이름 공간 전체
+(PREFIXES/CORES/SUFFIXES x 템플릿)의 캐릭터 이미지를 미리 생성해 캐시에 저장한다.
+이미 캐시된 이름은 건너뛰므로 중단 후 다시 실행하면 이어서 진행한다.
+
+    python -m scripts.prewarm_cache --pool all --concurrency 4 --rate 5
+    python -m scripts.prewarm_cache --pool predefined --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+
+from core.battle_engine import (
+    download_image_as_base64_async,
+    load_cached_image_async,
+    save_cached_image_async,
+)
+from core.opponent_generator import enumerate_random_names, load_predefined_pool
+from core.rate_limit import AsyncRateLimiter
+from services.image_backends import IMAGE_BACKENDS, get_image_backend
+
+logger = logging.getLogger(__name__)
+
+# 랜덤 상대는 스토리 없이 생성되므로 배틀 엔진의 기본 외형 묘사와 동일하게 맞춤
+DEFAULT_APPEARANCE = "fantasy warrior"
+
+
+@dataclass
+class WarmJob:
+    name: str
+    appearance_prompt: str = DEFAULT_APPEARANCE
+    image_url: str = ""
+
+
+@dataclass
+class WarmReport:
+    total: int
+    started_at: float = field(default_factory=time.monotonic)
+    skipped: int = 0
+    generated: int = 0
+    failed: list = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.skipped + self.generated + len(self.failed)
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        work = self.generated + len(self.failed)
+        remaining = self.total - self.done
+        if work:
+            eta = f"{elapsed / work * remaining:,.0f}s"
+        else:
+            eta = "-"
+        return (
+            f"[{self.done}/{self.total}] 생성 {self.generated} / 캐시 {self.skipped} / "
+            f"실패 {len(self.failed)} | 경과 {elapsed:,.0f}s | ETA {eta}"
+        )
+
+
+def collect_jobs(pool: str) -> list[WarmJob]:
+    """사전 생성 대상 목록 (로컬 이미지 파일이 있는 사전 정의 상대는 제외)"""
+    jobs: list[WarmJob] = []
+    if pool in ("predefined", "all"):
+        characters, _ = load_predefined_pool()
+        for c in characters:
+            if c.get("image_file"):
+                continue
+            jobs.append(WarmJob(
+                name=c["name"],
+                appearance_prompt=c.get("appearance_prompt", "") or DEFAULT_APPEARANCE,
+                image_url=c.get("image_url", ""),
+            ))
+    if pool in ("random", "all"):
+        jobs.extend(WarmJob(name=n) for n in enumerate_random_names())
+    return jobs
+
+
+async def prewarm(
+    jobs: list[WarmJob],
+    backend_name: str | None = None,
+    concurrency: int = 4,
+    per_minute: float = 5,
+    dry_run: bool = False,
+    report_every: float = 5.0,
+) -> WarmReport:
+    """동시성/속도 제한 하에서 캐시 미스 이름의 이미지를 생성해 저장"""
+    backend = get_image_backend(backend_name)
+    if not backend.cacheable:
+        raise ValueError(f"'{backend.name}' 백엔드 결과는 캐시에 저장하지 않습니다.")
+
+    report = WarmReport(total=len(jobs))
+    limiter = AsyncRateLimiter(per_minute)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    last_report = 0.0
+
+    def _tick():
+        nonlocal last_report
+        now = time.monotonic()
+        if now - last_report >= report_every:
+            last_report = now
+            print(report.line(), flush=True)
+
+    async def _warm(job: WarmJob):
+        if await load_cached_image_async(job.name):
+            report.skipped += 1
+            _tick()
+            return
+        if dry_run:
+            report.generated += 1
+            _tick()
+            return
+        async with semaphore:
+            try:
+                if job.image_url:
+                    image_b64 = await download_image_as_base64_async(job.image_url)
+                else:
+                    await limiter.acquire()
+                    image_b64 = await backend.agenerate(job.name, job.appearance_prompt)
+                if not image_b64:
+                    raise RuntimeError("빈 이미지")
+                await save_cached_image_async(job.name, image_b64)
+                report.generated += 1
+            except Exception as e:
+                logger.warning("사전 생성 실패: %s (%s)", job.name, e)
+                report.failed.append(job.name)
+        _tick()
+
+    await asyncio.gather(*(_warm(job) for job in jobs))
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="상대 캐릭터 이미지 캐시 사전 생성")
+    parser.add_argument("--pool", choices=["predefined", "random", "all"], default="all")
+    parser.add_argument("--backend", choices=sorted(n for n, b in IMAGE_BACKENDS.items() if b.cacheable),
+                        default=None,
+                        help="이미지 백엔드 (기본: 설정의 IMAGE_BACKEND)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 생성 수")
+    parser.add_argument("--rate", type=float, default=5, help="분당 이미지 생성 요청 수 (0=무제한)")
+    parser.add_argument("--limit", type=int, default=0, help="최대 대상 수 (0=전체)")
+    parser.add_argument("--dry-run", action="store_true", help="생성 없이 캐시 미스 수만 집계")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    jobs = collect_jobs(args.pool)
+    if args.limit:
+        jobs = jobs[:args.limit]
+    print(f"대상 {len(jobs)}개 (pool={args.pool})", flush=True)
+
+    report = asyncio.run(prewarm(
+        jobs,
+        backend_name=args.backend,
+        concurrency=args.concurrency,
+        per_minute=args.rate,
+        dry_run=args.dry_run,
+    ))
+    print(report.line())
+    if report.failed:
+        print("실패한 이름 (다시 실행하면 재시도):")
+        for name in report.failed:
+            print(f"  - {name}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""프로파일 결과 요약 (NAMEBATTLE_PROFILE로 모은 PROFILE_DIR 파일 합산)
+
+구간(rerun_home, rerun_result, battle 등)별로 .prof는 pstats로 합쳐 누적 시간 상위 함수를,
+.collapsed는 스택을 합쳐 자기 시간(leaf) 상위 프레임을 보여준다.
+--merge로 합친 collapsed 파일을 쓰면 flamegraph.pl / speedscope에 바로 넣을 수 있다.
+
+    NAMEBATTLE_PROFILE=sample NAMEBATTLE_PROFILE_EVERY=1 streamlit run Main.py
+    python -m scripts.profile_report
+    python -m scripts.profile_report --label rerun_result --merge /tmp/result.collapsed
+"""
+
+import argparse
+import glob
+import io
+import os
+import pstats
+import sys
+from collections import Counter
+
+from config.settings import PROFILE_DIR
+
+
+def _load_collapsed(paths: list[str]) -> Counter:
+    stacks = Counter()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def _report_collapsed(label: str, paths: list[str], top: int, merge: str | None) -> None:
+    stacks = _load_collapsed(paths)
+    total = sum(stacks.values())
+    leaves = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    print(f"[{label}] collapsed {len(paths)}개, 샘플 {total}개 - 자기 시간 상위")
+    for frame, count in leaves.most_common(top):
+        print(f"  {count / total * 100:5.1f}%  {frame}")
+    if merge:
+        with open(merge, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"  합친 스택 저장: {merge}")
+
+
+def _report_prof(label: str, paths: list[str], top: int) -> None:
+    out = io.StringIO()
+    stats = pstats.Stats(paths[0], stream=out)
+    for path in paths[1:]:
+        stats.add(path)
+    stats.sort_stats("cumulative").print_stats(top)
+    print(f"[{label}] prof {len(paths)}개 - 누적 시간 상위")
+    print(out.getvalue().strip())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="프로파일 결과 요약")
+    parser.add_argument("--dir", default=PROFILE_DIR)
+    parser.add_argument("--label", help="구간 이름 (기본: 전체)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--merge", help="합친 collapsed 스택을 저장할 경로 (--label과 함께)")
+    args = parser.parse_args(argv)
+
+    if args.label:
+        labels = [args.label]
+    elif os.path.isdir(args.dir):
+        labels = sorted(d for d in os.listdir(args.dir) if os.path.isdir(os.path.join(args.dir, d)))
+    else:
+        labels = []
+    if not labels:
+        print(f"프로파일 없음: {args.dir}")
+        return 1
+
+    for label in labels:
+        directory = os.path.join(args.dir, label)
+        collapsed = sorted(glob.glob(os.path.join(directory, "*.collapsed")))
+        profs = sorted(glob.glob(os.path.join(directory, "*.prof")))
+        if collapsed:
+            _report_collapsed(label, collapsed, args.top, args.merge if args.label else None)
+        if profs:
+            _report_prof(label, profs, args.top)
+        if not collapsed and not profs:
+            print(f"[{label}] 파일 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""콜드 스타트 import 시간 프로파일러 + 회귀 벤치마크
+
+Main.py 최상위 import(ast로 추출)를 새 프로세스에서 import 하며
+모듈별 시간(python -X importtime)과 전체 소요 시간을 측정한다.
+무거운 SDK가 첫 화면 전에 로드되면(지연 로딩 회귀) 실패로 표시한다.
+
+    python -m scripts.startup_profile               # 모듈별 상위 20개
+    python -m scripts.startup_profile --runs 5 --budget-ms 800   # 회귀 검사 (CI용)
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PATH = os.path.join(PROJECT_ROOT, "Main.py")
+
+# 첫 배틀 전까지 로드되면 안 되는 무거운 모듈
+LAZY_MODULES = ["openai", "typecast", "google.genai", "numpy", "httpx", "PIL", "core.battle_engine"]
+
+
+def startup_modules(path: str = MAIN_PATH) -> list[str]:
+    """Main.py 최상위 import 모듈 목록 (함수 안의 지연 import는 제외)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return modules
+
+
+_CHILD = """
+import json, sys, time
+t = time.perf_counter()
+for m in {modules!r}:
+    __import__(m)
+elapsed = (time.perf_counter() - t) * 1000
+print(json.dumps({{"elapsed_ms": elapsed, "loaded": sorted(sys.modules)}}))
+"""
+
+
+def _run_child(modules: list[str], importtime: bool) -> tuple[dict, str]:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", _CHILD.format(modules=modules)]
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """-X importtime 출력 -> (모듈, 자체 us, 누적 us) 목록"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="콜드 스타트 import 시간 프로파일")
+    parser.add_argument("--runs", type=int, default=1, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=20, help="표시할 모듈 수")
+    parser.add_argument("--budget-ms", type=float, default=0, help="중앙값이 이 값을 넘으면 실패 (0=검사 안 함)")
+    args = parser.parse_args(argv)
+
+    modules = startup_modules()
+    result, stderr = _run_child(modules, importtime=True)
+    rows = parse_importtime(stderr)
+
+    print(f"{'누적(ms)':>10} {'자체(ms)':>10}  모듈")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cumulative_us / 1000:10.1f} {self_us / 1000:10.1f}  {name}")
+
+    print("\n앱 모듈별 누적 시간:")
+    own = [r for r in rows if r[0].split(".")[0] in ("ui", "core", "services", "config")]
+    for name, _, cumulative_us in sorted(own, key=lambda r: -r[2]):
+        print(f"{cumulative_us / 1000:10.1f}  {name}")
+
+    timings = [result["elapsed_ms"]]
+    for _ in range(args.runs - 1):
+        timings.append(_run_child(modules, importtime=False)[0]["elapsed_ms"])
+    median = statistics.median(timings)
+    print(f"\n첫 화면 전 import: 중앙값 {median:.0f}ms ({len(timings)}회: "
+          + ", ".join(f"{t:.0f}" for t in timings) + ")")
+
+    failed = False
+    eager = [m for m in LAZY_MODULES if m in result["loaded"]]
+    if eager:
+        print(f"실패: 지연 로딩 대상이 첫 화면 전에 로드됨: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms and median > args.budget_ms:
+        print(f"실패: 예산 {args.budget_ms:.0f}ms 초과")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""스토리 프롬프트 버전 비교 벤치마크 (실제 API 호출 - 토큰 비용 발생)
+
+같은 이름 쌍으로 버전별 스토리를 생성하고 입력/출력 토큰, 캐시 적중률, 지연을 비교한다.
+
+    python -m scripts.story_prompt_bench --versions v1 v2 --calls 5
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from core.opponent_generator import generate_random_names
+from services.ai_service import generate_battle_story_async, openai_client_scope
+from services.llm_usage import get_usage_log
+from services.prompts import STORY_PROMPTS
+
+
+async def run(versions: list[str], calls: int) -> int:
+    pairs = [d["name"] for d in generate_random_names(calls * 2)]
+    failures = 0
+    async with openai_client_scope():
+        for version in versions:
+            for i in range(calls):
+                player, opponent = pairs[2 * i], pairs[2 * i + 1]
+                try:
+                    await generate_battle_story_async(player, opponent, "", player, prompt_version=version)
+                except Exception as e:
+                    failures += 1
+                    print(f"[{version}] 실패: {e}", flush=True)
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="스토리 프롬프트 버전별 토큰/지연 비교")
+    parser.add_argument("--versions", nargs="+", choices=sorted(STORY_PROMPTS), default=sorted(STORY_PROMPTS))
+    parser.add_argument("--calls", type=int, default=5, help="버전별 호출 수")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    failures = asyncio.run(run(args.versions, args.calls))
+
+    print(f"{'버전':<6}{'호출':>6}{'입력 토큰':>10}{'출력 토큰':>10}{'캐시':>8}{'p50(s)':>9}{'p95(s)':>9}{'잘림':>6}")
+    for version, row in sorted(get_usage_log().summary().items()):
+        print(
+            f"{version:<6}{row['calls']:>6}{row['avg_input_tokens']:>10.0f}{row['avg_output_tokens']:>10.0f}"
+            f"{row['cache_hit_rate']:>8.0%}{row['p50_latency']:>9.2f}{row['p95_latency']:>9.2f}{row['truncated']:>6}"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
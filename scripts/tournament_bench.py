@@ -0,0 +1,94 @@
+"""토너먼트 스케줄러 벤치마크 (API 키/네트워크 불필요)
+
+템플릿 스토리 + local 초상화에 이미지 1장당 --latency초 지연을 넣어 제공자 호출을 흉내 내고,
+배틀 1회(직렬)와 N명 브래킷 전체(run_tournament)의 소요 시간을 비교한다.
+실제 이미지 백엔드처럼 캐시에 저장하므로 다음 라운드에 올라간 참가자 이미지는 다시 생성하지 않는다
+(데이터/이미지 캐시는 임시 디렉토리). 브래킷 시간이 배틀 1~2회 시간 안에 들어오는지,
+속도 제한을 걸면 얼마나 늘어나는지 확인용.
+
+    python -m scripts.tournament_bench --players 16 --latency 2
+    python -m scripts.tournament_bench --players 16 --latency 2 --image-rpm 30
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+
+def _delayed_backend(latency: float):
+    from services.image_backends import LocalImageBackend
+
+    class DelayedImageBackend(LocalImageBackend):
+        """local 초상화 + 고정 지연 + 캐시 저장 (외부 이미지 API 대역)"""
+
+        cacheable = True
+
+        async def agenerate(self, character_name: str, appearance_prompt: str) -> str:
+            await asyncio.sleep(latency)
+            return await super().agenerate(character_name, appearance_prompt)
+
+    return DelayedImageBackend()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="토너먼트 스케줄러 벤치마크")
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=2.0, help="이미지 1장 생성 지연 (초)")
+    parser.add_argument("--concurrency", type=int, help="동시 진행 배틀 수 (기본: 설정값)")
+    parser.add_argument("--image-rpm", type=float, default=0, help="이미지 분당 호출 제한 (0: 제한 없음)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # 설정을 불러오기 전에 임시 디렉토리 지정 (실제 이미지 캐시를 건드리지 않음)
+    data_dir = tempfile.mkdtemp(prefix="namebattle_tournament_")
+    os.environ["NAMEBATTLE_DATA_DIR"] = data_dir
+    os.environ["NAMEBATTLE_IMAGE_CACHE_DIR"] = os.path.join(data_dir, "image_cache")
+
+    from config.settings import TOURNAMENT_CONCURRENCY
+    from core.battle_engine import execute_battle
+    from core.degradation import LEVEL_NORMAL
+    from core.models import Fighter
+    from core.opponent_generator import generate_random_names
+    from core.tournament import build_bracket, run_tournament
+
+    concurrency = args.concurrency or TOURNAMENT_CONCURRENCY
+    backend = _delayed_backend(args.latency)
+    names = [d["name"] for d in generate_random_names(args.players + 1)]
+
+    start = time.perf_counter()
+    execute_battle(
+        names[0], Fighter(name=names[-1]), tts_enabled=False, image_backend=backend,
+        seed=args.seed, degradation_level=LEVEL_NORMAL, story_backend="template",
+    )
+    serial = time.perf_counter() - start
+
+    tournament = build_bracket(names[:args.players], seed=args.seed)
+    done = []
+    start = time.perf_counter()
+    run_tournament(
+        tournament,
+        on_match=lambda m: done.append((time.perf_counter() - start, m)),
+        image_backend=backend,
+        story_backend="template",
+        degradation_level=LEVEL_NORMAL,
+        concurrency=concurrency,
+        rate_limits={"image": args.image_rpm},
+    )
+    bracket = time.perf_counter() - start
+
+    errors = [m for _, m in done if m.error]
+    print(f"배틀 1회 (직렬): {serial:.2f}s")
+    print(f"{args.players}명 브래킷 ({len(done)}경기, {len(tournament.rounds)}라운드, 동시 {concurrency}): "
+          f"{bracket:.2f}s = 배틀 {bracket / serial:.1f}회 분량")
+    print(f"우승: {tournament.champion} (첫 경기 완료 {done[0][0]:.2f}s, 결승 완료 "
+          f"{next(t for t, m in done if m.round_index == len(tournament.rounds) - 1):.2f}s)")
+    for m in errors:
+        print(f"실패: {m.round_index + 1}라운드 {m.slot + 1}경기 - {m.error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,144 +1,263 @@
 """AI 서비스 - GPT-4o-mini(텍스트, 기본) / Gemini(텍스트, 옵션) + DALL-E 3(이미지)"""
 
+import asyncio
 import json
 import base64
 import io
-import os
 import time
 import logging
-import requests as req
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
-import streamlit as st
-from openai import OpenAI
-from PIL import Image
-from dotenv import load_dotenv
+from config.secrets import get_secret
+from config.settings import GEMINI_MODEL_TEXT, IMAGE_STYLE_PREFIX, OPENAI_MODEL_TEXT
+from core.accounting import record_llm
+from core.circuit_breaker import breaker_name, get_breaker
+from services.llm_usage import LLMCall, get_usage_log
+from services.prompts import StoryPrompt, get_story_prompt
 
-from config.settings import IMAGE_STYLE_PREFIX
-
-load_dotenv()
+# openai/PIL은 첫 호출 시 불러온다 (모듈 import 비용을 콜드 스타트에서 제외)
 logger = logging.getLogger(__name__)
 
-BATTLE_STORY_PROMPT = """당신은 이름 배틀 게임의 나레이터입니다.
-두 전사의 이름을 기반으로 배틀 스토리를 만들어주세요.
-
-플레이어: {player_name}
-상대: {opponent_name} ({opponent_title})
-
-규칙:
-1. 각 이름의 의미, 느낌, 어감에서 캐릭터 능력과 무기를 창의적으로 추론하세요.
-2. 배틀은 3라운드로 구성하세요. 각 라운드는 2-3문장입니다.
-3. 최종 승자는 반드시 "{winner_name}"이어야 합니다.
-4. 한국어로 작성하되, 기술명은 한자/영어 혼용 가능합니다.
-5. 재미있고 과장된 표현을 사용하세요.
-
-반드시 아래 JSON 형식으로만 응답하세요:
-{{
-    "player_title": "플레이어의 칭호 (예: 불꽃의 검사)",
-    "opponent_title": "상대의 칭호",
-    "player_appearance": "플레이어 캐릭터 외형 묘사 (영어, 이미지 생성용)",
-    "opponent_appearance": "상대 캐릭터 외형 묘사 (영어, 이미지 생성용)",
-    "round1": "1라운드 전투 묘사",
-    "round2": "2라운드 전투 묘사",
-    "round3": "3라운드 전투 묘사",
-    "winner": "승자 이름",
-    "victory_line": "승리 선언 대사 (한국어)",
-    "battle_summary": "전체 배틀 한 줄 요약"
-}}"""
-
 
 def _get_openai_key() -> str:
     """OpenAI API 키를 secrets 또는 .env에서 가져오기"""
+    return get_secret("OPENAI_API_KEY")
+
+
+def _build_image_prompt(character_name: str, appearance_prompt: str) -> str:
+    return (
+        f"{IMAGE_STYLE_PREFIX}"
+        f"Character: {character_name}. "
+        f"{appearance_prompt}"
+    )
+
+
+def _decode_image_b64(b64_json: str) -> str:
+    """DALL-E b64_json 응답 -> 512x512 PNG base64"""
+    from PIL import Image
+
+    raw = base64.b64decode(b64_json)
+
+    img = Image.open(io.BytesIO(raw))
+    img = img.resize((512, 512), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+# openai_client_scope 안에서 공유하는 AsyncOpenAI 클라이언트 ({"client": ...}, 처음 쓸 때 생성)
+_client_scope: ContextVar[dict | None] = ContextVar("openai_client_scope", default=None)
+
+
+def _new_async_openai_client():
+    from openai import AsyncOpenAI
+
+    openai_key = _get_openai_key()
+    if not openai_key:
+        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    return AsyncOpenAI(api_key=openai_key)
+
+
+@asynccontextmanager
+async def openai_client_scope():
+    """블록 안(여기서 시작한 작업 포함)의 OpenAI 호출이 클라이언트 1개(커넥션 풀)를 공유하고 끝나면 닫음
+
+    바깥 스코프가 이미 있으면 그 클라이언트를 그대로 쓴다 (토너먼트 -> 배틀).
+    """
+    if _client_scope.get() is not None:
+        yield
+        return
+    holder: dict = {}
+    token = _client_scope.set(holder)
     try:
-        return st.secrets["OPENAI_API_KEY"]
-    except Exception:
-        return os.getenv("OPENAI_API_KEY", "")
+        yield
+    finally:
+        _client_scope.reset(token)
+        if "client" in holder:
+            await holder["client"].close()
+
+
+@asynccontextmanager
+async def _async_openai_client():
+    """스코프의 공유 클라이언트 (스코프 밖이면 이 호출만 쓰고 닫는 임시 클라이언트)"""
+    holder = _client_scope.get()
+    if holder is None:
+        client = _new_async_openai_client()
+        try:
+            yield client
+        finally:
+            await client.close()
+        return
+    if "client" not in holder:
+        holder["client"] = _new_async_openai_client()
+    yield holder["client"]
+
 
+# 사용자 키로 만든 Gemini 클라이언트 -> 브레이커 이름 (키마다 따로 열리고 닫힘)
+_gemini_breakers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
 
-def generate_battle_story_gpt(
+
+def create_gemini_client(api_key: str):
+    """사용자 API 키로 Gemini 클라이언트 생성 (키 해시별 서킷 브레이커에 연결)"""
+    from google import genai
+
+    client = genai.Client(api_key=api_key)
+    _gemini_breakers[client] = breaker_name("gemini", api_key)
+    return client
+
+
+def _gemini_breaker(gemini_client):
+    try:
+        name = _gemini_breakers.get(gemini_client, "gemini")
+    except TypeError:  # 약한 참조를 만들 수 없는 대체 클라이언트
+        name = "gemini"
+    return get_breaker(name)
+
+
+def _openai_story_request(prompt: StoryPrompt, *names: str) -> dict:
+    system, user = prompt.messages(*names)
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": user})
+    request = {
+        "model": OPENAI_MODEL_TEXT,
+        "messages": messages,
+        "response_format": {"type": "json_object"},
+        "temperature": 1.0,
+    }
+    if prompt.max_tokens:
+        request["max_tokens"] = prompt.max_tokens
+    return request
+
+
+def _parse_openai_story(prompt: StoryPrompt, response, started: float) -> dict:
+    """응답 파싱 + 토큰/지연 기록"""
+    choice = response.choices[0]
+    usage = response.usage
+    details = getattr(usage, "prompt_tokens_details", None)
+    call = LLMCall(
+        provider="openai",
+        model=OPENAI_MODEL_TEXT,
+        prompt_version=prompt.version,
+        latency=time.perf_counter() - started,
+        input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+        truncated=choice.finish_reason == "length",
+    )
+    get_usage_log().record(call)
+    record_llm(call.model, call.input_tokens, call.output_tokens, call.cached_tokens)
+    return prompt.enforce_budgets(json.loads(choice.message.content))
+
+
+def _gemini_story_config(prompt: StoryPrompt, system: str):
+    from google.genai import types
+
+    config = {"response_mime_type": "application/json", "temperature": 1.0}
+    if system:
+        config["system_instruction"] = system
+    if prompt.max_tokens:
+        config["max_output_tokens"] = prompt.max_tokens
+        # 2.5 계열의 생각 토큰이 출력 예산을 먼저 소진하지 않도록 끔
+        config["thinking_config"] = types.ThinkingConfig(thinking_budget=0)
+    return types.GenerateContentConfig(**config)
+
+
+def _parse_gemini_story(prompt: StoryPrompt, response, started: float) -> dict:
+    """응답 파싱 + 토큰/지연 기록"""
+    usage = response.usage_metadata
+    finish = response.candidates[0].finish_reason if response.candidates else None
+    call = LLMCall(
+        provider="gemini",
+        model=GEMINI_MODEL_TEXT,
+        prompt_version=prompt.version,
+        latency=time.perf_counter() - started,
+        input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+        output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        cached_tokens=getattr(usage, "cached_content_token_count", 0) or 0,
+        truncated=str(finish).endswith("MAX_TOKENS"),
+    )
+    get_usage_log().record(call)
+    record_llm(call.model, call.input_tokens, call.output_tokens, call.cached_tokens)
+    return prompt.enforce_budgets(json.loads(response.text))
+
+
+async def generate_battle_story_gpt_async(
     player_name: str,
     opponent_name: str,
     opponent_title: str,
     winner_name: str,
+    prompt_version: str | None = None,
 ) -> dict:
-    """GPT-4o-mini로 배틀 스토리 생성 (기본)"""
-    openai_key = _get_openai_key()
-    if not openai_key:
-        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
-
-    client = OpenAI(api_key=openai_key)
-    prompt = BATTLE_STORY_PROMPT.format(
-        player_name=player_name,
-        opponent_name=opponent_name,
-        opponent_title=opponent_title,
-        winner_name=winner_name,
-    )
+    """GPT-4o-mini로 배틀 스토리 생성 (asyncio)"""
+    prompt = get_story_prompt(prompt_version)
+    request = _openai_story_request(prompt, player_name, opponent_name, opponent_title, winner_name)
 
-    for attempt in range(3):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=1.0,
-            )
-            return json.loads(response.choices[0].message.content)
-        except Exception as e:
-            if "429" in str(e) and attempt < 2:
-                time.sleep(3 * (attempt + 1))
-                continue
-            raise
+    async with _async_openai_client() as client:
+        with get_breaker("openai").guard():
+            for attempt in range(3):
+                try:
+                    started = time.perf_counter()
+                    response = await client.chat.completions.create(**request)
+                    break
+                except Exception as e:
+                    if "429" in str(e) and attempt < 2:
+                        await asyncio.sleep(3 * (attempt + 1))
+                        continue
+                    raise
+    # 파싱/검증 오류는 제공자 장애가 아니므로 브레이커 밖에서 처리
+    return _parse_openai_story(prompt, response, started)
 
 
-def generate_battle_story_gemini(
+async def generate_battle_story_gemini_async(
     gemini_client,
     player_name: str,
     opponent_name: str,
     opponent_title: str,
     winner_name: str,
+    prompt_version: str | None = None,
 ) -> dict:
-    """Gemini로 배틀 스토리 생성 (옵션)"""
-    from google.genai import types
-    from config.settings import GEMINI_MODEL_TEXT
-
-    prompt = BATTLE_STORY_PROMPT.format(
-        player_name=player_name,
-        opponent_name=opponent_name,
-        opponent_title=opponent_title,
-        winner_name=winner_name,
-    )
+    """Gemini로 배틀 스토리 생성 (asyncio, client.aio 사용)"""
+    prompt = get_story_prompt(prompt_version)
+    system, user = prompt.messages(player_name, opponent_name, opponent_title, winner_name)
+    config = _gemini_story_config(prompt, system)
 
-    for attempt in range(3):
-        try:
-            response = gemini_client.models.generate_content(
-                model=GEMINI_MODEL_TEXT,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=1.0,
-                ),
-            )
-            return json.loads(response.text)
-        except Exception as e:
-            if "429" in str(e) and attempt < 2:
-                time.sleep(3 * (attempt + 1))
-                continue
-            raise
+    with _gemini_breaker(gemini_client).guard():
+        for attempt in range(3):
+            try:
+                started = time.perf_counter()
+                response = await gemini_client.aio.models.generate_content(
+                    model=GEMINI_MODEL_TEXT,
+                    contents=user,
+                    config=config,
+                )
+                break
+            except Exception as e:
+                if "429" in str(e) and attempt < 2:
+                    await asyncio.sleep(3 * (attempt + 1))
+                    continue
+                raise
+    # 파싱/검증 오류는 제공자 장애가 아니므로 브레이커 밖에서 처리
+    return _parse_gemini_story(prompt, response, started)
 
 
-def generate_battle_story(
+async def generate_battle_story_async(
     player_name: str,
     opponent_name: str,
     opponent_title: str,
     winner_name: str,
     gemini_client=None,
+    prompt_version: str | None = None,
 ) -> dict:
     """배틀 스토리 생성 - Gemini client가 있으면 Gemini, 없으면 GPT-4o-mini"""
     if gemini_client:
-        return generate_battle_story_gemini(
-            gemini_client, player_name, opponent_name, opponent_title, winner_name
+        return await generate_battle_story_gemini_async(
+            gemini_client, player_name, opponent_name, opponent_title, winner_name, prompt_version
         )
-    return generate_battle_story_gpt(
-        player_name, opponent_name, opponent_title, winner_name
+    return await generate_battle_story_gpt_async(
+        player_name, opponent_name, opponent_title, winner_name, prompt_version
     )
 
 
@@ -146,35 +265,24 @@ def generate_character_image(
     character_name: str,
     appearance_prompt: str,
 ) -> str:
-    """DALL-E 3로 캐릭터 이미지 생성, base64 문자열 반환"""
-    openai_key = _get_openai_key()
-    if not openai_key:
-        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
-
-    openai_client = OpenAI(api_key=openai_key)
-
-    full_prompt = (
-        f"{IMAGE_STYLE_PREFIX}"
-        f"Character: {character_name}. "
-        f"{appearance_prompt}"
-    )
-
-    response = openai_client.images.generate(
-        model="dall-e-3",
-        prompt=full_prompt,
-        size="1024x1024",
-        quality="standard",
-        n=1,
-    )
-
-    image_url = response.data[0].url
+    """generate_character_image_async의 동기 래퍼 (ImageBackend.generate용)"""
+    return asyncio.run(generate_character_image_async(character_name, appearance_prompt))
 
-    img_response = req.get(image_url, timeout=30)
-    img_response.raise_for_status()
 
-    img = Image.open(io.BytesIO(img_response.content))
-    img = img.resize((512, 512), Image.LANCZOS)
+async def generate_character_image_async(
+    character_name: str,
+    appearance_prompt: str,
+) -> str:
+    """DALL-E 3로 캐릭터 이미지 생성, base64 문자열 반환 (b64_json 직접 수신, 리사이즈는 워커 스레드)"""
+    async with _async_openai_client() as client:
+        with get_breaker("dalle").guard():
+            response = await client.images.generate(
+                model="dall-e-3",
+                prompt=_build_image_prompt(character_name, appearance_prompt),
+                size="1024x1024",
+                quality="standard",
+                n=1,
+                response_format="b64_json",
+            )
 
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return await asyncio.to_thread(_decode_image_b64, response.data[0].b64_json)
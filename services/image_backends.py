@@ -0,0 +1,65 @@
+"""이미지 생성 백엔드 - DALL-E 3 / 로컬 절차적 초상화 (설정으로 선택)"""
+
+import abc
+import asyncio
+
+from config.settings import IMAGE_BACKEND
+
+
+class ImageBackend(abc.ABC):
+    """캐릭터 이미지 백엔드 인터페이스"""
+
+    name = ""
+    # 결과를 이름 캐시에 저장할지 여부 (로컬 초상화로 캐시를 오염시키지 않음)
+    cacheable = True
+
+    @abc.abstractmethod
+    def generate(self, character_name: str, appearance_prompt: str) -> str:
+        """캐릭터 이미지를 512x512 PNG base64 문자열로 반환"""
+
+    async def agenerate(self, character_name: str, appearance_prompt: str) -> str:
+        """generate의 asyncio 버전 (기본: 워커 스레드에서 generate 실행)"""
+        return await asyncio.to_thread(self.generate, character_name, appearance_prompt)
+
+
+class DalleImageBackend(ImageBackend):
+    """DALL-E 3 (b64_json 응답)"""
+
+    name = "dalle"
+
+    def generate(self, character_name: str, appearance_prompt: str) -> str:
+        from services.ai_service import generate_character_image
+
+        return generate_character_image(character_name, appearance_prompt)
+
+    async def agenerate(self, character_name: str, appearance_prompt: str) -> str:
+        from services.ai_service import generate_character_image_async
+
+        return await generate_character_image_async(character_name, appearance_prompt)
+
+
+class LocalImageBackend(ImageBackend):
+    """API 없이 이름으로 초상화를 그리는 로컬 대체 백엔드 (부하 테스트용)"""
+
+    name = "local"
+    cacheable = False
+
+    def generate(self, character_name: str, appearance_prompt: str) -> str:
+        from core.portrait import render_portrait_base64
+
+        return render_portrait_base64(character_name)
+
+
+IMAGE_BACKENDS: dict[str, type[ImageBackend]] = {
+    DalleImageBackend.name: DalleImageBackend,
+    LocalImageBackend.name: LocalImageBackend,
+}
+
+
+def get_image_backend(name: str | None = None) -> ImageBackend:
+    """이름으로 이미지 백엔드 인스턴스 반환 (None이면 설정값)"""
+    key = name or IMAGE_BACKEND
+    try:
+        return IMAGE_BACKENDS[key]()
+    except KeyError:
+        raise ValueError(f"알 수 없는 이미지 백엔드: {key}") from None
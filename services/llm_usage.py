@@ -0,0 +1,64 @@
+"""LLM 호출 기록 - 프롬프트 버전별 토큰 수/지연 측정"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class LLMCall:
+    provider: str  # "openai" / "gemini"
+    model: str
+    prompt_version: str
+    latency: float  # 초
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0  # 프롬프트 캐시 적중 토큰
+    truncated: bool = False  # max_tokens에 걸려 잘림
+    at: float = field(default_factory=time.time)
+
+
+class UsageLog:
+    """최근 LLM 호출 기록 (프로세스 공유, 최대 maxlen건)"""
+
+    def __init__(self, maxlen: int = 1000):
+        self._calls: deque[LLMCall] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self) -> list[LLMCall]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> dict[str, dict]:
+        """프롬프트 버전별 호출 수, 평균 토큰, 지연 중앙값/p95, 캐시 적중률"""
+        by_version: dict[str, list[LLMCall]] = {}
+        for call in self.calls():
+            by_version.setdefault(call.prompt_version, []).append(call)
+
+        result = {}
+        for version, calls in by_version.items():
+            latencies = sorted(c.latency for c in calls)
+            input_total = sum(c.input_tokens for c in calls)
+            result[version] = {
+                "calls": len(calls),
+                "avg_input_tokens": input_total / len(calls),
+                "avg_output_tokens": sum(c.output_tokens for c in calls) / len(calls),
+                "cache_hit_rate": sum(c.cached_tokens for c in calls) / input_total if input_total else 0.0,
+                "p50_latency": statistics.median(latencies),
+                "p95_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "truncated": sum(1 for c in calls if c.truncated),
+            }
+        return result
+
+
+_usage_log = UsageLog()
+
+
+def get_usage_log() -> UsageLog:
+    return _usage_log
@@ -0,0 +1,130 @@
+"""배틀 스토리 프롬프트 (버전 관리)
+
+정적 지시문은 system 프리픽스에 두고 변수(이름/승자)만 짧은 user 메시지로 보낸다.
+프리픽스가 호출마다 같아야 제공자 측 프롬프트 캐시가 적중한다.
+필드별 글자 수 예산과 max_tokens로 출력 길이(= 생성 지연)를 제한한다.
+"""
+
+from dataclasses import dataclass, field
+
+from config.settings import STORY_PROMPT_VERSION
+
+
+@dataclass(frozen=True)
+class StoryPrompt:
+    version: str
+    system: str  # 정적 프리픽스 (비어 있으면 user 메시지에 전부 포함)
+    user_template: str
+    max_tokens: int | None = None
+    field_budgets: dict = field(default_factory=dict)  # 필드 -> 최대 글자 수
+
+    def messages(
+        self,
+        player_name: str,
+        opponent_name: str,
+        opponent_title: str,
+        winner_name: str,
+    ) -> tuple[str, str]:
+        """(system, user) 메시지"""
+        user = self.user_template.format(
+            player_name=player_name,
+            opponent_name=opponent_name,
+            opponent_title=opponent_title or "칭호 없음",
+            winner_name=winner_name,
+        )
+        return self.system, user
+
+    def enforce_budgets(self, data: dict) -> dict:
+        """예산을 넘는 필드는 잘라냄 (모델이 지시를 어겨도 화면/TTS 길이 보장)"""
+        for key, limit in self.field_budgets.items():
+            value = data.get(key)
+            if isinstance(value, str) and len(value) > limit:
+                data[key] = value[: limit - 1].rstrip() + "…"
+        return data
+
+
+# v1: 기존 프롬프트 (변수가 맨 앞, 길이 제한 없음) - 비교 측정용
+_V1_USER = """당신은 이름 배틀 게임의 나레이터입니다.
+두 전사의 이름을 기반으로 배틀 스토리를 만들어주세요.
+
+플레이어: {player_name}
+상대: {opponent_name} ({opponent_title})
+
+규칙:
+1. 각 이름의 의미, 느낌, 어감에서 캐릭터 능력과 무기를 창의적으로 추론하세요.
+2. 배틀은 3라운드로 구성하세요. 각 라운드는 2-3문장입니다.
+3. 최종 승자는 반드시 "{winner_name}"이어야 합니다.
+4. 한국어로 작성하되, 기술명은 한자/영어 혼용 가능합니다.
+5. 재미있고 과장된 표현을 사용하세요.
+
+반드시 아래 JSON 형식으로만 응답하세요:
+{{
+    "player_title": "플레이어의 칭호 (예: 불꽃의 검사)",
+    "opponent_title": "상대의 칭호",
+    "player_appearance": "플레이어 캐릭터 외형 묘사 (영어, 이미지 생성용)",
+    "opponent_appearance": "상대 캐릭터 외형 묘사 (영어, 이미지 생성용)",
+    "round1": "1라운드 전투 묘사",
+    "round2": "2라운드 전투 묘사",
+    "round3": "3라운드 전투 묘사",
+    "winner": "승자 이름",
+    "victory_line": "승리 선언 대사 (한국어)",
+    "battle_summary": "전체 배틀 한 줄 요약"
+}}"""
+
+# v2: 정적 system 프리픽스 + 필드별 길이 예산 ("winner" 필드 제거 - 승자는 미리 정해짐)
+_V2_BUDGETS = {
+    "player_title": 15,
+    "opponent_title": 15,
+    "player_appearance": 160,
+    "opponent_appearance": 160,
+    "round1": 120,
+    "round2": 120,
+    "round3": 120,
+    "victory_line": 40,
+    "battle_summary": 60,
+}
+
+_V2_SYSTEM = """당신은 이름 배틀 게임의 나레이터입니다. 두 전사의 이름으로 짧은 배틀 스토리를 만듭니다.
+
+규칙:
+1. 각 이름의 의미, 느낌, 어감에서 캐릭터 능력과 무기를 창의적으로 추론하세요.
+2. 배틀은 3라운드입니다. 각 라운드는 2문장 이내로 씁니다.
+3. 최종 승자는 반드시 사용자가 지정한 승자입니다.
+4. 한국어로 작성하되, 기술명은 한자/영어 혼용 가능합니다. 외형 묘사만 영어입니다.
+5. 재미있고 과장되게, 그러나 괄호 안 글자 수를 넘기지 마세요.
+
+반드시 아래 JSON 형식으로만 응답하세요:
+{
+"player_title": "플레이어 칭호 (15자 이내)",
+"opponent_title": "상대 칭호 (15자 이내)",
+"player_appearance": "플레이어 외형, 영어 (160자 이내)",
+"opponent_appearance": "상대 외형, 영어 (160자 이내)",
+"round1": "1라운드 (120자 이내)",
+"round2": "2라운드 (120자 이내)",
+"round3": "3라운드, 승자의 결정타 (120자 이내)",
+"victory_line": "승자의 승리 대사 (40자 이내)",
+"battle_summary": "한 줄 요약 (60자 이내)"
+}"""
+
+_V2_USER = """플레이어: {player_name}
+상대: {opponent_name} ({opponent_title})
+승자: {winner_name}"""
+
+STORY_PROMPTS = {
+    "v1": StoryPrompt(version="v1", system="", user_template=_V1_USER),
+    "v2": StoryPrompt(
+        version="v2",
+        system=_V2_SYSTEM,
+        user_template=_V2_USER,
+        max_tokens=900,
+        field_budgets=_V2_BUDGETS,
+    ),
+}
+
+
+def get_story_prompt(version: str | None = None) -> StoryPrompt:
+    """버전별 스토리 프롬프트 (None이면 설정의 STORY_PROMPT_VERSION)"""
+    version = version or STORY_PROMPT_VERSION
+    if version not in STORY_PROMPTS:
+        raise ValueError(f"알 수 없는 스토리 프롬프트 버전: {version} (가능: {', '.join(STORY_PROMPTS)})")
+    return STORY_PROMPTS[version]
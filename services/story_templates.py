@@ -0,0 +1,172 @@
+"""템플릿 스토리 엔진 - AI 호출 없이 배틀 스토리 JSON 생성
+
+이름/칭호/스탯으로 시드를 잡고, 랜덤 이름 어휘(PREFIXES/CORES/SUFFIXES)에서 뽑은
+속성·무기·기술 이름을 문장 템플릿에 채운다. generate_battle_story_async와 같은 형식을 돌려주며
+같은 입력이면 항상 같은 스토리가 나온다 (호출당 0.2ms 안팎, API 키/네트워크 불필요).
+"""
+
+import random
+
+from core.opponent_generator import CORES, PREFIXES, SUFFIXES
+from core.stats import STAT_KEYS, stats_from_name
+
+# 이름 어휘 -> 전투 묘사용 단어
+_PREFIX_ELEMENTS = {
+    "불꽃의": ("화염", "flame"), "그림자": ("그림자", "shadow"), "천둥": ("번개", "lightning"),
+    "얼음": ("냉기", "frost"), "황금": ("황금빛", "golden"), "암흑": ("암흑", "darkness"),
+    "폭풍": ("폭풍", "storm"), "강철": ("강철", "steel"), "비밀의": ("비전", "arcane"),
+    "고대": ("고대 마력", "ancient"), "심연의": ("심연", "abyssal"), "하늘": ("천공", "sky"),
+    "대지의": ("대지", "earth"), "은빛": ("은빛", "silver"), "성스러운": ("성광", "holy"),
+    "저주받은": ("저주", "cursed"), "잊혀진": ("망각", "forgotten"), "영원한": ("영원", "eternal"),
+}
+_CORE_WEAPONS = {
+    "검사": ("대검", "swordsman with a greatsword"), "마법사": ("마법 지팡이", "mage with a staff"),
+    "궁수": ("장궁", "archer with a longbow"), "기사": ("창과 방패", "knight in plate armor"),
+    "암살자": ("쌍단검", "assassin with twin daggers"), "연금술사": ("폭발 플라스크", "alchemist with flasks"),
+    "드루이드": ("덩굴 지팡이", "druid with a vine staff"), "무도가": ("맨주먹", "martial artist"),
+    "현자": ("고서", "sage holding an ancient tome"), "사냥꾼": ("석궁", "hunter with a crossbow"),
+    "해적": ("곡도", "pirate with a cutlass"), "닌자": ("수리검", "ninja with shuriken"),
+    "수호자": ("거대 방패", "guardian with a tower shield"), "파괴자": ("전투 도끼", "berserker with a battle axe"),
+    "방랑자": ("낡은 장검", "wanderer with a worn longsword"), "예언자": ("수정구", "oracle with a crystal orb"),
+}
+_STAT_STYLES = {
+    "attack": "파괴적인 일격",
+    "defense": "철벽 같은 방어",
+    "speed": "눈에 보이지 않는 속도",
+    "luck": "믿기 힘든 행운",
+    "charisma": "압도적인 기세",
+}
+_TECHNIQUE_FORMS = ["참", "섬", "폭", "파", "격", "류"]
+
+_ROUND1 = [
+    "{a}{a_gwa} {b}{b_i} 마주 선다. {a_weapon}{a_weapon_eul} 든 {a}{a_i} {a_style}{a_style_euro} 선제공격을 퍼붓지만, {b}{b_eun} {b_weapon}{b_weapon_euro} 가볍게 받아낸다.",
+    "결투장에 {a_element}{a_element_gwa} {b_element}의 기운이 부딪친다. {a}의 {a_weapon}{a_weapon_gwa} {b}의 {b_weapon}{b_weapon_i} 맞부딪치며 불꽃이 튄다.",
+    "{b}{b_i} 먼저 움직인다! {b_style}{b_style_euro} 거리를 좁히지만, {a}{a_eun} {a_weapon}{a_weapon_euro} 정면에서 맞선다.",
+]
+_ROUND2 = [
+    "{l}{l_i} 비장의 기술 「{l_tech}」{l_tech_eul} 펼친다! {l_element}의 폭풍이 {w}{w_eul} 덮치고, {w}{w_eun} 한쪽 무릎을 꿇는다.",
+    "{l}의 {l_style}{l_style_i} 빛을 발한다. 연속 공격에 밀린 {w}{w_i} 결투장 끝까지 몰린다.",
+    "팽팽한 공방 끝에 {l}{l_i} 틈을 파고든다. {l_weapon}{l_weapon_i} {w}의 어깨를 스치고, 관중석에서 탄성이 터진다.",
+]
+_ROUND3 = [
+    "그러나 {w}{w_eun} 쓰러지지 않았다. {w_element}의 기운을 한데 모은 「{w_tech}」! 일격에 {l}{l_i} 날아가 다시 일어나지 못한다.",
+    "숨을 고른 {w}{w_i} {w_style}{w_style_euro} 반격한다. {w_weapon}에 실린 「{w_tech}」{w_tech_i} {l}의 방어를 산산조각 낸다!",
+    "마지막 순간, {w}의 눈이 빛난다. 「{w_tech}」 — {w_element}의 섬광이 결투장을 가르고, {l}{l_eun} 그대로 쓰러진다.",
+]
+_VICTORY_LINES = [
+    "이것이 {w_short}의 이름에 담긴 힘이다!",
+    "{w_element}{w_element_eun} 결코 꺼지지 않는다!",
+    "다음엔 더 강해져서 와라.",
+    "내 {w_weapon}{w_weapon_eun} 아직 배가 고프다!",
+]
+_SUMMARIES = [
+    "{w}{w_i} {l}의 맹공을 견디고 「{w_tech}」 한 방으로 승리했다.",
+    "{w_element}{w_element_gwa} {l_element}의 대결, 끝까지 버틴 {w}의 승리.",
+    "{l}의 「{l_tech}」도 {w}의 {w_style}{w_style_eul} 꺾지 못했다.",
+]
+
+
+def _has_batchim(word: str) -> bool | None:
+    """마지막 글자 받침 여부 (한글이 아니면 None)"""
+    if not word:
+        return None
+    code = ord(word[-1]) - 0xAC00
+    if not 0 <= code < 11172:
+        return None
+    return code % 28 != 0
+
+
+def _josa(word: str, with_batchim: str, without: str) -> str:
+    has = _has_batchim(word)
+    if has is None:
+        return f"{with_batchim}({without})"
+    return with_batchim if has else without
+
+
+def _euro(word: str) -> str:
+    # 받침 없음 또는 ㄹ 받침이면 "로"
+    if _has_batchim(word) is None:
+        return "(으)로"
+    code = ord(word[-1]) - 0xAC00
+    return "으로" if code % 28 not in (0, 8) else "로"
+
+
+def _particles(prefix: str, word: str, out: dict) -> None:
+    out[f"{prefix}_i"] = _josa(word, "이", "가")
+    out[f"{prefix}_eun"] = _josa(word, "은", "는")
+    out[f"{prefix}_eul"] = _josa(word, "을", "를")
+    out[f"{prefix}_gwa"] = _josa(word, "과", "와")
+    out[f"{prefix}_euro"] = _euro(word)
+
+
+def _vocab_hit(text: str, vocab) -> str | None:
+    for word in vocab:
+        if word in text:
+            return word
+    return None
+
+
+def _fighter_words(name: str, title: str, stats: dict, rng: random.Random) -> dict:
+    """이름/칭호에 쓰인 어휘가 있으면 그대로, 없으면 시드 RNG로 골라 전투 묘사 단어 구성"""
+    text = f"{name} {title}"
+    prefix = _vocab_hit(text, PREFIXES) or rng.choice(PREFIXES)
+    core = _vocab_hit(text, CORES) or rng.choice(CORES)
+    element, element_en = _PREFIX_ELEMENTS[prefix]
+    weapon, weapon_en = _CORE_WEAPONS[core]
+    top_stat = max(STAT_KEYS, key=lambda k: stats.get(k, 0))
+    technique = f"{element} {rng.choice(SUFFIXES)}{rng.choice(_TECHNIQUE_FORMS)}"
+    return {
+        "prefix": prefix,
+        "core": core,
+        "element": element,
+        "weapon": weapon,
+        "style": _STAT_STYLES[top_stat],
+        "tech": technique,
+        "title": title or rng.choice([f"{prefix} {core}", f"전설의 {core}", f"떠도는 {core}"]),
+        "appearance": f"{element_en} {weapon_en}, {top_stat}-focused fighter",
+    }
+
+
+def generate_template_story(
+    player_name: str,
+    opponent_name: str,
+    opponent_title: str,
+    winner_name: str,
+    player_stats: dict | None = None,
+    opponent_stats: dict | None = None,
+    player_title: str = "",
+) -> dict:
+    """generate_battle_story_async와 같은 형식의 스토리 (같은 입력 -> 같은 결과)"""
+    rng = random.Random(f"{player_name}|{opponent_name}|{opponent_title}|{winner_name}")
+    player = _fighter_words(player_name, player_title, player_stats or stats_from_name(player_name), rng)
+    opponent = _fighter_words(opponent_name, opponent_title, opponent_stats or stats_from_name(opponent_name), rng)
+
+    player_wins = winner_name == player_name
+    w_name, l_name = (player_name, opponent_name) if player_wins else (opponent_name, player_name)
+    w, l = (player, opponent) if player_wins else (opponent, player)
+
+    # 템플릿 슬롯: a/b = 플레이어/상대, w/l = 승자/패자 (+ 단어별 조사)
+    slots = {"w_short": w_name.split()[-1]}
+    for key, name, words in (("a", player_name, player), ("b", opponent_name, opponent),
+                             ("w", w_name, w), ("l", l_name, l)):
+        slots[key] = name
+        _particles(key, name, slots)
+        for field in ("element", "weapon", "style", "tech"):
+            slots[f"{key}_{field}"] = words[field]
+            _particles(f"{key}_{field}", words[field], slots)
+
+    def fill(templates: list[str]) -> str:
+        return rng.choice(templates).format(**slots)
+
+    return {
+        "player_title": player["title"],
+        "opponent_title": opponent["title"],
+        "player_appearance": player["appearance"],
+        "opponent_appearance": opponent["appearance"],
+        "round1": fill(_ROUND1),
+        "round2": fill(_ROUND2),
+        "round3": fill(_ROUND3),
+        "winner": winner_name,
+        "victory_line": fill(_VICTORY_LINES),
+        "battle_summary": fill(_SUMMARIES),
+    }
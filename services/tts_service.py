@@ -1,16 +1,13 @@
 """TTS 서비스 - Typecast API"""
 
 import logging
-import os
 import re
 
-import streamlit as st
-from typecast import Typecast
-from typecast.models import TTSRequest
-from dotenv import load_dotenv
-
-load_dotenv()
+from config.secrets import get_secret
+from core.accounting import record_tts
+from core.circuit_breaker import CircuitOpenError, get_breaker
 
+# typecast SDK는 첫 호출 시 불러온다
 logger = logging.getLogger(__name__)
 
 TYPECAST_VOICE_ID = "tc_66f4ecd1e386a91199bb0bf1"
@@ -27,32 +24,74 @@ def clean_story_for_tts(story: str) -> str:
     return text.strip()
 
 
+def _get_typecast_key() -> str:
+    return get_secret("TYPECAST_API_KEY")
+
+
+def _build_tts_request(story: str, victory_line: str, winner_name: str):
+    from typecast.models import TTSRequest
+
+    tts_text = clean_story_for_tts(story)
+    if victory_line and winner_name:
+        tts_text += f"\n\n{winner_name}이 외친다. {victory_line}"
+    return TTSRequest(
+        text=tts_text,
+        model=TYPECAST_MODEL,
+        voice_id=TYPECAST_VOICE_ID,
+    )
+
+
 def generate_tts_audio(
     story: str,
     victory_line: str = "",
     winner_name: str = "",
 ) -> bytes | None:
     """배틀 스토리 -> WAV 오디오 바이트 반환"""
-    try:
-        api_key = st.secrets["TYPECAST_API_KEY"]
-    except Exception:
-        api_key = os.getenv("TYPECAST_API_KEY", "")
+    api_key = _get_typecast_key()
     if not api_key:
         logger.warning("TYPECAST_API_KEY가 설정되지 않았습니다.")
         return None
 
-    tts_text = clean_story_for_tts(story)
-    if victory_line and winner_name:
-        tts_text += f"\n\n{winner_name}이 외친다. {victory_line}"
-
     try:
+        from typecast import Typecast
+
         client = Typecast(api_key=api_key)
-        response = client.text_to_speech(TTSRequest(
-            text=tts_text,
-            model=TYPECAST_MODEL,
-            voice_id=TYPECAST_VOICE_ID,
-        ))
+        request = _build_tts_request(story, victory_line, winner_name)
+        with get_breaker("typecast").guard():
+            response = client.text_to_speech(request)
+        record_tts(len(request.text))
         return response.audio_data
+    except CircuitOpenError:
+        logger.warning("TTS 건너뜀 (Typecast 서킷 브레이커 open)")
+        return None
+    except Exception as e:
+        logger.warning("TTS 생성 실패 (API 키 소진 또는 서비스 오류): %s", e)
+        return None
+
+
+async def generate_tts_audio_async(
+    story: str,
+    victory_line: str = "",
+    winner_name: str = "",
+) -> bytes | None:
+    """generate_tts_audio의 asyncio 버전 (AsyncTypecast)"""
+    api_key = _get_typecast_key()
+    if not api_key:
+        logger.warning("TYPECAST_API_KEY가 설정되지 않았습니다.")
+        return None
+
+    try:
+        from typecast import AsyncTypecast
+
+        request = _build_tts_request(story, victory_line, winner_name)
+        with get_breaker("typecast").guard():
+            async with AsyncTypecast(api_key=api_key) as client:
+                response = await client.text_to_speech(request)
+        record_tts(len(request.text))
+        return response.audio_data
+    except CircuitOpenError:
+        logger.warning("TTS 건너뜀 (Typecast 서킷 브레이커 open)")
+        return None
     except Exception as e:
         logger.warning("TTS 생성 실패 (API 키 소진 또는 서비스 오류): %s", e)
         return None
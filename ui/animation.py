@@ -1,10 +1,7 @@
 """배틀 애니메이션 모듈"""
 
 import streamlit.components.v1 as components
-from ui.sounds import (
-    AUDIO_INIT_JS, SFX_CLASH_JS, SFX_VS_SLAM_JS, SFX_IMPACT_JS,
-    load_bgm_data_uri,
-)
+from ui.sounds import AUDIO_INIT_JS
 
 
 def render_battle_animation(
@@ -26,8 +23,6 @@ def render_battle_animation(
     player_src = f"data:image/png;base64,{player_img_b64}" if player_img_b64 else placeholder_svg
     opponent_src = f"data:image/png;base64,{opponent_img_b64}" if opponent_img_b64 else placeholder_svg
 
-    battle_bgm_uri = load_bgm_data_uri("battle_bgm.mp3")
-
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -199,17 +194,13 @@ def render_battle_animation(
         <div class="shockwave" id="shock1"></div>
         <div class="shockwave" id="shock2"></div>
         <div class="whiteout" id="whiteout"></div>
-        {"<audio id='bgm' autoplay loop><source src='" + battle_bgm_uri + "' type='audio/mpeg'></audio>" if battle_bgm_uri else ""}
     </div>
 
     <script>
         {AUDIO_INIT_JS}
-        {SFX_VS_SLAM_JS}
-        {SFX_IMPACT_JS}
 
-        /* BGM 볼륨 설정 & 화이트아웃 시 페이드아웃 */
-        var bgm = document.getElementById('bgm');
-        if (bgm) {{ bgm.volume = 0.5; }}
+        /* BGM (화이트아웃 시 페이드아웃) */
+        _bgm('battle', 0.5);
 
         const L = document.getElementById('charLeft');
         const R = document.getElementById('charRight');
@@ -330,12 +321,7 @@ def render_battle_animation(
         /* 3.9s: 화이트아웃 (맞붙은 상태에서) + BGM 페이드아웃 */
         setTimeout(() => {{
             whiteout.classList.add('active');
-            if (bgm) {{
-                var fadeOut = setInterval(() => {{
-                    if (bgm.volume > 0.05) {{ bgm.volume -= 0.05; }}
-                    else {{ bgm.pause(); clearInterval(fadeOut); }}
-                }}, 100);
-            }}
+            _fadeBgm(1.0);
         }}, 3900);
     </script>
     </body>
@@ -355,8 +341,6 @@ def render_loading_animation(
     AI 생성이 완료될 때까지 무한 루프합니다.
     """
 
-    loading_bgm_uri = load_bgm_data_uri("loading_bgm.mp3")
-
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -495,7 +479,6 @@ def render_loading_animation(
         <div class="center-text" id="centerText"></div>
         <div class="status-text">BATTLE LOADING...</div>
         <canvas id="sparkCanvas"></canvas>
-        {"<audio autoplay loop><source src='" + loading_bgm_uri + "' type='audio/mpeg'></audio>" if loading_bgm_uri else ""}
     </div>
 
     <script>
@@ -509,7 +492,7 @@ def render_loading_animation(
 
         /* 효과음 초기화 */
         {AUDIO_INIT_JS}
-        {SFX_CLASH_JS}
+        _bgm('loading');
 
         cvs.width = arena.offsetWidth || 600;
         cvs.height = arena.offsetHeight || 350;
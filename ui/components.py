@@ -3,20 +3,9 @@
 import base64
 import time
 import streamlit as st
-import streamlit.components.v1 as components
 
-
-# 내장 SVG 플레이스홀더 (외부 서버 의존 없음)
-_PLACEHOLDER_SVG = (
-    "data:image/svg+xml,"
-    "%3Csvg xmlns='http://www.w3.org/2000/svg' width='512' height='512'%3E"
-    "%3Crect width='512' height='512' fill='%23262730'/%3E"
-    "%3Ctext x='50%25' y='45%25' font-size='120' text-anchor='middle' "
-    "dy='.3em' fill='%23555'%3E%3F%3C/text%3E"
-    "%3Ctext x='50%25' y='70%25' font-size='24' text-anchor='middle' "
-    "fill='%23666'%3EGenerating...%3C/text%3E"
-    "%3C/svg%3E"
-)
+from config.settings import HISTORY_PAGE_SIZE
+from core.portrait import placeholder_portrait_base64
 
 
 def render_title():
@@ -31,20 +20,11 @@ def render_title():
 
 def render_fighter_card(name: str, title: str, image_b64: str, is_winner: bool | None = None):
     """전투사 카드 렌더링"""
-    if image_b64:
-        st.image(
-            base64.b64decode(image_b64),
-            width="stretch",
-        )
-    else:
-        # 내장 SVG 플레이스홀더
-        components.html(
-            f'<div style="text-align:center;">'
-            f'<img src="{_PLACEHOLDER_SVG}" '
-            f'style="width:100%;border-radius:12px;"/>'
-            f'</div>',
-            height=300,
-        )
+    # 이미지가 없으면 이름 기반 절차적 초상화로 대체
+    st.image(
+        base64.b64decode(image_b64 or placeholder_portrait_base64(name)),
+        width="stretch",
+    )
 
     st.html(f"""
     <div style="text-align:center;">
@@ -59,6 +39,12 @@ def render_fighter_card(name: str, title: str, image_b64: str, is_winner: bool |
         st.error("DEFEAT", icon="\U0001F4A2")
 
 
+def render_portrait_slot(slot, fighter) -> None:
+    """st.empty 슬롯에 전투사 초상화 표시 (플레이스홀더 -> 실제 이미지 교체용)"""
+    caption = f"{fighter.name} (생성 중...)" if fighter.image_is_placeholder else fighter.name
+    slot.image(base64.b64decode(fighter.image_base64), caption=caption, width="stretch")
+
+
 def render_vs_badge():
     """VS 배지"""
     st.html('<div style="text-align:center;padding:20px 0;"><span class="vs-badge">VS</span></div>')
@@ -117,26 +103,67 @@ def render_opponent_reveal(player_name: str, opponent_name: str, opponent_title:
         st.html('<div style="text-align:center;"><span style="background:#444;color:#fff;padding:2px 10px;border-radius:8px;font-size:0.8rem;">RANDOM</span></div>')
 
 
-def render_battle_history(history: list):
-    """전적 기록 상세 표시"""
+def render_leaderboard(entries: list, highlight_name: str = ""):
+    """리더보드 상위 목록 표시"""
+    if not entries:
+        st.info("아직 랭킹이 없습니다.")
+        return
+
+    lines = []
+    for rank, stats in enumerate(entries, 1):
+        medal = {1: "\U0001F947", 2: "\U0001F948", 3: "\U0001F949"}.get(rank, f"{rank}.")
+        name = f"**{stats.name}**" if stats.name == highlight_name else stats.name
+        legendary = stats.beaten_by_rarity.get("legendary", 0)
+        legend_tag = f" · 전설 격파 {legendary}" if legendary else ""
+        lines.append(
+            f"{medal} {name} — {stats.wins}승 {stats.losses}패 "
+            f"(최고 {stats.best_streak}연승{legend_tag})"
+        )
+    st.markdown("  \n".join(lines))
+
+
+def render_tournament_match(slot, match: dict | None, pending_label: str = "대기 중") -> None:
+    """st.empty 슬롯에 토너먼트 경기 1개 표시 (match: 경기 요약 dict, None이면 대기 표시)"""
+    if match is None:
+        slot.markdown(f"\u23F3 {pending_label}")
+        return
+    lines = []
+    for name in (match["player"], match["opponent"]):
+        lines.append(f"\U0001F3C6 **{name}**" if name == match["winner"] else f"~~{name}~~")
+    if match.get("summary"):
+        lines.append(f"*{match['summary']}*")
+    if match.get("error"):
+        lines.append("\u26A0\uFE0F 배틀 생성 실패 (승부는 그대로 반영)")
+    elif match.get("battle_id"):
+        lines.append(f"`?replay={match['battle_id']}`")
+    slot.markdown("  \n".join(lines))
+
+
+def render_battle_history(history, page_size: int = HISTORY_PAGE_SIZE, key: str = "history_page"):
+    """전적 기록 상세 표시 (통계는 누적 카운터, 목록은 한 페이지만 렌더링)"""
     if not history:
         st.info("아직 전적이 없습니다. 첫 배틀을 시작해보세요!")
         return
 
-    wins = sum(1 for h in history if h["result"] == "player")
-    losses = len(history) - wins
-    win_rate = wins / len(history) * 100
-
     # 전체 통계
     col1, col2, col3 = st.columns(3)
-    col1.metric("승리", f"{wins}회")
-    col2.metric("패배", f"{losses}회")
-    col3.metric("승률", f"{win_rate:.0f}%")
+    col1.metric("승리", f"{history.wins}회")
+    col2.metric("패배", f"{history.losses}회")
+    col3.metric("승률", f"{history.win_rate:.0f}%")
 
     st.markdown("---")
 
-    # 전적 목록
-    for i, record in enumerate(reversed(history), 1):
+    page_count = history.page_count(page_size)
+    page = 0
+    if page_count > 1:
+        page = st.number_input(
+            f"페이지 (총 {page_count})", min_value=1, max_value=page_count, value=1, key=key,
+        ) - 1
+
+    # 전적 목록 (현재 페이지만, 하나의 마크다운 블록으로)
+    lines = []
+    first_no = page * page_size + 1
+    for i, record in enumerate(history.page(page, page_size), first_no):
         is_win = record["result"] == "player"
         emoji = "\U0001F3C6" if is_win else "\U0001F4A2"
         result_text = "승리" if is_win else "패배"
@@ -145,8 +172,11 @@ def render_battle_history(history: list):
             source_tag = " `BOSS`"
         elif record.get("opponent_source") == "user_character":
             source_tag = " `PLAYER`"
+        if record.get("mode") == "tournament":
+            source_tag += " `TOURNAMENT`"
 
-        st.markdown(
+        lines.append(
             f"{i}. {emoji} **{record['player']}** vs **{record['opponent']}**{source_tag} "
             f"- {result_text}"
         )
+    st.markdown("\n".join(lines))
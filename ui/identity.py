@@ -0,0 +1,35 @@
+"""플레이어 식별 - 플레이어 ID(쿠키)와 접속 키
+
+플레이어 ID는 URL이 아니라 쿠키에 둔다 (링크를 공유해도 전적이 따라가지 않음).
+전적과 비용 예산은 플레이어 ID 단위이고, 접속 IP에서 만든 키는 쿠키를 지워 예산을 새로 받는
+남용을 막는 접속별 상한(CostLedger.bind_client)에만 쓴다.
+"""
+
+import hashlib
+
+import streamlit as st
+
+from config.settings import PLAYER_COOKIE, PLAYER_COOKIE_MAX_AGE
+from core.history import is_valid_player_id, new_player_id
+
+
+def resolve_player_id() -> str:
+    """쿠키의 플레이어 ID (없거나 형식이 틀리면 새로 발급하고 쿠키 저장)"""
+    player_id = st.context.cookies.get(PLAYER_COOKIE)
+    if is_valid_player_id(player_id):
+        return player_id
+    player_id = new_player_id()
+    st.html(
+        f"<script>document.cookie='{PLAYER_COOKIE}={player_id}; Max-Age={PLAYER_COOKIE_MAX_AGE}; "
+        "Path=/; SameSite=Strict';</script>",
+        unsafe_allow_javascript=True,
+    )
+    return player_id
+
+
+def client_key() -> str | None:
+    """접속 IP 해시 (IP를 모르면 None)"""
+    ip = st.context.ip_address
+    if not isinstance(ip, str) or not ip:
+        return None
+    return "ip-" + hashlib.sha256(ip.encode("utf-8")).hexdigest()[:32]
@@ -0,0 +1,52 @@
+"""화면 단계(phase) 상태 머신
+
+단계 전환은 여기서만 일어나고 전환 시에만 전체 스크립트를 다시 실행한다.
+같은 단계 안의 상호작용(사이드바, 전적 패널 등)은 st.fragment로 해당 부분만 재실행한다.
+"""
+
+import logging
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("home", "matching", "confirm", "prepare", "battle", "result", "tournament")
+
+# 허용된 전환 (현재 단계 -> 다음 단계)
+TRANSITIONS = {
+    "home": {"matching", "tournament"},
+    "matching": {"confirm", "home"},
+    "confirm": {"prepare", "matching", "home"},
+    "prepare": {"battle", "home"},
+    "battle": {"result", "home"},
+    "result": {"matching", "home"},
+    "tournament": {"home"},
+}
+
+
+def current_phase() -> str:
+    if "phase" not in st.session_state:
+        reset_phase("home")
+    return st.session_state.phase
+
+
+def reset_phase(phase: str) -> None:
+    """전환 검사 없이 단계 지정 (세션 시작, 리플레이 링크 진입용)"""
+    if phase not in PHASES:
+        raise ValueError(f"알 수 없는 단계: {phase}")
+    st.session_state.phase = phase
+    st.session_state._scroll_pending = True
+
+
+def go_to(phase: str) -> None:
+    """다음 단계로 전환 후 앱 전체 재실행 (프래그먼트 안에서 호출해도 앱 단위로 재실행)"""
+    prev = current_phase()
+    if phase not in TRANSITIONS.get(prev, ()):
+        logger.warning("허용되지 않은 단계 전환: %s -> %s", prev, phase)
+    reset_phase(phase)
+    st.rerun(scope="app")
+
+
+def consume_scroll() -> bool:
+    """단계 진입 후 첫 실행에서만 True (스크롤 스크립트 중복 주입 방지)"""
+    return st.session_state.pop("_scroll_pending", False)
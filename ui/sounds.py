@@ -1,130 +1,181 @@
-"""효과음 모듈 - Web Audio API 합성음 + MP3 파일 재생"""
+"""효과음 모듈 - 세션당 한 번 띄우는 사운드 엔진 + 이름 붙은 큐 재생
+
+엔진(AudioContext 1개, 합성 효과음, 디코딩된 MP3 버퍼)은 페이지 최상위 문서에
+한 번만 올라가고, 이후 효과음/BGM은 짧은 명령 스크립트로만 요청한다.
+애니메이션 iframe은 같은 출처라 window.parent의 엔진을 그대로 쓴다.
+"""
 
 import base64
-import os
+import itertools
+import json
 from functools import lru_cache
 
-import streamlit.components.v1 as components
+import streamlit as st
+
+from core.assets import get_manifest
+
+# 엔진에 한 번만 실어 보내는 MP3 (논리 이름 -> 파일명)
+SOUND_FILES = {
+    "battle_start": "battle_start.mp3",
+    "loading": "loading_bgm.mp3",
+    "battle": "battle_bgm.mp3",
+}
 
-SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "sounds")
+_cue_ids = itertools.count(1)
 
 
 @lru_cache(maxsize=8)
 def _load_sound_b64(filename: str) -> str:
     """사운드 파일을 base64로 로드 (캐시)"""
-    path = os.path.join(SOUNDS_DIR, filename)
-    if not os.path.exists(path):
+    entry = get_manifest().sound(filename)
+    if entry is None:
         return ""
-    with open(path, "rb") as f:
+    with open(entry.abspath, "rb") as f:
         return base64.b64encode(f.read()).decode("utf-8")
 
 
-def load_bgm_data_uri(filename: str) -> str:
-    """BGM 파일을 data URI로 반환 (애니메이션 HTML 삽입용)"""
-    b64 = _load_sound_b64(filename)
-    if not b64:
-        return ""
-    return f"data:audio/mpeg;base64,{b64}"
+ENGINE_JS = """
+(function(){
+if (window.__nameBattleSound) return;
+var AC = window.AudioContext || window.webkitAudioContext;
+if (!AC) return;
+var A = new AC(), buffers = {}, played = {}, bgm = null;
+function noise(dur, vol){
+  var n=A.createBufferSource(),b=A.createBuffer(1,A.sampleRate*dur,A.sampleRate);
+  var d=b.getChannelData(0);for(var i=0;i<d.length;i++)d[i]=(Math.random()*2-1);
+  n.buffer=b;var g=A.createGain();g.gain.setValueAtTime(vol,A.currentTime);
+  g.gain.exponentialRampToValueAtTime(0.001,A.currentTime+dur);
+  n.connect(g);g.connect(A.destination);n.start();
+}
+function tone(freq, dur, vol, type, delay){
+  var t=A.currentTime+(delay||0),o=A.createOscillator(),g=A.createGain();
+  o.type=type||'sine';o.frequency.value=freq;
+  g.gain.setValueAtTime(vol,t);g.gain.exponentialRampToValueAtTime(0.001,t+dur);
+  o.connect(g);g.connect(A.destination);o.start(t);o.stop(t+dur);
+}
+function seq(notes, step, dur, vol, type){
+  notes.forEach(function(f,i){ tone(f, dur, vol, type, i*step); });
+}
+function buffer(name, vol){
+  if (!buffers[name]) return null;
+  var s=A.createBufferSource(),g=A.createGain();
+  s.buffer=buffers[name];g.gain.value=vol;s.connect(g);g.connect(A.destination);s.start();
+  return {source:s,gain:g};
+}
+var cues = {
+  match_found: function(){ seq([523,659,784], 0.12, 0.4, 0.2, 'sine'); },
+  victory: function(){ seq([523,659,784,1047,784,1047], 0.15, 0.35, 0.18, 'square'); },
+  defeat: function(){ seq([392,349,311,262], 0.25, 0.5, 0.18, 'sine'); },
+  battle_start: function(){ buffer('battle_start', 1.0); },
+  clash: function(){ noise(0.12,0.4);tone(120,0.15,0.3,'square');tone(80,0.2,0.2,'sine'); },
+  vs_slam: function(){ tone(60,0.4,0.35,'square');noise(0.15,0.3);tone(40,0.5,0.25,'sine'); },
+  impact: function(){ noise(0.2,0.5);tone(50,0.3,0.4,'square');tone(100,0.15,0.25,'sawtooth'); }
+};
+var engine = {
+  play: function(name, id){
+    if (id) { if (played[id]) return; played[id] = true; }
+    A.resume().then(function(){ if (cues[name]) cues[name](); });
+  },
+  bgm: function(name, vol){
+    if (bgm && bgm.name === name) return;
+    engine.stopBgm();
+    A.resume().then(function(){
+      var node = buffer(name, vol == null ? 1.0 : vol);
+      if (!node) return;
+      node.source.loop = true;
+      bgm = {name:name, source:node.source, gain:node.gain};
+    });
+  },
+  fadeBgm: function(sec){
+    if (!bgm) return;
+    var cur = bgm; bgm = null;
+    cur.gain.gain.setTargetAtTime(0, A.currentTime, (sec||1)/4);
+    setTimeout(function(){ try{cur.source.stop();}catch(e){} }, (sec||1)*1000);
+  },
+  stopBgm: function(){
+    if (!bgm) return;
+    try{bgm.source.stop();}catch(e){}
+    bgm = null;
+  }
+};
+var files = __SOUND_DATA__;
+Object.keys(files).forEach(function(name){
+  var raw = atob(files[name]), bytes = new Uint8Array(raw.length);
+  for (var i=0;i<raw.length;i++) bytes[i]=raw.charCodeAt(i);
+  A.decodeAudioData(bytes.buffer, function(b){ buffers[name]=b; }, function(){});
+});
+window.__nameBattleSound = engine;
+(window.__nameBattleSoundQueue || []).forEach(function(c){ engine[c[0]].apply(null, c[1]); });
+window.__nameBattleSoundQueue = [];
+})();
+"""
 
 
-def play_battle_start():
-    """대결하기 버튼 클릭 효과음"""
-    b64 = _load_sound_b64("battle_start.mp3")
-    if not b64:
+def mount_sound_engine() -> None:
+    """사운드 엔진을 세션당 한 번만 페이지에 올림 (MP3도 이때 한 번만 전송)"""
+    if st.session_state.get("_sound_engine_mounted"):
         return
-    html = f"""<audio autoplay><source src="data:audio/mpeg;base64,{b64}" type="audio/mpeg"></audio>"""
-    components.html(html, height=0, width=0)
+    st.session_state._sound_engine_mounted = True
+    files = {
+        name: b64
+        for name, filename in SOUND_FILES.items()
+        if (b64 := _load_sound_b64(filename))
+    }
+    script = ENGINE_JS.replace("__SOUND_DATA__", json.dumps(files))
+    st.html(f'<div style="display:none"><script>{script}</script></div>',
+            unsafe_allow_javascript=True)
+
+
+def _send(method: str, *args) -> None:
+    """엔진에 명령 전달 (엔진이 아직 준비 전이면 큐에 쌓아 둠)"""
+    call = json.dumps([method, list(args)])
+    st.html(
+        f'<div style="display:none"><script>(function(c){{'
+        f'var S=window.__nameBattleSound;'
+        f'if(S){{S[c[0]].apply(null,c[1]);}}'
+        f'else{{(window.__nameBattleSoundQueue=window.__nameBattleSoundQueue||[]).push(c);}}'
+        f'}})({call});</script></div>',
+        unsafe_allow_javascript=True,
+    )
+
 
+def play_cue(name: str) -> None:
+    """이름 붙은 효과음 1회 재생 (같은 요소가 다시 그려져도 중복 재생 안 함)"""
+    _send("play", name, f"{name}-{next(_cue_ids)}")
 
-def _play_sfx(js_body: str) -> None:
-    """Web Audio API 효과음을 iframe으로 재생 (브라우저 호환)"""
-    html = f"""<script>
-(function(){{try{{
-var A=new(window.AudioContext||window.webkitAudioContext)();
-A.resume().then(function(){{
-{js_body}
-}});
-}}catch(e){{}}}})();
-</script>"""
-    components.html(html, height=0, width=0)
+
+def stop_bgm() -> None:
+    _send("stopBgm")
+
+
+def play_battle_start():
+    """대결하기 버튼 클릭 효과음"""
+    play_cue("battle_start")
 
 
 def play_match_found():
     """상대 확정 - 딩 소리"""
-    _play_sfx("""
-var t=A.currentTime;
-[523,659,784].forEach(function(f,i){
-  var o=A.createOscillator(),g=A.createGain();
-  o.type='sine';o.frequency.value=f;
-  g.gain.setValueAtTime(0.2,t+i*0.12);
-  g.gain.exponentialRampToValueAtTime(0.001,t+i*0.12+0.4);
-  o.connect(g);g.connect(A.destination);
-  o.start(t+i*0.12);o.stop(t+i*0.12+0.4);
-});
-""")
+    play_cue("match_found")
 
 
 def play_victory():
     """승리 팡파레"""
-    _play_sfx("""
-var t=A.currentTime;
-var notes=[523,659,784,1047,784,1047];
-notes.forEach(function(f,i){
-  var o=A.createOscillator(),g=A.createGain();
-  o.type='square';o.frequency.value=f;
-  g.gain.setValueAtTime(0.18,t+i*0.15);
-  g.gain.exponentialRampToValueAtTime(0.001,t+i*0.15+0.35);
-  o.connect(g);g.connect(A.destination);
-  o.start(t+i*0.15);o.stop(t+i*0.15+0.35);
-});
-""")
+    play_cue("victory")
 
 
 def play_defeat():
     """패배 사운드"""
-    _play_sfx("""
-var t=A.currentTime;
-var notes=[392,349,311,262];
-notes.forEach(function(f,i){
-  var o=A.createOscillator(),g=A.createGain();
-  o.type='sine';o.frequency.value=f;
-  g.gain.setValueAtTime(0.18,t+i*0.25);
-  g.gain.exponentialRampToValueAtTime(0.001,t+i*0.25+0.5);
-  o.connect(g);g.connect(A.destination);
-  o.start(t+i*0.25);o.stop(t+i*0.25+0.5);
-});
-""")
+    play_cue("defeat")
 
 
-# ─── iframe 내부 삽입용 JS 스니펫 ───
+# ─── iframe 내부 삽입용 JS 스니펫 (부모 문서의 엔진 사용) ───
 
 AUDIO_INIT_JS = """
-var _A=new(window.AudioContext||window.webkitAudioContext)();
-_A.resume();
-function _noise(dur,vol){
-  var n=_A.createBufferSource(),b=_A.createBuffer(1,_A.sampleRate*dur,_A.sampleRate);
-  var d=b.getChannelData(0);for(var i=0;i<d.length;i++)d[i]=(Math.random()*2-1);
-  n.buffer=b;var g=_A.createGain();g.gain.setValueAtTime(vol,_A.currentTime);
-  g.gain.exponentialRampToValueAtTime(0.001,_A.currentTime+dur);
-  n.connect(g);g.connect(_A.destination);n.start();
-}
-function _tone(freq,dur,vol,type){
-  type=type||'sine';var o=_A.createOscillator(),g=_A.createGain();
-  o.type=type;o.frequency.value=freq;
-  g.gain.setValueAtTime(vol,_A.currentTime);
-  g.gain.exponentialRampToValueAtTime(0.001,_A.currentTime+dur);
-  o.connect(g);g.connect(_A.destination);o.start();o.stop(_A.currentTime+dur);
-}
-"""
-
-SFX_CLASH_JS = """
-function _clash(){_noise(0.12,0.4);_tone(120,0.15,0.3,'square');_tone(80,0.2,0.2,'sine');}
-"""
-
-SFX_VS_SLAM_JS = """
-function _vsSlam(){_tone(60,0.4,0.35,'square');_noise(0.15,0.3);_tone(40,0.5,0.25,'sine');}
-"""
-
-SFX_IMPACT_JS = """
-function _impact(){_noise(0.2,0.5);_tone(50,0.3,0.4,'square');_tone(100,0.15,0.25,'sawtooth');}
+var _S=(function(){try{return window.parent.__nameBattleSound||null;}catch(e){return null;}})();
+function _sfx(name){if(_S)_S.play(name);}
+function _bgm(name,vol){if(_S)_S.bgm(name,vol);}
+function _fadeBgm(sec){if(_S)_S.fadeBgm(sec);}
+function _clash(){_sfx('clash');}
+function _vsSlam(){_sfx('vs_slam');}
+function _impact(){_sfx('impact');}
 """